@@ -12,3 +12,120 @@ PROXY: dict = {
 
 with open("user-agents.txt") as f:
     USER_AGENTS = [line.strip() for line in f.readlines()]
+
+# Salida JSON Lines: registros por vaciado de buffer y política de fsync (never | flush | always)
+OUTPUT_FLUSH_EVERY = int(os.getenv("OUTPUT_FLUSH_EVERY", "50"))
+OUTPUT_FSYNC = os.getenv("OUTPUT_FSYNC", "never")
+# Al terminar, generar también el .json con el array indentado de siempre
+EXPORT_JSON_ARRAY = os.getenv("EXPORT_JSON_ARRAY", "1") == "1"
+
+# Salidas activas, separadas por comas: jsonl, sqlite
+OUTPUT_SINKS = [s.strip() for s in os.getenv("OUTPUT_SINKS", "jsonl").split(",") if s.strip()]
+SQLITE_PATH = os.getenv("SQLITE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "scraping_engine.db"))
+SQLITE_BATCH_SIZE = int(os.getenv("SQLITE_BATCH_SIZE", "100"))
+
+# Índice de URLs ya extraídas: las fichas más recientes que SEEN_MAX_AGE_HOURS no se vuelven a descargar
+SKIP_SEEN = os.getenv("SKIP_SEEN", "1") == "1"
+SEEN_MAX_AGE_HOURS = float(os.getenv("SEEN_MAX_AGE_HOURS", "168"))
+SEEN_BLOOM_CAPACITY = int(os.getenv("SEEN_BLOOM_CAPACITY", "2000000"))
+
+# Pool de BrowserContext: contextos vivos a la vez, navegaciones antes de reciclar y rotación de user agent
+CONTEXT_POOL_SIZE = int(os.getenv("CONTEXT_POOL_SIZE", "2"))
+CONTEXT_MAX_USES = int(os.getenv("CONTEXT_MAX_USES", "100"))
+UA_ROTATION = os.getenv("UA_ROTATION", "per_context")
+
+# Abortar imágenes, fuentes, publicidad y analítica según el perfil de cada sitio
+BLOCK_RESOURCES = os.getenv("BLOCK_RESOURCES", "1") == "1"
+
+# Fuerza el evento de carga de page.goto para todos los sitios (commit, domcontentloaded, load, networkidle).
+# Vacío: cada sitio usa su WAIT_POLICIES
+WAIT_UNTIL = os.getenv("WAIT_UNTIL", "")
+
+# Ruta rápida: descargar las fichas por HTTP y parsearlas en Python; si la respuesta está incompleta
+# o bloqueada, la URL pasa al navegador
+HTTP_FAST_PATH = os.getenv("HTTP_FAST_PATH", "0") == "1"
+
+# Motor async (playwright.async_api) para las fichas de detalle: páginas simultáneas por dominio. 0 lo desactiva
+ASYNC_DETAIL_CONCURRENCY = int(os.getenv("ASYNC_DETAIL_CONCURRENCY", "0"))
+
+# Límite de peticiones por host para todo el proceso (token bucket): peticiones por segundo, ráfaga y
+# jitter aleatorio añadido a cada espera. RATE_LIMIT_HOSTS: "host=rps:ráfaga,..." para fijar hosts concretos (rps 0 = sin límite)
+RATE_LIMIT_RPS = float(os.getenv("RATE_LIMIT_RPS", "0.33"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "1"))
+RATE_LIMIT_JITTER = float(os.getenv("RATE_LIMIT_JITTER", "0.5"))
+RATE_LIMIT_HOSTS = os.getenv("RATE_LIMIT_HOSTS", "")
+
+# Ritmo adaptativo (AIMD) por dominio: +AIMD_INCREASE req/s por respuesta limpia más rápida que
+# AIMD_LATENCY_TARGET segundos, ×AIMD_DECREASE ante 429, 5xx, timeouts o páginas de bloqueo.
+# AIMD_MAX_RPS: techo de la subida; 0 = el ritmo configurado del host, que nunca se supera
+AIMD_ENABLED = os.getenv("AIMD_ENABLED", "1") == "1"
+AIMD_MIN_RPS = float(os.getenv("AIMD_MIN_RPS", "0.05"))
+AIMD_MAX_RPS = float(os.getenv("AIMD_MAX_RPS", "0"))
+AIMD_INCREASE = float(os.getenv("AIMD_INCREASE", "0.02"))
+AIMD_DECREASE = float(os.getenv("AIMD_DECREASE", "0.5"))
+AIMD_LATENCY_TARGET = float(os.getenv("AIMD_LATENCY_TARGET", "2.0"))
+
+# Reintentos: intentos por URL, backoff exponencial con jitter completo (base y tope en segundos)
+# y presupuesto total de reintentos por ejecución
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "2"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "60"))
+RETRY_BUDGET = int(os.getenv("RETRY_BUDGET", "500"))
+
+# Coordinación entre varias máquinas: backend de leases (vacío, sqlite o filesystem), ruta compartida
+# (base SQLite o directorio), nombre común de la crawl en todos los nodos (uno nuevo por crawl: las URLs
+# terminadas no se repiten dentro de él; obligatorio con un backend), caducidad del lease e id del nodo
+COORDINATION_BACKEND = os.getenv("COORDINATION_BACKEND", "")
+COORDINATION_PATH = os.getenv("COORDINATION_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "coordination.db"))
+COORDINATION_CRAWL = os.getenv("COORDINATION_CRAWL", "")
+LEASE_TTL = float(os.getenv("LEASE_TTL", "120"))
+NODE_ID = os.getenv("NODE_ID", "")
+
+# Modo supervisor de main.py: sitios en paralelo (cada uno en su proceso), segundos máximos por sitio
+# antes de detenerlo (0 = sin límite) y segundos sin avanzar (sin páginas ni registros) tras los que un
+# sitio se da por colgado y se detiene (0 = nunca). El límite de peticiones por host se reparte entre los
+# procesos del mismo sitio
+WORKERS = int(os.getenv("WORKERS", "1"))
+SITE_TIMEOUT = float(os.getenv("SITE_TIMEOUT", "0"))
+SITE_STALL_TIMEOUT = float(os.getenv("SITE_STALL_TIMEOUT", "1800"))
+
+# Páginas de listado que el hilo de paginación puede llevar de ventaja a la descarga de fichas
+PIPELINE_PREFETCH = int(os.getenv("PIPELINE_PREFETCH", "2"))
+
+# Páginas de listado descargadas a la vez cuando la paginación ya muestra el rango (0 = de una en una)
+LISTING_FANOUT = int(os.getenv("LISTING_FANOUT", "0"))
+
+# Cortacircuitos por dominio: se abre cuando la proporción de fallos en las últimas CIRCUIT_WINDOW peticiones
+# (con al menos CIRCUIT_MIN_REQUESTS) llega a CIRCUIT_FAILURE_RATE; pausa en segundos antes de la petición de prueba
+CIRCUIT_ENABLED = os.getenv("CIRCUIT_ENABLED", "1") == "1"
+CIRCUIT_FAILURE_RATE = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))
+CIRCUIT_WINDOW = int(os.getenv("CIRCUIT_WINDOW", "20"))
+CIRCUIT_MIN_REQUESTS = int(os.getenv("CIRCUIT_MIN_REQUESTS", "10"))
+CIRCUIT_COOLDOWN = float(os.getenv("CIRCUIT_COOLDOWN", "300"))
+
+# Presupuesto de la ejecución en segundos (toda la ejecución y cada sitio, 0 = sin límite) y topes opcionales
+# de páginas de listado y registros por sitio; al agotarse se para de forma ordenada y se sigue con --resume.
+# SHUTDOWN_GRACE: segundos que el supervisor espera a un sitio que está parando antes de matarlo
+RUN_BUDGET = float(os.getenv("RUN_BUDGET", "0"))
+SITE_BUDGET = float(os.getenv("SITE_BUDGET", "0"))
+MAX_PAGES = int(os.getenv("MAX_PAGES", "0"))
+MAX_RECORDS = int(os.getenv("MAX_RECORDS", "0"))
+SHUTDOWN_GRACE = float(os.getenv("SHUTDOWN_GRACE", "120"))
+
+# Categorías de Páginas Amarillas a recorrer, separadas por comas (vacío = todas)
+PA_CATEGORIES = [c.strip() for c in os.getenv("PA_CATEGORIES", "").split(",") if c.strip()]
+
+# Ciudades de Páginas Amarillas ("ciudad" o "provincia/ciudad"), se cruzan con las categorías;
+# SHARD (i/N) hace que este nodo recorra solo su parte de la matriz ciudad × categoría
+PA_CITIES = [c.strip() for c in os.getenv("PA_CITIES", "madrid").split(",") if c.strip()]
+SHARD = os.getenv("SHARD", "")
+
+# Campos obligatorios de cada empresa de Páginas Amarillas: la ficha solo se abre si la tarjeta del listado
+# no los trae todos (p. ej. nombre,direccion,telefono evita casi todas las fichas)
+PA_REQUIRED_FIELDS = [f.strip() for f in os.getenv(
+    "PA_REQUIRED_FIELDS", "nombre,descripcion,direccion,telefono,website,actividades"
+).split(",") if f.strip()]
+
+# Cómo obtiene supermarket23 los productos: dom (renderiza cada ficha), capture (JSON de la API que carga
+# cada listado, ficha solo si falta) o api (llama directamente al endpoint descubierto, página a página)
+SUPERMARKET_MODE = os.getenv("SUPERMARKET_MODE", "dom")
@@ -0,0 +1,196 @@
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from playwright.sync_api import BrowserContext, Page, Response
+from rich import print as rprint
+from core import circuit
+from core import navigation
+from core import rate_limit
+from core import throttle
+
+
+# Captura de las respuestas JSON con las que una app (Angular, React...) pinta sus páginas: en lugar de
+# leer el DOM renderizado se reconstruyen los registros a partir de la API, y una vez conocido el endpoint
+# se le puede llamar directamente página a página sin renderizar nada
+
+# Parámetros de paginación habituales, por orden de preferencia
+PAGE_PARAMS = ("page", "pagina", "pageNumber", "page_number", "p", "offset", "skip", "start")
+
+
+class ResponseCapture:
+
+    def __init__(self, page: Page, resource_types: Sequence[str] = ("xhr", "fetch")) -> None:
+        self.page = page
+        self.resource_types = resource_types
+        self.responses: List[Response] = []
+
+
+    def _on_response(self, response: Response) -> None:
+
+        # En el handler solo se guarda la respuesta; el cuerpo se lee después, fuera del evento
+        if response.request.resource_type in self.resource_types:
+            self.responses.append(response)
+
+
+    def start(self) -> "ResponseCapture":
+
+        self.page.on("response", self._on_response)
+        return self
+
+
+    def stop(self) -> None:
+
+        self.page.remove_listener("response", self._on_response)
+
+
+    def __enter__(self) -> "ResponseCapture":
+
+        return self.start()
+
+
+    def __exit__(self, *exc_info) -> None:
+
+        self.stop()
+
+
+    def json_bodies(self) -> List[Tuple[str, Any]]:
+
+        bodies = []
+        for response in self.responses:
+            if not response.ok or "json" not in (response.headers.get("content-type") or ""):
+                continue
+            try:
+                bodies.append((response.url, response.json()))
+            except Exception:
+                # Respuestas sin cuerpo (redirecciones, peticiones canceladas al navegar)
+                continue
+        return bodies
+
+
+def find_items(data: Any, required: Sequence[Sequence[str]]) -> List[Dict[str, Any]]:
+
+    # La lista de objetos más larga del JSON cuyos elementos tienen al menos una clave de cada grupo
+    # de required (p. ej. algo parecido a un nombre y algo parecido a un precio)
+    best: List[Dict[str, Any]] = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            items = [item for item in node if isinstance(item, dict)]
+            if items and len(items) > len(best) and all(_has_any(items[0], keys) for keys in required):
+                best = items
+            stack.extend(node)
+    return best
+
+
+def _lookup(item: Dict[str, Any], keys: Sequence[str]) -> Any:
+
+    lowered = {key.lower(): value for key, value in item.items()}
+    for key in keys:
+        value = lowered.get(key.lower())
+        if value not in (None, "", [], {}):
+            return value
+    return None
+
+
+def _has_any(item: Dict[str, Any], keys: Sequence[str]) -> bool:
+
+    return _lookup(item, keys) is not None
+
+
+def _text(value: Any) -> Optional[str]:
+
+    # Objetos anidados ({"name": "Bebidas"}) y listas se reducen a su texto
+    if isinstance(value, dict):
+        value = _lookup(value, ("name", "nombre", "title", "label", "value"))
+    elif isinstance(value, list):
+        parts = [_text(part) for part in value]
+        value = ", ".join(part for part in parts if part) or None
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def map_record(item: Dict[str, Any], field_keys: Dict[str, Sequence[str]]) -> Dict[str, str]:
+
+    # Registro con los campos de field_keys (campo -> claves candidatas del JSON); N/A si no hay ninguna
+    return {field: _text(_lookup(item, keys)) or "N/A" for field, keys in field_keys.items()}
+
+
+class ApiEndpoint:
+
+    def __init__(self, url: str, page_param: str, value: int, page_num: int = 1) -> None:
+        self.url = url
+        self.page_param = page_param
+        # Valor del parámetro en la petición capturada y página del listado en la que se capturó: tras un
+        # --resume puede no ser la primera
+        self.value = value
+        self.page_num = page_num
+
+
+    @classmethod
+    def detect(cls, url: str, page_num: int = 1) -> Optional["ApiEndpoint"]:
+
+        query = dict(parse_qsl(urlsplit(url).query))
+        for param in PAGE_PARAMS:
+            if param in query and query[param].isdigit():
+                return cls(url, param, int(query[param]), page_num)
+        return None
+
+
+    def page_url(self, page_num: int, page_size: int = 0) -> str:
+
+        parts = urlsplit(self.url)
+        query = dict(parse_qsl(parts.query))
+        # offset/skip/start cuentan elementos, no páginas; el resto vale también para APIs que cuentan desde 0
+        step = page_size if self.page_param in ("offset", "skip", "start") else 1
+        query[self.page_param] = str(self.value + (page_num - self.page_num) * step)
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), parts.fragment))
+
+
+    def __repr__(self) -> str:
+
+        return f"ApiEndpoint({self.url!r}, page_param={self.page_param!r})"
+
+
+def fetch_json(context: BrowserContext, url: str, timeout: int = 60000) -> Any:
+
+    # Petición directa con las cookies del contexto (sesión, ubicación...) y los mismos límites que una navegación
+    circuit.wait(url)
+    rate_limit.acquire(url)
+    started = time.monotonic()
+    try:
+        response = context.request.get(url, timeout=timeout, headers={"Accept": "application/json"})
+    except Exception:
+        throttle.record(url, failure="error de red")
+        raise
+    throttle.record(url, status=response.status, latency=time.monotonic() - started)
+    navigation.raise_for_status(response, url)
+    return response.json()
+
+
+def learn_url_template(items: List[Dict[str, Any]], links: List[str],
+                       keys: Sequence[str]) -> Optional[Tuple[str, str]]:
+
+    # Qué clave del JSON aparece en la URL de la ficha (slug, id...) y cómo se construye la URL a partir
+    # de ella, para poder generar enlaces sin el DOM: devuelve (clave, plantilla con {} en lugar del valor)
+    for key in keys:
+        for item in items:
+            value = _text(_lookup(item, (key,)))
+            if not value or len(value) < 3:
+                continue
+            matches = [link for link in links if value in link]
+            if len(matches) == 1:
+                rprint(f"[cyan]URL de ficha construida a partir de '{key}': {matches[0]}[/cyan]")
+                return key, matches[0].replace(value, "{}", 1)
+    return None
+
+
+def item_url(item: Dict[str, Any], template: Tuple[str, str]) -> Optional[str]:
+
+    key, pattern = template
+    value = _text(_lookup(item, (key,)))
+    return pattern.replace("{}", value, 1) if value else None
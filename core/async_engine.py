@@ -0,0 +1,189 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from rich import print as rprint
+import config
+from core import circuit
+from core import extraction
+from core import metrics
+from core import rate_limit
+from core import retry
+from core import throttle
+from core import navigation
+from core.navigation import BlockedPage, WaitPolicy
+from core.resource_blocking import BlockingProfile
+
+
+class AsyncDetailFetcher:
+
+    def __init__(self, user_agents: List[str], name: str, policy: WaitPolicy, concurrency: int = 4,
+                 blocking_profile: Optional[BlockingProfile] = None, max_retries: int = config.RETRY_MAX_ATTEMPTS,
+                 launch_options: Optional[Dict[str, Any]] = None, max_uses: int = config.CONTEXT_MAX_USES) -> None:
+        self.user_agents = user_agents
+        self.name = name
+        self.policy = policy
+        self.concurrency = max(1, concurrency)
+        self.blocking_profile = blocking_profile
+        self.max_retries = max_retries
+        # Navegaciones por contexto antes de cerrarlo y abrir uno nuevo, como en ContextPool
+        self.max_uses = max(1, max_uses)
+        self.launch_options = {"headless": True, "timeout": 60000, **(launch_options or {})}
+
+        # Último error de cada URL que agotó sus intentos en el último fetch_many
+        self.errors: Dict[str, str] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        # (contexto, página, navegaciones hechas) listos para reutilizar
+        self._idle: List[Tuple[Any, Any, int]] = []
+        self._playwright = None
+        self._browser = None
+
+        # El motor async vive en su propio hilo y bucle: los scrapers síncronos lo usan sin cambiar de API
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name=f"{name}-async", daemon=True)
+        self._thread.start()
+        try:
+            self._run(self._start())
+        except Exception:
+            self.close()
+            raise
+
+
+    def _run(self, coroutine):
+
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+
+    async def _start(self) -> None:
+
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(**self.launch_options)
+
+
+    def _semaphore(self, url: str) -> asyncio.Semaphore:
+
+        # Límite de páginas simultáneas por dominio, no global
+        host = (urlsplit(url).hostname or "").lower()
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.concurrency)
+        return self._semaphores[host]
+
+
+    async def _acquire_page(self):
+
+        if self._idle:
+            return self._idle.pop()
+
+        context = await self._browser.new_context(user_agent=random.choice(self.user_agents), ignore_https_errors=True)
+        if self.blocking_profile is not None and config.BLOCK_RESOURCES:
+            await self.blocking_profile.install_async(context)
+        return context, await context.new_page(), 0
+
+
+    async def _release_page(self, entry, failed: bool) -> None:
+
+        context, page, uses = entry
+        if failed or uses + 1 >= self.max_uses:
+            try:
+                await context.close()
+            except Exception as e:
+                rprint(f"[yellow]Error cerrando contexto: {str(e)[:100]}[/yellow]")
+        else:
+            self._idle.append((context, page, uses + 1))
+
+
+    async def _fetch_one(self, url: str, script: str, arg: Any = None) -> Any:
+
+        async with self._semaphore(url):
+            for attempt in range(self.max_retries):
+                await circuit.wait_async(url)
+                await rate_limit.acquire_async(url)
+                entry = None
+                failed = False
+                try:
+                    # Dentro del try: si no se puede abrir la página falla esta URL, no todo el lote
+                    entry = await self._acquire_page()
+                    page = entry[1]
+                    started = time.monotonic()
+                    try:
+                        response = await page.goto(url, wait_until=config.WAIT_UNTIL or self.policy.wait_until, timeout=self.policy.timeout)
+                    except PlaywrightTimeoutError:
+                        throttle.record(url, failure="timeout")
+                        raise
+                    latency = time.monotonic() - started
+
+                    if self.policy.blocked_when and await page.query_selector(self.policy.blocked_when):
+                        throttle.record(url, failure="página de bloqueo")
+                        raise BlockedPage(url)
+                    throttle.record(url, status=response.status if response else None, latency=latency)
+                    navigation.raise_for_status(response, url)
+
+                    if self.policy.selector:
+                        try:
+                            await page.wait_for_selector(self.policy.selector, timeout=self.policy.selector_timeout)
+                        except PlaywrightTimeoutError:
+                            raise navigation.selector_missing(self.policy, url, await page.evaluate("document.readyState"))
+
+                    result = await page.evaluate(script, arg)
+                    metrics.incr(f"{self.name}.async_pages")
+                    return result
+
+                except Exception as e:
+                    failed = True
+                    error = e
+
+                finally:
+                    if entry is not None:
+                        await self._release_page(entry, failed)
+
+                rprint(f"[red]  Intento {attempt + 1} fallido para {url}: {str(error)[:80]}[/red]")
+                if not retry.should_retry(error, attempt, self.max_retries):
+                    break
+                await retry.backoff_async(attempt)
+
+            metrics.incr(f"{self.name}.async_failed")
+            self.errors[url] = f"{type(error).__name__}: {str(error)[:200]}"
+            return None
+
+
+    async def _gather(self, urls: Sequence[str], script: str, arg: Any = None) -> List[Any]:
+
+        return await asyncio.gather(*(self._fetch_one(url, script, arg) for url in urls))
+
+
+    def evaluate_many(self, urls: Sequence[str], script: str, arg: Any = None) -> List[Any]:
+
+        # Resultado de evaluar script en cada URL, en el mismo orden; None si la URL agotó los reintentos
+        self.errors = {}
+        return self._run(self._gather(urls, script, arg))
+
+
+    def fetch_many(self, urls: Sequence[str], spec: Dict[str, Any]) -> List[Optional[Dict[str, str]]]:
+
+        # Devuelve los registros en el mismo orden que las URLs; None si la URL agotó los reintentos
+        results = self.evaluate_many(urls, extraction.EXTRACT_JS, spec)
+        return [result["record"] if result is not None else None for result in results]
+
+
+    async def _stop(self) -> None:
+
+        for context, _, _ in self._idle:
+            await context.close()
+        self._idle = []
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+
+    def close(self) -> None:
+
+        try:
+            self._run(self._stop())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
@@ -0,0 +1,154 @@
+import itertools
+import random
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+from playwright.sync_api import Browser, BrowserContext, Page
+from rich import print as rprint
+from core import retry
+from core.session_state import SessionState
+
+
+# per_context: un user agent aleatorio cada vez que se crea un contexto
+# round_robin: se recorren los user agents en orden, uno por contexto
+# fixed: el mismo user agent para todo el run
+UA_POLICIES = ("per_context", "round_robin", "fixed")
+
+
+class _PooledContext:
+
+    def __init__(self, context: BrowserContext, page: Page, user_agent: str) -> None:
+        self.context = context
+        self.page = page
+        self.user_agent = user_agent
+        self.uses = 0
+
+
+class ContextPool:
+
+    def __init__(self, browser: Browser, user_agents: List[str], size: int = 2, max_uses: int = 100,
+                 ua_policy: str = "per_context", context_options: Optional[Dict[str, Any]] = None,
+                 on_new_context: Optional[Callable[[BrowserContext], None]] = None,
+                 acquire_timeout: float = 300, session: Optional[SessionState] = None) -> None:
+        if ua_policy not in UA_POLICIES:
+            raise ValueError(f"Política de user agent no válida: {ua_policy} (opciones: {', '.join(UA_POLICIES)})")
+
+        self.browser = browser
+        self.user_agents = user_agents
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.ua_policy = ua_policy
+        self.context_options = {"ignore_https_errors": True, **(context_options or {})}
+        self.on_new_context = on_new_context
+        self.acquire_timeout = acquire_timeout
+        # Estado de sesión guardado (cookies, localStorage) con el que arranca cada contexto nuevo
+        self.session = session
+
+        self.contexts_created = 0
+        self.navigations = 0
+
+        self._idle: List[_PooledContext] = []
+        self._live = 0
+        self._cond = threading.Condition()
+        self._ua_cycle = itertools.cycle(user_agents)
+        self._fixed_ua = random.choice(user_agents)
+
+
+    def _next_user_agent(self) -> str:
+
+        if self.ua_policy == "fixed":
+            return self._fixed_ua
+        if self.ua_policy == "round_robin":
+            return next(self._ua_cycle)
+        return random.choice(self.user_agents)
+
+
+    def _create(self) -> _PooledContext:
+
+        user_agent = self._next_user_agent()
+        options = {**self.context_options, **(self.session.context_options() if self.session is not None else {})}
+        context = self.browser.new_context(user_agent=user_agent, **options)
+        try:
+            if self.on_new_context is not None:
+                self.on_new_context(context)
+            page = context.new_page()
+        except Exception:
+            context.close()
+            raise
+
+        self.contexts_created += 1
+        return _PooledContext(context, page, user_agent)
+
+
+    def _acquire(self) -> _PooledContext:
+
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._idle or self._live < self.size, timeout=self.acquire_timeout):
+                raise TimeoutError(f"No hay contextos libres tras {self.acquire_timeout}s (tamaño del pool: {self.size})")
+            if self._idle:
+                return self._idle.pop()
+            self._live += 1
+
+        try:
+            return self._create()
+        except Exception:
+            with self._cond:
+                self._live -= 1
+                self._cond.notify()
+            raise
+
+
+    def _release(self, entry: _PooledContext, recycle: bool) -> None:
+
+        if recycle or entry.page.is_closed():
+            self._discard(entry)
+            return
+
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+
+    def _discard(self, entry: _PooledContext) -> None:
+
+        try:
+            entry.context.close()
+        except Exception as e:
+            rprint(f"[yellow]Error cerrando contexto: {str(e)[:100]}[/yellow]")
+        finally:
+            with self._cond:
+                self._live -= 1
+                self._cond.notify()
+
+
+    @contextmanager
+    def page(self):
+
+        entry = self._acquire()
+        failed = False
+        try:
+            yield entry.page
+        except Exception as e:
+            # Solo un fallo del navegador o de la red (bloqueo, timeout, crash del renderer...) deja el
+            # contexto en mal estado; un 404 o una ficha sin la estructura esperada no tienen que ver con él
+            failed = retry.is_transient(e)
+            raise
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            entry.uses += 1
+            self.navigations += 1
+            self._release(entry, recycle=failed or entry.uses >= self.max_uses)
+
+
+    def close(self) -> None:
+
+        with self._cond:
+            idle, self._idle = self._idle, []
+
+        for entry in idle:
+            self._discard(entry)
+
+        if self.navigations:
+            rprint(f"[cyan]Pool de contextos: {self.contexts_created} contextos para {self.navigations} navegaciones[/cyan]")
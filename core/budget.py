@@ -0,0 +1,142 @@
+import logging
+import signal
+import threading
+import time
+from typing import Optional
+from rich import print as rprint
+import config
+
+
+# Presupuesto de la ejecución: hora límite global (compartida por todos los sitios y procesos),
+# tiempo por sitio y topes opcionales de páginas de listado y registros. Los scrapers lo consultan
+# entre página y página: lo que está en vuelo termina, la salida se cierra y el checkpoint queda
+# apuntando a donde seguir con --resume
+_lock = threading.RLock()
+_run_deadline: Optional[float] = None
+_site_deadline: Optional[float] = None
+_max_pages = 0
+_max_records = 0
+_pages = 0
+_records = 0
+_stop_reason: Optional[str] = None
+# Parada que afecta a toda la ejecución (señal recibida), no solo al sitio en curso
+_run_stop_reason: Optional[str] = None
+# Latido para el supervisor: valor compartido (multiprocessing.Value) con la hora de la última señal de avance
+_heartbeat = None
+
+
+def set_run_deadline(deadline: Optional[float]) -> None:
+
+    # Hora absoluta (time.time()) para poder pasarla a los procesos del supervisor
+    global _run_deadline
+    _run_deadline = deadline
+
+
+def run_stopped() -> bool:
+
+    # Con la hora límite global pasada o una señal recibida no se empieza ningún sitio más
+    return _run_stop_reason is not None or (_run_deadline is not None and time.time() >= _run_deadline)
+
+
+def set_heartbeat(value) -> None:
+
+    global _heartbeat
+    _heartbeat = value
+    beat()
+
+
+def beat() -> None:
+
+    # Cada página, registro o consulta del presupuesto cuenta como avance
+    if _heartbeat is not None:
+        _heartbeat.value = time.time()
+
+
+def start_site(seconds: float = config.SITE_BUDGET, max_pages: int = config.MAX_PAGES,
+               max_records: int = config.MAX_RECORDS) -> None:
+
+    global _site_deadline, _max_pages, _max_records, _pages, _records, _stop_reason
+    with _lock:
+        _site_deadline = time.time() + seconds if seconds > 0 else None
+        _max_pages = max_pages
+        _max_records = max_records
+        _pages = 0
+        _records = 0
+        _stop_reason = _run_stop_reason
+    beat()
+
+
+def count_page() -> None:
+
+    global _pages
+    with _lock:
+        _pages += 1
+    beat()
+
+
+def count_record() -> None:
+
+    global _records
+    with _lock:
+        _records += 1
+    beat()
+
+
+def records() -> int:
+
+    # Registros escritos por el sitio en curso desde start_site
+    return _records
+
+
+def request_stop(reason: str, whole_run: bool = False) -> None:
+
+    global _stop_reason, _run_stop_reason
+    with _lock:
+        if whole_run and _run_stop_reason is None:
+            _run_stop_reason = reason
+        if _stop_reason is None:
+            _stop_reason = reason
+            rprint(f"[yellow]Parada ordenada solicitada ({reason}): se termina lo que está en curso[/yellow]")
+
+
+def exhausted() -> Optional[str]:
+
+    # Motivo de la parada, o None si queda presupuesto; una vez agotado se mantiene hasta el siguiente sitio
+    beat()
+    now = time.time()
+    if _stop_reason is None:
+        if _run_deadline is not None and now >= _run_deadline:
+            request_stop("tiempo global agotado")
+        elif _site_deadline is not None and now >= _site_deadline:
+            request_stop("tiempo del sitio agotado")
+        elif _max_pages and _pages >= _max_pages:
+            request_stop(f"tope de {_max_pages} páginas")
+        elif _max_records and _records >= _max_records:
+            request_stop(f"tope de {_max_records} registros")
+    return _stop_reason
+
+
+def stop_reason() -> Optional[str]:
+
+    return _stop_reason
+
+
+def install_signal_handlers() -> None:
+
+    # SIGTERM (cron, systemd, el supervisor) pasa a ser una parada ordenada en lugar de un corte a mitad de escritura
+    def handle(signum, frame):
+
+        request_stop(f"señal {signal.Signals(signum).name}", whole_run=True)
+
+    signal.signal(signal.SIGTERM, handle)
+
+
+def report(title: str) -> None:
+
+    if _stop_reason is None:
+        return
+    rprint(
+        f"[yellow]{title} detenido ({_stop_reason}): {_pages} páginas de listado y {_records} registros "
+        f"en esta ejecución; continúa con --resume[/yellow]"
+    )
+    logging.info(f"Parada {title}: {_stop_reason}, páginas={_pages}, registros={_records}")
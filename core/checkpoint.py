@@ -0,0 +1,51 @@
+import json
+import os
+from typing import Any, Dict
+from rich import print as rprint
+
+
+class Checkpoint:
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.state: Dict[str, Any] = {}
+
+
+    @classmethod
+    def for_site(cls, data_dir: str, name: str) -> "Checkpoint":
+
+        return cls(os.path.join(data_dir, "checkpoints", f"{name}.json"))
+
+
+    def load(self) -> Dict[str, Any]:
+
+        if not os.path.exists(self.path):
+            return {}
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            rprint(f"[yellow]Checkpoint ilegible en {self.path}, se ignora: {str(e)}[/yellow]")
+            self.state = {}
+
+        return dict(self.state)
+
+
+    def save(self, **cursor: Any) -> None:
+
+        self.state.update(cursor)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        # Escritura atómica: un corte a mitad nunca deja un checkpoint corrupto
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+    def clear(self) -> None:
+
+        self.state = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
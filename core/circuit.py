@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Dict
+from rich import print as rprint
+import config
+from core import metrics
+from core import rate_limit
+
+
+# Cortacircuitos por dominio: con demasiados fallos (bloqueos, 429, 5xx, timeouts) en las últimas
+# CIRCUIT_WINDOW peticiones el host queda en pausa CIRCUIT_COOLDOWN segundos para todo el proceso;
+# después una sola petición de prueba decide si se reabre o vuelve a la pausa
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Cada cuánto vuelve a mirar quien espera a que termine la petición de prueba, y cuánto se espera
+# a una prueba que nunca registra resultado antes de lanzar otra
+PROBE_POLL = 2.0
+PROBE_TIMEOUT = 120.0
+
+
+class CircuitBreaker:
+
+    def __init__(self, host: str, failure_rate: float, window: int, min_requests: int, cooldown: float) -> None:
+        self.host = host
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.open_until = 0.0
+        self.probe_started = 0.0
+        self.outcomes: deque = deque(maxlen=max(1, window))
+        self._lock = threading.Lock()
+
+
+    def reserve(self) -> float:
+
+        # Segundos que hay que esperar antes de poder enviar una petición al host (0 = adelante)
+        with self._lock:
+            now = time.monotonic()
+            if self.state == CLOSED:
+                return 0.0
+            if self.state == OPEN:
+                if now < self.open_until:
+                    return self.open_until - now
+                self.state = HALF_OPEN
+                self.probe_started = now
+                rprint(f"[yellow]Circuito de {self.host} entreabierto: se prueba con una petición[/yellow]")
+                self._report()
+                return 0.0
+            if now - self.probe_started < PROBE_TIMEOUT:
+                return PROBE_POLL
+            self.probe_started = now
+            return 0.0
+
+
+    def record(self, success: bool) -> None:
+
+        with self._lock:
+            if self.state == OPEN:
+                # Respuestas de peticiones que ya estaban en vuelo al abrir el circuito
+                return
+            if self.state == HALF_OPEN:
+                if success:
+                    self.state = CLOSED
+                    self.outcomes.clear()
+                    rprint(f"[green]Circuito de {self.host} cerrado: el host vuelve a responder[/green]")
+                    self._report()
+                else:
+                    self._trip("la petición de prueba ha fallado")
+                return
+
+            self.outcomes.append(success)
+            failures = self.outcomes.count(False)
+            if len(self.outcomes) >= self.min_requests and failures / len(self.outcomes) >= self.failure_rate:
+                self._trip(f"{failures}/{len(self.outcomes)} peticiones fallidas")
+
+
+    def _trip(self, reason: str) -> None:
+
+        self.state = OPEN
+        self.open_until = time.monotonic() + self.cooldown
+        self.outcomes.clear()
+        metrics.incr(f"circuit.{self.host}.trips")
+        rprint(f"[red]Circuito de {self.host} abierto ({reason}): pausa de {self.cooldown:.0f}s[/red]")
+        self._report()
+
+
+    def _report(self) -> None:
+
+        metrics.set_gauge(f"circuit.{self.host}.open", 0 if self.state == CLOSED else 1)
+
+
+_lock = threading.Lock()
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def breaker(host: str) -> CircuitBreaker:
+
+    with _lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(
+                host,
+                failure_rate=config.CIRCUIT_FAILURE_RATE,
+                window=config.CIRCUIT_WINDOW,
+                min_requests=config.CIRCUIT_MIN_REQUESTS,
+                cooldown=config.CIRCUIT_COOLDOWN
+            )
+        return _breakers[host]
+
+
+def _breaker_for(url: str):
+
+    host = rate_limit.host_of(url)
+    if not config.CIRCUIT_ENABLED or not host:
+        return None
+    return breaker(host)
+
+
+def wait(url: str) -> None:
+
+    # Bloquea solo a quien va a pedir algo a ese host; el resto de dominios sigue su curso
+    circuit = _breaker_for(url)
+    if circuit is None:
+        return
+    while True:
+        delay = circuit.reserve()
+        if delay <= 0:
+            return
+        if delay > PROBE_POLL:
+            rprint(f"[yellow]Circuito de {circuit.host} abierto, esperando {delay:.0f}s...[/yellow]")
+        metrics.incr(f"circuit.{circuit.host}.wait_s", round(delay, 3))
+        time.sleep(delay)
+
+
+async def wait_async(url: str) -> None:
+
+    circuit = _breaker_for(url)
+    if circuit is None:
+        return
+    while True:
+        delay = circuit.reserve()
+        if delay <= 0:
+            return
+        metrics.incr(f"circuit.{circuit.host}.wait_s", round(delay, 3))
+        await asyncio.sleep(delay)
+
+
+def record(url: str, success: bool) -> None:
+
+    circuit = _breaker_for(url)
+    if circuit is not None:
+        circuit.record(success)
@@ -0,0 +1,277 @@
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Optional, Set
+from rich import print as rprint
+import config
+from core import metrics
+from core.sqlite_store import connect
+
+
+# Coordinación entre nodos: antes de descargar una URL el nodo reclama un lease con caducidad.
+# Mientras trabaja lo renueva; si el nodo cae, el lease caduca y otro puede quedarse la URL
+ACQUIRED = "acquired"
+HELD = "held"
+DONE = "done"
+
+
+class LeaseBackend:
+
+    def acquire(self, key: str, owner: str, ttl: float) -> str:
+
+        raise NotImplementedError
+
+
+    def renew(self, keys: Iterable[str], owner: str, ttl: float) -> None:
+
+        raise NotImplementedError
+
+
+    def release(self, key: str, owner: str, done: bool) -> None:
+
+        raise NotImplementedError
+
+
+    def close(self) -> None:
+
+        pass
+
+
+class SQLiteLeaseBackend(LeaseBackend):
+
+    def __init__(self, db_path: str) -> None:
+        # Base SQLite compartida por todos los nodos (disco común o la misma máquina); el hilo de
+        # renovación también la usa, siempre bajo self._lock
+        self.conn = connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                "key TEXT PRIMARY KEY, owner TEXT, expires_at REAL NOT NULL DEFAULT 0, done INTEGER NOT NULL DEFAULT 0)"
+            )
+
+
+    def acquire(self, key: str, owner: str, ttl: float) -> str:
+
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute("SELECT owner, expires_at, done FROM leases WHERE key = ?", (key,)).fetchone()
+                if row and row[2]:
+                    state = DONE
+                elif row and row[0] != owner and row[1] > now:
+                    state = HELD
+                else:
+                    self.conn.execute(
+                        "INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?) "
+                        "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at",
+                        (key, owner, now + ttl)
+                    )
+                    state = ACQUIRED
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return state
+
+
+    def renew(self, keys: Iterable[str], owner: str, ttl: float) -> None:
+
+        expires_at = time.time() + ttl
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "UPDATE leases SET expires_at = ? WHERE key = ? AND owner = ? AND done = 0",
+                [(expires_at, key, owner) for key in keys]
+            )
+
+
+    def release(self, key: str, owner: str, done: bool) -> None:
+
+        with self._lock, self.conn:
+            if done:
+                self.conn.execute("UPDATE leases SET done = 1, owner = NULL WHERE key = ? AND owner = ?", (key, owner))
+            else:
+                self.conn.execute("DELETE FROM leases WHERE key = ? AND owner = ? AND done = 0", (key, owner))
+
+
+    def close(self) -> None:
+
+        self.conn.close()
+
+
+class FileLockBackend(LeaseBackend):
+
+    def __init__(self, directory: str) -> None:
+        # Un fichero JSON por lease en un directorio compartido; flock serializa las lecturas-escrituras.
+        # fcntl solo existe en Unix: se importa aquí para que los sitios y el backend sqlite carguen en Windows
+        import fcntl
+        self._fcntl = fcntl
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.lock_path = os.path.join(directory, ".lock")
+        self._thread_lock = threading.Lock()
+
+
+    @contextmanager
+    def _locked(self):
+
+        with self._thread_lock, open(self.lock_path, "a") as lock_file:
+            self._fcntl.flock(lock_file, self._fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                self._fcntl.flock(lock_file, self._fcntl.LOCK_UN)
+
+
+    def _path(self, key: str) -> str:
+
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+
+    def _read(self, key: str) -> Optional[dict]:
+
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+
+    def _write(self, key: str, lease: dict) -> None:
+
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": key, **lease}, f)
+        os.replace(tmp_path, path)
+
+
+    def acquire(self, key: str, owner: str, ttl: float) -> str:
+
+        now = time.time()
+        with self._locked():
+            lease = self._read(key)
+            if lease and lease.get("done"):
+                return DONE
+            if lease and lease.get("owner") != owner and lease.get("expires_at", 0) > now:
+                return HELD
+            self._write(key, {"owner": owner, "expires_at": now + ttl})
+            return ACQUIRED
+
+
+    def renew(self, keys: Iterable[str], owner: str, ttl: float) -> None:
+
+        expires_at = time.time() + ttl
+        with self._locked():
+            for key in keys:
+                lease = self._read(key)
+                if lease and lease.get("owner") == owner and not lease.get("done"):
+                    self._write(key, {"owner": owner, "expires_at": expires_at})
+
+
+    def release(self, key: str, owner: str, done: bool) -> None:
+
+        with self._locked():
+            lease = self._read(key)
+            if not lease or lease.get("owner") != owner:
+                return
+            if done:
+                self._write(key, {"done": True})
+            else:
+                os.remove(self._path(key))
+
+
+class LeaseManager:
+
+    def __init__(self, backend: LeaseBackend, crawl: str, owner: str, ttl: float = 120,
+                 poll_interval: float = 5) -> None:
+        self.backend = backend
+        self.crawl = crawl
+        self.owner = owner
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self._held: Set[str] = set()
+        self._lock = threading.Lock()
+
+        # Renovación en segundo plano: el hilo principal puede pasar minutos en una sola página
+        self._stop = threading.Event()
+        self._heartbeat = threading.Thread(target=self._renew_loop, name=f"leases-{crawl}", daemon=True)
+        self._heartbeat.start()
+
+
+    def _key(self, url: str) -> str:
+
+        return f"{self.crawl}:{url}"
+
+
+    def _renew_loop(self) -> None:
+
+        while not self._stop.wait(self.ttl / 3):
+            with self._lock:
+                keys = [self._key(url) for url in self._held]
+            if keys:
+                try:
+                    self.backend.renew(keys, self.owner, self.ttl)
+                except Exception as e:
+                    rprint(f"[red]Error renovando leases: {str(e)[:100]}[/red]")
+
+
+    def acquire(self, url: str) -> str:
+
+        state = self.backend.acquire(self._key(url), self.owner, self.ttl)
+        if state == ACQUIRED:
+            with self._lock:
+                self._held.add(url)
+        metrics.incr(f"leases.{state}")
+        return state
+
+
+    def release(self, url: str, done: bool = True) -> None:
+
+        with self._lock:
+            if url not in self._held:
+                return
+            self._held.discard(url)
+        self.backend.release(self._key(url), self.owner, done)
+
+
+    def close(self) -> None:
+
+        self._stop.set()
+        self._heartbeat.join()
+        with self._lock:
+            held, self._held = list(self._held), set()
+        # Lo que no se terminó vuelve a estar disponible para otros nodos sin esperar a que caduque
+        for url in held:
+            self.backend.release(self._key(url), self.owner, done=False)
+        self.backend.close()
+
+
+def default_node_id() -> str:
+
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def open_lease_manager(site: str) -> Optional[LeaseManager]:
+
+    if not config.COORDINATION_BACKEND:
+        return None
+    # Los nodos solo se excluyen entre sí si comparten el nombre de la crawl; uno derivado de la salida o de
+    # la hora de arranque sería distinto en cada nodo y todos descargarían todo
+    if not config.COORDINATION_CRAWL:
+        raise ValueError("COORDINATION_BACKEND necesita COORDINATION_CRAWL: el mismo nombre de crawl en todos los nodos")
+    if config.COORDINATION_BACKEND == "sqlite":
+        backend = SQLiteLeaseBackend(config.COORDINATION_PATH)
+    elif config.COORDINATION_BACKEND == "filesystem":
+        backend = FileLockBackend(config.COORDINATION_PATH)
+    else:
+        raise ValueError(f"Backend de coordinación no válido: {config.COORDINATION_BACKEND} (opciones: sqlite, filesystem)")
+
+    owner = config.NODE_ID or default_node_id()
+    rprint(f"[cyan]Coordinación {config.COORDINATION_BACKEND} activa: nodo {owner}, crawl {config.COORDINATION_CRAWL}[/cyan]")
+    return LeaseManager(backend, f"{config.COORDINATION_CRAWL}:{site}", owner, ttl=config.LEASE_TTL)
@@ -0,0 +1,77 @@
+import json
+from typing import Any, Dict, Iterable, List, Tuple
+from rich import print as rprint
+import config
+from core.sqlite_store import connect
+
+
+# Caché de fichas compartida entre las categorías de una crawl: cada URL guarda las etiquetas con las
+# que ha aparecido y el registro ya descargado, así una empresa listada en varias categorías se
+# descarga una sola vez y se vuelve a escribir con todas sus etiquetas
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS detail_cache (
+    crawl TEXT NOT NULL,
+    url TEXT NOT NULL,
+    tags TEXT NOT NULL DEFAULT '[]',
+    record TEXT,
+    PRIMARY KEY (crawl, url)
+);
+"""
+
+
+class DetailCache:
+
+    def __init__(self, crawl: str, db_path: str = config.SQLITE_PATH) -> None:
+        self.crawl = crawl
+        self.conn = connect(db_path)
+        self.shared = 0
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+
+
+    def tag(self, urls: Iterable[str], tag: str) -> List[Tuple[Dict[str, Any], List[str]]]:
+
+        # Añade la etiqueta y devuelve (registro, etiquetas) de las URLs ya descargadas que la estrenan:
+        # son las que hay que volver a escribir
+        retagged = []
+        with self.conn:
+            for url in dict.fromkeys(urls):
+                row = self.conn.execute(
+                    "SELECT tags, record FROM detail_cache WHERE crawl = ? AND url = ?", (self.crawl, url)
+                ).fetchone()
+                tags = json.loads(row[0]) if row else []
+                if tag in tags:
+                    continue
+
+                tags.append(tag)
+                self.conn.execute(
+                    "INSERT INTO detail_cache (crawl, url, tags) VALUES (?, ?, ?) "
+                    "ON CONFLICT(crawl, url) DO UPDATE SET tags = excluded.tags",
+                    (self.crawl, url, json.dumps(tags, ensure_ascii=False))
+                )
+                if row and row[1]:
+                    retagged.append((json.loads(row[1]), tags))
+        self.shared += len(retagged)
+        return retagged
+
+
+    def store(self, url: str, record: Dict[str, Any]) -> List[str]:
+
+        # Guarda el registro descargado y devuelve las etiquetas que tiene hasta ahora
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO detail_cache (crawl, url, record) VALUES (?, ?, ?) "
+                "ON CONFLICT(crawl, url) DO UPDATE SET record = excluded.record",
+                (self.crawl, url, json.dumps(record, ensure_ascii=False))
+            )
+            row = self.conn.execute(
+                "SELECT tags FROM detail_cache WHERE crawl = ? AND url = ?", (self.crawl, url)
+            ).fetchone()
+        return json.loads(row[0])
+
+
+    def close(self) -> None:
+
+        if self.shared:
+            rprint(f"[cyan]Caché de fichas: {self.shared} empresas reaprovechadas de otra categoría[/cyan]")
+        self.conn.close()
@@ -0,0 +1,184 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from playwright.sync_api import Page
+from rich import print as rprint
+from core import html_dom
+from core.html_dom import Element
+
+
+# Especificación declarativa de un registro: {"fields": {campo: regla}} o, si el sitio
+# tiene varias maquetaciones, {"variants": [{"name", "when", "fields"}, ...]} (gana la
+# primera cuyo selector "when" exista; una variante sin "when" es la de por defecto).
+#
+# Claves de una regla:
+#   selector   CSS del elemento (querySelector, primer match)
+#   attr       atributo a leer; sin él se usa innerText
+#   label      texto de la celda etiqueta (sustituye a :has-text, que solo entiende Playwright);
+#              se combina con label_selector, value_selector (hermano inmediato) y sub
+#   parts      lista de reglas cuyos valores se unen con join (", " por defecto)
+#   require    selector que tiene que existir para que la regla tenga valor
+#   fallbacks  reglas alternativas si esta no da valor
+#   template   formato del valor, p. ej. "{} USD"
+#   default    valor si no se encuentra nada ("N/A" por defecto)
+#
+# Los selectores se limitan a etiqueta, #id, .clase, [attr], [attr="v"], [attr^="v"],
+# [attr*="v"], descendiente, ">", "+" y grupos con "," para poder evaluarlos también fuera
+# del navegador (extract_html, sobre core.html_dom).
+#
+# Los selectores se resuelven dentro de una raíz: el documento para una ficha o cada elemento
+# de una lista (p. ej. las tarjetas de un listado) con extract_all.
+
+_EXTRACT_FROM_JS = r'''
+(root, spec) => {
+    const valueOf = (el, rule) => {
+        if (!el) return null;
+        const raw = rule.attr ? el.getAttribute(rule.attr) : el.innerText;
+        const value = (raw || '').trim();
+        if (!value) return null;
+        return rule.template ? rule.template.replace('{}', value) : value;
+    };
+
+    const findByLabel = (rule) => {
+        const wanted = rule.label.toLowerCase();
+        for (const labelEl of root.querySelectorAll(rule.label_selector)) {
+            const text = (labelEl.textContent || '').replace(/\s+/g, ' ').toLowerCase();
+            if (!text.includes(wanted)) continue;
+            const valueEl = labelEl.nextElementSibling;
+            if (!valueEl || !valueEl.matches(rule.value_selector)) continue;
+            const target = rule.sub ? valueEl.querySelector(rule.sub) : valueEl;
+            if (target) return target;
+        }
+        return null;
+    };
+
+    const resolve = (rule) => {
+        if (rule.require && !root.querySelector(rule.require)) return null;
+
+        let value = null;
+        if (rule.parts) {
+            const parts = rule.parts.map(resolve).filter(Boolean);
+            value = parts.length ? parts.join(rule.join ?? ', ') : null;
+        } else {
+            const el = rule.label ? findByLabel(rule) : root.querySelector(rule.selector);
+            value = valueOf(el, rule);
+        }
+
+        for (const fallback of (value === null ? rule.fallbacks || [] : [])) {
+            value = resolve(fallback);
+            if (value !== null) break;
+        }
+        return value;
+    };
+
+    const variants = spec.variants || [spec];
+    const variant = variants.find(v => !v.when || root.querySelector(v.when)) || variants[variants.length - 1];
+
+    const record = {};
+    for (const [name, rule] of Object.entries(variant.fields)) {
+        record[name] = resolve(rule) ?? (rule.default ?? 'N/A');
+    }
+    return {variant: variant.name || null, record};
+}
+'''
+
+EXTRACT_JS = "(spec) => (" + _EXTRACT_FROM_JS + ")(document, spec)"
+
+# Un registro por elemento en una sola evaluación: para eval_on_selector_all...
+EXTRACT_EACH_JS = "(elements, spec) => elements.map(el => (" + _EXTRACT_FROM_JS + ")(el, spec).record)"
+
+# ...y lo mismo con el selector dentro del script, para page.evaluate (motor async)
+EXTRACT_ALL_JS = (
+    "({selector, spec}) => Array.from(document.querySelectorAll(selector))"
+    ".map(el => (" + _EXTRACT_FROM_JS + ")(el, spec).record)"
+)
+
+
+def extract(page: Page, spec: Dict[str, Any]) -> Dict[str, str]:
+
+    # Una sola ida y vuelta a Chromium por registro, en lugar de una por campo
+    result = page.evaluate(EXTRACT_JS, spec)
+    if result["variant"]:
+        rprint(f"[cyan]Formato detectado: {result['variant']}[/cyan]")
+    return result["record"]
+
+
+def extract_all(page: Page, selector: str, spec: Dict[str, Any]) -> List[Dict[str, str]]:
+
+    # Todos los elementos de selector (tarjetas de un listado) en una sola ida y vuelta
+    return page.eval_on_selector_all(selector, EXTRACT_EACH_JS, spec)
+
+
+def _value_of(element: Optional[Element], rule: Dict[str, Any]) -> Optional[str]:
+
+    if element is None:
+        return None
+    raw = element.get(rule["attr"]) if rule.get("attr") else element.inner_text()
+    value = (raw or "").strip()
+    if not value:
+        return None
+    return rule["template"].replace("{}", value, 1) if rule.get("template") else value
+
+
+def _find_by_label(document: Element, rule: Dict[str, Any]) -> Optional[Element]:
+
+    wanted = rule["label"].lower()
+    for label in document.select(rule["label_selector"]):
+        if wanted not in re.sub(r"\s+", " ", label.text_content()).lower():
+            continue
+        value = label.next_element_sibling
+        if value is None or not value.matches(rule["value_selector"]):
+            continue
+        target = value.select_one(rule["sub"]) if rule.get("sub") else value
+        if target is not None:
+            return target
+    return None
+
+
+def _resolve(document: Element, rule: Dict[str, Any]) -> Optional[str]:
+
+    if rule.get("require") and document.select_one(rule["require"]) is None:
+        return None
+
+    if rule.get("parts"):
+        parts = [part for part in (_resolve(document, r) for r in rule["parts"]) if part]
+        value = rule.get("join", ", ").join(parts) if parts else None
+    else:
+        element = _find_by_label(document, rule) if rule.get("label") else document.select_one(rule["selector"])
+        value = _value_of(element, rule)
+
+    for fallback in (rule.get("fallbacks", []) if value is None else []):
+        value = _resolve(document, fallback)
+        if value is not None:
+            break
+    return value
+
+
+def evaluate_html(document: Element, spec: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, str]]:
+
+    # Misma semántica que EXTRACT_JS, sobre el DOM de core.html_dom
+    variants = spec.get("variants") or [spec]
+    variant = next(
+        (v for v in variants if not v.get("when") or document.select_one(v["when"]) is not None),
+        variants[-1]
+    )
+    record = {}
+    for name, rule in variant["fields"].items():
+        value = _resolve(document, rule)
+        record[name] = value if value is not None else rule.get("default", "N/A")
+    return variant.get("name"), record
+
+
+def extract_html(html: str, spec: Dict[str, Any]) -> Dict[str, str]:
+
+    variant, record = evaluate_html(html_dom.parse(html), spec)
+    if variant:
+        rprint(f"[cyan]Formato detectado: {variant}[/cyan]")
+    return record
+
+
+def label_rule(label: str, label_selector: str, value_selector: str, sub: str = None) -> Dict[str, Any]:
+
+    rule = {"label": label, "label_selector": label_selector, "value_selector": value_selector}
+    if sub:
+        rule["sub"] = sub
+    return rule
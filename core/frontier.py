@@ -0,0 +1,212 @@
+import time
+from typing import Dict, Iterable, List, Optional
+from rich import print as rprint
+import config
+from core import coordination
+from core.coordination import LeaseManager
+from core.sqlite_store import connect
+
+
+# Estados de una URL en la frontera
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+STATES = (PENDING, IN_FLIGHT, DONE, FAILED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    crawl TEXT NOT NULL,
+    url TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    priority INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    parent TEXT,
+    enqueued_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (crawl, url)
+);
+CREATE INDEX IF NOT EXISTS idx_frontier_claim ON frontier (crawl, kind, state, priority DESC, enqueued_at);
+"""
+
+
+class Frontier:
+
+    def __init__(self, crawl: str, db_path: str = config.SQLITE_PATH, leases: Optional[LeaseManager] = None) -> None:
+        # Una "crawl" es una ejecución de un sitio (el nombre de su fichero de salida):
+        # --resume continúa la misma y una ejecución nueva empieza con la frontera vacía
+        self.crawl = crawl
+        self.db_path = db_path
+        # Con varios nodos, cada URL reclamada necesita además un lease del backend compartido
+        self.leases = leases
+        self.conn = connect(db_path)
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+
+
+    def enqueue(self, urls: Iterable[str], kind: str, priority: int = 0, parent: Optional[str] = None) -> List[str]:
+
+        # Deduplicación al encolar: una URL ya presente en la crawl no se vuelve a añadir.
+        # Devuelve las URLs que sí han entrado
+        now = time.time()
+        queued = []
+        with self.conn:
+            for url in dict.fromkeys(urls):
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO frontier (crawl, url, kind, priority, parent, enqueued_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (self.crawl, url, kind, priority, parent, now, now)
+                )
+                if cursor.rowcount:
+                    queued.append(url)
+        return queued
+
+
+    def claim(self, kind: str, limit: int = 1) -> List[str]:
+
+        while True:
+            urls = self._claim_local(kind, limit)
+            if self.leases is None or not urls:
+                return urls
+
+            acquired, held = [], 0
+            for url in urls:
+                if self.lease(url):
+                    acquired.append(url)
+                elif self.state_of(url) == IN_FLIGHT:
+                    # La tiene otro nodo: vuelve a la cola detrás de las demás por si ese nodo cae
+                    self.release(url)
+                    held += 1
+            if acquired:
+                return acquired
+            if held:
+                rprint(f"[yellow]Frontera: {held} URLs en manos de otros nodos, esperando {self.leases.poll_interval}s...[/yellow]")
+                time.sleep(self.leases.poll_interval)
+
+
+    def lease(self, url: str) -> bool:
+
+        # True si este nodo puede procesar la URL; si otro nodo ya la terminó, aquí también queda hecha
+        if self.leases is None:
+            return True
+        state = self.leases.acquire(url)
+        if state == coordination.DONE:
+            self._set_state(url, DONE)
+        return state == coordination.ACQUIRED
+
+
+    def try_acquire(self, url: str) -> bool:
+
+        # Reclama el lease de la URL y lo retiene hasta complete, fail o drop_lease; no toca la base
+        # local, así que vale desde el hilo de listados
+        return self.leases is None or self.leases.acquire(url) == coordination.ACQUIRED
+
+
+    def drop_lease(self, url: str) -> None:
+
+        # Devuelve a los demás nodos un lease de try_acquire que al final no se usó
+        if self.leases is not None:
+            self.leases.release(url, done=False)
+
+
+    def _claim_local(self, kind: str, limit: int) -> List[str]:
+
+        # BEGIN IMMEDIATE: dos workers sobre la misma base no pueden reclamar las mismas filas
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            urls = [url for (url,) in self.conn.execute(
+                "SELECT url FROM frontier WHERE crawl = ? AND kind = ? AND state = ? "
+                "ORDER BY priority DESC, enqueued_at, rowid LIMIT ?",
+                (self.crawl, kind, PENDING, limit)
+            )]
+            self.conn.executemany(
+                "UPDATE frontier SET state = ?, attempts = attempts + 1, updated_at = ? WHERE crawl = ? AND url = ?",
+                [(IN_FLIGHT, now, self.crawl, url) for url in urls]
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return urls
+
+
+    def _set_state(self, url: str, state: str, error: Optional[str] = None) -> None:
+
+        with self.conn:
+            self.conn.execute(
+                "UPDATE frontier SET state = ?, last_error = ?, updated_at = ? WHERE crawl = ? AND url = ?",
+                (state, error, time.time(), self.crawl, url)
+            )
+
+
+    def complete(self, url: str) -> None:
+
+        self._set_state(url, DONE)
+        if self.leases is not None:
+            self.leases.release(url, done=True)
+
+
+    def fail(self, url: str, error: str) -> None:
+
+        # Los reintentos ya los ha gastado core.retry: aquí el fallo es definitivo para esta crawl
+        self._set_state(url, FAILED, error[:500])
+        if self.leases is not None:
+            # Sin marcar como hecha: otro nodo puede intentarlo
+            self.leases.release(url, done=False)
+
+
+    def release(self, url: str) -> None:
+
+        with self.conn:
+            self.conn.execute(
+                "UPDATE frontier SET state = ?, priority = priority - 1, updated_at = ? WHERE crawl = ? AND url = ?",
+                (PENDING, time.time(), self.crawl, url)
+            )
+
+
+    def recover(self) -> int:
+
+        # URLs que quedaron en vuelo por una caída del proceso vuelven a pendientes
+        with self.conn:
+            cursor = self.conn.execute(
+                "UPDATE frontier SET state = ?, updated_at = ? WHERE crawl = ? AND state = ?",
+                (PENDING, time.time(), self.crawl, IN_FLIGHT)
+            )
+        if cursor.rowcount:
+            rprint(f"[yellow]Frontera: {cursor.rowcount} URLs en vuelo recuperadas como pendientes[/yellow]")
+        return cursor.rowcount
+
+
+    def state_of(self, url: str) -> Optional[str]:
+
+        row = self.conn.execute(
+            "SELECT state FROM frontier WHERE crawl = ? AND url = ?", (self.crawl, url)
+        ).fetchone()
+        return row[0] if row else None
+
+
+    def counts(self, kind: Optional[str] = None) -> Dict[str, int]:
+
+        query = "SELECT state, COUNT(*) FROM frontier WHERE crawl = ?"
+        params = [self.crawl]
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        counts = {state: 0 for state in STATES}
+        counts.update(dict(self.conn.execute(query + " GROUP BY state", params).fetchall()))
+        return counts
+
+
+    def close(self) -> None:
+
+        counts = self.counts()
+        rprint(
+            f"[cyan]Frontera {self.crawl}: {counts[DONE]} completadas, {counts[FAILED]} fallidas, "
+            f"{counts[PENDING] + counts[IN_FLIGHT]} pendientes[/cyan]"
+        )
+        if self.leases is not None:
+            self.leases.close()
+        self.conn.close()
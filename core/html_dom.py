@@ -0,0 +1,307 @@
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+
+# DOM mínimo sobre html.parser para evaluar fuera del navegador el mismo subconjunto de CSS
+# que usan las especificaciones de core.extraction
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "source", "track", "wbr",
+}
+
+# Etiquetas que el navegador cierra solas al abrir otra: la apertura cierra el elemento abierto más cercano
+# del primer grupo, con todo lo que siga abierto dentro, sin pasar de los contenedores del segundo grupo
+SCOPE_TAGS = {"table", "td", "th", "caption", "button", "template"}
+TABLE_SECTIONS = {"thead", "tbody", "tfoot"}
+IMPLICIT_CLOSE = {
+    "p": ({"p"}, SCOPE_TAGS),
+    "li": ({"li"}, SCOPE_TAGS | {"ul", "ol"}),
+    "dt": ({"dt", "dd"}, SCOPE_TAGS | {"dl"}),
+    "dd": ({"dt", "dd"}, SCOPE_TAGS | {"dl"}),
+    "thead": (TABLE_SECTIONS, {"table"}),
+    "tbody": (TABLE_SECTIONS, {"table"}),
+    "tfoot": (TABLE_SECTIONS, {"table"}),
+    "tr": ({"tr"}, TABLE_SECTIONS | {"table"}),
+    "td": ({"td", "th"}, {"tr", "table"}),
+    "th": ({"td", "th"}, {"tr", "table"}),
+    "option": ({"option"}, {"select", "optgroup", "datalist"}),
+}
+
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "footer",
+    "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav",
+    "ol", "p", "section", "table", "tr", "ul",
+}
+
+HIDDEN_TAGS = {"script", "style", "noscript", "template", "head"}
+
+
+class Element:
+
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: Optional["Element"] = None) -> None:
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children: List[object] = []
+
+
+    @property
+    def classes(self) -> List[str]:
+
+        return self.attrs.get("class", "").split()
+
+
+    def get(self, name: str) -> Optional[str]:
+
+        return self.attrs.get(name)
+
+
+    def elements(self) -> List["Element"]:
+
+        return [child for child in self.children if isinstance(child, Element)]
+
+
+    def iter(self):
+
+        for child in self.elements():
+            yield child
+            yield from child.iter()
+
+
+    @property
+    def next_element_sibling(self) -> Optional["Element"]:
+
+        if self.parent is None:
+            return None
+        siblings = self.parent.elements()
+        index = next(i for i, sibling in enumerate(siblings) if sibling is self)
+        return siblings[index + 1] if index + 1 < len(siblings) else None
+
+
+    @property
+    def previous_element_sibling(self) -> Optional["Element"]:
+
+        if self.parent is None:
+            return None
+        siblings = self.parent.elements()
+        index = next(i for i, sibling in enumerate(siblings) if sibling is self)
+        return siblings[index - 1] if index > 0 else None
+
+
+    def text_content(self) -> str:
+
+        return "".join(child if isinstance(child, str) else child.text_content() for child in self.children)
+
+
+    def inner_text(self) -> str:
+
+        # Aproximación de innerText: sin scripts ni estilos, espacios colapsados y saltos en bloques
+        chunks: List[str] = []
+        self._collect_text(chunks)
+        lines = (re.sub(r"\s+", " ", line).strip() for line in "".join(chunks).split("\n"))
+        return "\n".join(line for line in lines if line)
+
+
+    def _collect_text(self, chunks: List[str]) -> None:
+
+        for child in self.children:
+            if isinstance(child, str):
+                chunks.append(child.replace("\n", " "))
+            elif child.tag not in HIDDEN_TAGS:
+                if child.tag in BLOCK_TAGS:
+                    chunks.append("\n")
+                child._collect_text(chunks)
+                if child.tag in BLOCK_TAGS:
+                    chunks.append("\n")
+                elif child.tag in ("td", "th"):
+                    chunks.append("\t")
+
+
+    def select_one(self, selector: str) -> Optional["Element"]:
+
+        groups = parse_selector(selector)
+        for element in self.iter():
+            if any(_matches(element, group) for group in groups):
+                return element
+        return None
+
+
+    def select(self, selector: str) -> List["Element"]:
+
+        groups = parse_selector(selector)
+        return [element for element in self.iter() if any(_matches(element, group) for group in groups)]
+
+
+    def matches(self, selector: str) -> bool:
+
+        return any(_matches(self, group) for group in parse_selector(selector))
+
+
+    def __repr__(self) -> str:
+
+        return f"<{self.tag} {self.attrs}>"
+
+
+class _TreeBuilder(HTMLParser):
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.root = Element("#document", {})
+        self.stack: List[Element] = [self.root]
+
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+
+        if tag in IMPLICIT_CLOSE:
+            closes, boundary = IMPLICIT_CLOSE[tag]
+            for i in range(len(self.stack) - 1, 0, -1):
+                if self.stack[i].tag in closes:
+                    del self.stack[i:]
+                    break
+                if self.stack[i].tag in boundary:
+                    break
+
+        parent = self.stack[-1]
+        element = Element(tag, {name: value or "" for name, value in attrs}, parent)
+        parent.children.append(element)
+        if tag not in VOID_TAGS:
+            self.stack.append(element)
+
+
+    def handle_startendtag(self, tag: str, attrs) -> None:
+
+        parent = self.stack[-1]
+        parent.children.append(Element(tag, {name: value or "" for name, value in attrs}, parent))
+
+
+    def handle_endtag(self, tag: str) -> None:
+
+        # Cierre sin apertura: se ignora, como hace el navegador
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                return
+
+
+    def handle_data(self, data: str) -> None:
+
+        self.stack[-1].children.append(data)
+
+
+def parse(html: str) -> Element:
+
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+# Selector compuesto: (etiqueta, id, clases, [(atributo, operador, valor)])
+Compound = Tuple[Optional[str], Optional[str], List[str], List[Tuple[str, Optional[str], Optional[str]]]]
+
+_TOKEN = re.compile(
+    r'\s*([>+])\s*'
+    r'|(\s+)'
+    r'|([a-zA-Z][\w-]*|\*)'
+    r'|#([\w-]+)'
+    r'|\.([\w-]+)'
+    r'|\[\s*([\w-]+)\s*(?:([\^*$]?=)\s*(?:"([^"]*)"|\'([^\']*)\'|([^\]\s]+)))?\s*\]'
+)
+
+_cache: Dict[str, List[List[Tuple[str, Compound]]]] = {}
+
+
+def parse_selector(selector: str) -> List[List[Tuple[str, Compound]]]:
+
+    if selector in _cache:
+        return _cache[selector]
+
+    groups = []
+    for group in selector.split(","):
+        group = group.strip()
+        parts: List[Tuple[str, Compound]] = []
+        combinator = " "
+        tag, id_, classes, attrs = None, None, [], []
+        pos = 0
+
+        def flush():
+            nonlocal tag, id_, classes, attrs
+            if tag or id_ or classes or attrs:
+                parts.append((combinator, (tag, id_, classes, attrs)))
+            tag, id_, classes, attrs = None, None, [], []
+
+        while pos < len(group):
+            match = _TOKEN.match(group, pos)
+            if not match or match.end() == pos:
+                raise ValueError(f"Selector no soportado fuera del navegador: {selector}")
+            pos = match.end()
+
+            if match.group(1) or match.group(2):
+                flush()
+                combinator = match.group(1) or " "
+            elif match.group(3):
+                tag = None if match.group(3) == "*" else match.group(3).lower()
+            elif match.group(4):
+                id_ = match.group(4)
+            elif match.group(5):
+                classes.append(match.group(5))
+            else:
+                value = next((v for v in match.group(8, 9, 10) if v is not None), None)
+                attrs.append((match.group(6).lower(), match.group(7), value))
+        flush()
+        groups.append(parts)
+
+    _cache[selector] = groups
+    return groups
+
+
+def _matches_compound(element: Element, compound: Compound) -> bool:
+
+    tag, id_, classes, attrs = compound
+    if tag and element.tag != tag:
+        return False
+    if id_ and element.attrs.get("id") != id_:
+        return False
+    if classes and not set(classes) <= set(element.classes):
+        return False
+    for name, op, value in attrs:
+        actual = element.attrs.get(name)
+        if actual is None:
+            return False
+        if op == "=" and actual != value:
+            return False
+        if op == "^=" and not actual.startswith(value):
+            return False
+        if op == "$=" and not actual.endswith(value):
+            return False
+        if op == "*=" and value not in actual:
+            return False
+    return True
+
+
+def _matches(element: Element, parts: List[Tuple[str, Compound]], index: Optional[int] = None) -> bool:
+
+    # Se evalúa de derecha a izquierda, como los motores de CSS
+    if index is None:
+        index = len(parts) - 1
+    combinator, compound = parts[index]
+    if not _matches_compound(element, compound):
+        return False
+    if index == 0:
+        return True
+
+    if combinator == ">":
+        parent = element.parent
+        return parent is not None and parent.tag != "#document" and _matches(parent, parts, index - 1)
+    if combinator == "+":
+        previous = element.previous_element_sibling
+        return previous is not None and _matches(previous, parts, index - 1)
+
+    ancestor = element.parent
+    while ancestor is not None and ancestor.tag != "#document":
+        if _matches(ancestor, parts, index - 1):
+            return True
+        ancestor = ancestor.parent
+    return False
@@ -0,0 +1,98 @@
+import random
+import time
+from typing import Any, Dict, List, Optional, Sequence
+from playwright.sync_api import Playwright
+from rich import print as rprint
+from core import circuit
+from core import extraction
+from core import html_dom
+from core import metrics
+from core import rate_limit
+from core import throttle
+from core.html_dom import Element
+
+
+class HttpFetcher:
+
+    def __init__(self, playwright: Playwright, user_agents: List[str], name: str = "http",
+                 required: Sequence[str] = ("nombre",), blocked_when: Optional[str] = None,
+                 timeout: int = 30000) -> None:
+        # Un único APIRequestContext para todo el run: conexiones y cookies se reutilizan entre peticiones
+        self.request = playwright.request.new_context(
+            user_agent=random.choice(user_agents),
+            ignore_https_errors=True,
+            extra_http_headers={
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                "Accept-Language": "es-ES,es;q=0.9",
+            }
+        )
+        self.name = name
+        self.required = tuple(required)
+        self.blocked_when = blocked_when
+        self.timeout = timeout
+
+
+    def _escalate(self, url: str, reason: str) -> None:
+
+        metrics.incr(f"{self.name}.http_escalated")
+        rprint(f"[yellow]  ↑ Respuesta HTTP insuficiente ({reason}), se usa el navegador[/yellow]")
+
+
+    def fetch(self, url: str) -> Optional[Element]:
+
+        circuit.wait(url)
+        rate_limit.acquire(url)
+        started = time.monotonic()
+        try:
+            response = self.request.get(url, timeout=self.timeout, fail_on_status_code=False)
+        except Exception as e:
+            throttle.record(url, failure="timeout" if "timeout" in str(e).lower() or "timed out" in str(e).lower() else "error de red")
+            self._escalate(url, f"error: {str(e)[:60]}")
+            return None
+        latency = time.monotonic() - started
+
+        if response.status != 200:
+            throttle.record(url, status=response.status, latency=latency)
+            self._escalate(url, f"HTTP {response.status}")
+            return None
+
+        if "html" not in response.headers.get("content-type", "html"):
+            self._escalate(url, response.headers.get("content-type"))
+            return None
+
+        document = html_dom.parse(response.text())
+        if self.blocked_when and document.select_one(self.blocked_when) is not None:
+            throttle.record(url, failure="página de bloqueo")
+            self._escalate(url, "página de bloqueo")
+            return None
+
+        throttle.record(url, status=response.status, latency=latency)
+        return document
+
+
+    def extract(self, url: str, spec: Dict[str, Any]) -> Optional[Dict[str, str]]:
+
+        # None indica que la URL tiene que pasar por el navegador
+        document = self.fetch(url)
+        if document is None:
+            return None
+
+        variant, record = extraction.evaluate_html(document, spec)
+        missing = [field for field in self.required if record.get(field, "N/A") == "N/A"]
+        if missing:
+            self._escalate(url, f"faltan {', '.join(missing)}")
+            return None
+
+        if variant:
+            rprint(f"[cyan]Formato detectado: {variant}[/cyan]")
+        metrics.incr(f"{self.name}.http_pages")
+        return record
+
+
+    def close(self) -> None:
+
+        values = metrics.snapshot()
+        pages = int(values.get(f"{self.name}.http_pages", 0))
+        escalated = int(values.get(f"{self.name}.http_escalated", 0))
+        rprint(f"[cyan]Ruta HTTP: {pages} páginas sin navegador, {escalated} derivadas al navegador[/cyan]")
+        self.request.dispose()
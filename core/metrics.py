@@ -0,0 +1,50 @@
+import logging
+import threading
+from typing import Dict
+from rich import print as rprint
+
+
+# Contadores y valores del run en curso, compartidos por todos los módulos del proceso
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+_gauges: Dict[str, float] = {}
+
+
+def incr(name: str, value: float = 1) -> None:
+
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def set_gauge(name: str, value: float) -> None:
+
+    with _lock:
+        _gauges[name] = value
+
+
+def snapshot() -> Dict[str, float]:
+
+    with _lock:
+        return {**_counters, **_gauges}
+
+
+def reset() -> None:
+
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+
+
+def report(title: str) -> None:
+
+    values = snapshot()
+    if not values:
+        return
+
+    rprint(f"[blue]Métricas de {title}:[/blue]")
+    for name in sorted(values):
+        value = values[name]
+        text = f"{value:.2f}" if isinstance(value, float) and not value.is_integer() else f"{int(value)}"
+        rprint(f"[cyan]  {name}:[/cyan] {text}")
+
+    logging.info(f"Métricas {title}: {values}")
@@ -0,0 +1,105 @@
+import time
+from typing import Optional
+from playwright.sync_api import Page, Response, TimeoutError as PlaywrightTimeoutError
+import config
+from core import circuit
+from core import rate_limit
+from core import throttle
+from core.retry import PageNotFound, PageStructureError, TransientError
+
+
+class BlockedPage(TransientError):
+    pass
+
+
+class PageNotReady(TransientError):
+    pass
+
+
+# Eventos de carga de Playwright, del más temprano al más tardío
+WAIT_UNTIL_OPTIONS = ("commit", "domcontentloaded", "load", "networkidle")
+
+
+class WaitPolicy:
+
+    def __init__(self, wait_until: str = "domcontentloaded", selector: Optional[str] = None,
+                 timeout: int = 60000, selector_timeout: int = 30000, blocked_when: Optional[str] = None,
+                 client_rendered: bool = False) -> None:
+        if wait_until not in WAIT_UNTIL_OPTIONS:
+            raise ValueError(f"wait_until no válido: {wait_until} (opciones: {', '.join(WAIT_UNTIL_OPTIONS)})")
+
+        self.wait_until = wait_until
+        self.selector = selector
+        self.timeout = timeout
+        self.selector_timeout = selector_timeout
+        # Selector que solo aparece en la página de bloqueo del sitio
+        self.blocked_when = blocked_when
+        # La app pinta el contenido en el navegador (Angular, React...): que falte el selector puede ser
+        # solo lentitud, no una página distinta
+        self.client_rendered = client_rendered
+
+
+    def with_wait_until(self, wait_until: str) -> "WaitPolicy":
+
+        return WaitPolicy(wait_until, self.selector, self.timeout, self.selector_timeout, self.blocked_when,
+                          self.client_rendered)
+
+
+    def __repr__(self) -> str:
+
+        return f"WaitPolicy({self.wait_until!r}, selector={self.selector!r})"
+
+
+def goto(page: Page, url: str, policy: WaitPolicy) -> Optional[Response]:
+
+    # WAIT_UNTIL en el entorno fuerza el mismo evento para todos los sitios (útil para comparar)
+    wait_until = config.WAIT_UNTIL or policy.wait_until
+    circuit.wait(url)
+    rate_limit.acquire(url)
+
+    started = time.monotonic()
+    try:
+        response = page.goto(url, wait_until=wait_until, timeout=policy.timeout)
+    except PlaywrightTimeoutError:
+        throttle.record(url, failure="timeout")
+        raise
+    except Exception:
+        throttle.record(url, failure="error de red")
+        raise
+    latency = time.monotonic() - started
+
+    if policy.blocked_when and page.query_selector(policy.blocked_when):
+        throttle.record(url, failure="página de bloqueo")
+        raise BlockedPage(url)
+
+    throttle.record(url, status=response.status if response else None, latency=latency)
+    return response
+
+
+def raise_for_status(response: Optional[Response], url: str) -> None:
+
+    # 404/410 no se arreglan reintentando; 429 y 5xx sí
+    if response is None:
+        return
+    if response.status in (404, 410):
+        raise PageNotFound(f"HTTP {response.status}: {url}")
+    if response.status == 429 or response.status >= 500:
+        raise TransientError(f"HTTP {response.status}: {url}")
+
+
+def wait_ready(page: Page, policy: WaitPolicy) -> None:
+
+    if policy.selector:
+        try:
+            page.wait_for_selector(policy.selector, timeout=policy.selector_timeout)
+        except PlaywrightTimeoutError:
+            raise selector_missing(policy, page.url, page.evaluate("document.readyState"))
+
+
+def selector_missing(policy: WaitPolicy, url: str, ready_state: str) -> Exception:
+
+    # Si el documento no terminó de cargar o lo pinta una app en el cliente, se reintenta; una página
+    # ya cargada sin el selector no tiene la estructura esperada (ficha borrada, maquetación distinta...)
+    if policy.client_rendered or ready_state != "complete":
+        return PageNotReady(f"No aparece {policy.selector} en {url} (documento: {ready_state})")
+    return PageStructureError(f"No aparece {policy.selector} en {url}")
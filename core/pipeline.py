@@ -0,0 +1,113 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from playwright.sync_api import BrowserContext, sync_playwright
+import config
+from core import metrics
+from core.browser_pool import ContextPool
+from core.session_state import SessionState
+
+
+# Pipeline listado → fichas: un hilo productor recorre la paginación y deja cada página de listado
+# en una cola acotada; el hilo principal consume la cola y descarga las fichas. Con la cola llena el
+# productor se detiene (backpressure), así nunca se adelanta más de PIPELINE_PREFETCH páginas
+_END = object()
+
+
+class ListingPrefetcher:
+
+    def __init__(self, produce: Callable[[], Iterator[Dict[str, Any]]], name: str,
+                 maxsize: int = config.PIPELINE_PREFETCH) -> None:
+        self.name = name
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, maxsize))
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, args=(produce,), name=f"listados-{name}", daemon=True)
+        self._thread.start()
+
+
+    def _put(self, item: Any) -> bool:
+
+        started = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=1)
+                metrics.incr(f"pipeline.{self.name}.producer_wait_s", round(time.monotonic() - started, 3))
+                metrics.set_gauge(f"pipeline.{self.name}.queue", self._queue.qsize())
+                return True
+            except queue.Full:
+                continue
+        return False
+
+
+    def _run(self, produce: Callable[[], Iterator[Dict[str, Any]]]) -> None:
+
+        # El generador se crea, recorre y cierra en este hilo: los objetos sync de Playwright
+        # que abra dentro no pueden tocarse desde otro
+        listings = produce()
+        try:
+            for listing in listings:
+                if not self._put(listing):
+                    break
+                metrics.incr(f"pipeline.{self.name}.listings")
+        except BaseException as e:
+            self._error = e
+        finally:
+            listings.close()
+            self._put(_END)
+
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+
+        while True:
+            started = time.monotonic()
+            item = self._queue.get()
+            metrics.incr(f"pipeline.{self.name}.consumer_wait_s", round(time.monotonic() - started, 3))
+            if item is _END:
+                if self._error is not None:
+                    raise self._error
+                return
+            yield item
+
+
+    def close(self) -> None:
+
+        self._stop.set()
+        # Vaciar la cola desbloquea a un productor que esté esperando hueco
+        while self._thread.is_alive():
+            try:
+                self._queue.get(timeout=1)
+            except queue.Empty:
+                pass
+        self._thread.join()
+
+
+@contextmanager
+def listing_browser(user_agents: List[str], launch_options: Optional[Dict[str, Any]] = None,
+                    on_new_context: Optional[Callable[[BrowserContext], None]] = None,
+                    session: Optional[SessionState] = None):
+
+    # Navegador propio del productor, independiente del que usan las fichas
+    playwright = sync_playwright().start()
+    browser = None
+    pool = None
+    try:
+        browser = playwright.chromium.launch(**{"headless": True, "timeout": 60000, **(launch_options or {})})
+        pool = ContextPool(
+            browser,
+            user_agents,
+            size=1,
+            max_uses=config.CONTEXT_MAX_USES,
+            ua_policy=config.UA_ROTATION,
+            on_new_context=on_new_context,
+            session=session
+        )
+        yield pool
+    finally:
+        if pool is not None:
+            pool.close()
+        if browser is not None:
+            browser.close()
+        playwright.stop()
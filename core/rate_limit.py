@@ -0,0 +1,138 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+from rich import print as rprint
+import config
+from core import metrics
+
+
+# Límite de peticiones por host compartido por todo el proceso: las 34 categorías de
+# paginasamarillas, el motor async y la ruta HTTP tiran del mismo cubo de www.paginasamarillas.es
+
+class TokenBucket:
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.base_rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+
+    def reserve(self) -> float:
+
+        # Reserva un turno y devuelve cuánto hay que esperar; los tokens pueden quedar en negativo,
+        # así cada llamada concurrente recibe su propio hueco en lugar de competir por el mismo
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+    def set_rate(self, rate: float) -> None:
+
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.rate = rate
+
+
+def parse_host_limits(value: str) -> Dict[str, Tuple[float, int]]:
+
+    # "www.axesor.es=0.2:1,www.paginasamarillas.es=0.5:2" -> {host: (rate, burst)}; rate 0 = sin límite
+    limits = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        host, spec = item.split("=", 1)
+        rate, _, burst = spec.partition(":")
+        try:
+            rate, burst = float(rate), int(burst or config.RATE_LIMIT_BURST)
+        except ValueError:
+            raise ValueError(f"RATE_LIMIT_HOSTS no válido en '{item}' (formato host=rps:ráfaga)")
+        if rate < 0:
+            raise ValueError(f"RATE_LIMIT_HOSTS no válido en '{item}': el ritmo no puede ser negativo")
+        limits[host.strip().lower()] = (rate, burst)
+    return limits
+
+
+_lock = threading.Lock()
+_buckets: Dict[str, TokenBucket] = {}
+_overrides: Dict[str, Tuple[float, int]] = parse_host_limits(config.RATE_LIMIT_HOSTS)
+# Número de procesos que se reparten el límite de los mismos hosts: los shards de un sitio en el modo
+# supervisor de main.py (los demás sitios van contra otros hosts y no cuentan)
+_share = 1
+
+
+def set_share(processes: int) -> None:
+
+    global _share
+    _share = max(1, processes)
+    with _lock:
+        _buckets.clear()
+
+
+def share() -> int:
+
+    return _share
+
+
+def host_of(url: str) -> str:
+
+    return (urlsplit(url).hostname or "").lower()
+
+
+def bucket(host: str) -> TokenBucket:
+
+    with _lock:
+        if host not in _buckets:
+            rate, burst = _overrides.get(host, (config.RATE_LIMIT_RPS, config.RATE_LIMIT_BURST))
+            _buckets[host] = TokenBucket(rate / _share, burst)
+        return _buckets[host]
+
+
+def configure(host: str, rate: float, burst: Optional[int] = None) -> None:
+
+    burst = burst or config.RATE_LIMIT_BURST
+    with _lock:
+        _overrides[host.lower()] = (rate, burst)
+        _buckets[host.lower()] = TokenBucket(rate / _share, burst)
+
+
+def reserve(url: str) -> float:
+
+    host = host_of(url)
+    if not host:
+        return 0.0
+    limiter = bucket(host)
+    if limiter.base_rate <= 0:
+        # Ritmo 0 para este host (RATE_LIMIT_HOSTS o, sin entrada propia, RATE_LIMIT_RPS): sin límite
+        return 0.0
+
+    wait = limiter.reserve() + random.uniform(0, config.RATE_LIMIT_JITTER)
+    metrics.incr(f"rate_limit.{host}.requests")
+    metrics.incr(f"rate_limit.{host}.wait_s", round(wait, 3))
+    return wait
+
+
+def acquire(url: str) -> None:
+
+    wait = reserve(url)
+    if wait > 0.5:
+        rprint(f"[yellow]Esperando {wait:.2f} segundos ({host_of(url)})...[/yellow]")
+    if wait > 0:
+        time.sleep(wait)
+
+
+async def acquire_async(url: str) -> None:
+
+    wait = reserve(url)
+    if wait > 0:
+        await asyncio.sleep(wait)
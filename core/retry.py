@@ -0,0 +1,93 @@
+import asyncio
+import random
+import threading
+import time
+from rich import print as rprint
+from playwright.sync_api import Error as PlaywrightError
+import config
+from core import metrics
+
+
+# Política de reintentos común: backoff exponencial con jitter completo, un presupuesto
+# de reintentos para todo el proceso y distinción entre errores transitorios y permanentes
+
+class TransientError(Exception):
+    pass
+
+
+class PermanentError(Exception):
+    pass
+
+
+class PageNotFound(PermanentError):
+    pass
+
+
+class PageStructureError(PermanentError):
+    pass
+
+
+def is_transient(error: BaseException) -> bool:
+
+    if isinstance(error, PermanentError):
+        return False
+    # Timeouts, 5xx, bloqueos y errores de red (net::ERR_CONNECTION_RESET...) se reintentan;
+    # un fallo de nuestro propio código se repetiría igual en el siguiente intento
+    return isinstance(error, (TransientError, PlaywrightError, TimeoutError, ConnectionError, OSError))
+
+
+class RetryBudget:
+
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.remaining = total
+        self._lock = threading.Lock()
+
+
+    def take(self) -> bool:
+
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+_budget = RetryBudget(config.RETRY_BUDGET)
+
+
+def should_retry(error: BaseException, attempt: int, max_attempts: int = config.RETRY_MAX_ATTEMPTS) -> bool:
+
+    # attempt empieza en 0, como el range() de los bucles de los scrapers
+    if not is_transient(error):
+        metrics.incr("retry.permanent_errors")
+        rprint(f"[red]Error permanente ({type(error).__name__}), no se reintenta[/red]")
+        return False
+    if attempt + 1 >= max_attempts:
+        metrics.incr("retry.exhausted")
+        return False
+    if not _budget.take():
+        metrics.incr("retry.budget_exhausted")
+        rprint(f"[red]Presupuesto de reintentos agotado ({_budget.total} por ejecución)[/red]")
+        return False
+
+    metrics.incr("retry.retries")
+    return True
+
+
+def backoff_delay(attempt: int) -> float:
+
+    # Jitter completo: uniforme entre 0 y el tope exponencial
+    return random.uniform(0, min(config.RETRY_MAX_DELAY, config.RETRY_BASE_DELAY * 2 ** attempt))
+
+
+def backoff(attempt: int) -> None:
+
+    delay = backoff_delay(attempt)
+    rprint(f"[yellow]Esperando {delay:.2f} segundos antes de reintentar...[/yellow]")
+    time.sleep(delay)
+
+
+async def backoff_async(attempt: int) -> None:
+
+    await asyncio.sleep(backoff_delay(attempt))
@@ -0,0 +1,99 @@
+import hashlib
+import math
+import time
+from typing import Optional
+from rich import print as rprint
+import config
+from core.sqlite_store import connect
+
+
+class BloomFilter:
+
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        capacity = max(1, capacity)
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+
+    def _positions(self, key: str):
+
+        # Doble hashing (Kirsch-Mitzenmacher): k posiciones a partir de un único digest
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+
+    def add(self, key: str) -> None:
+
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+
+    def __contains__(self, key: str) -> bool:
+
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class SeenIndex:
+
+    def __init__(self, db_path: str, max_age_hours: float, bloom_capacity: int = 2_000_000) -> None:
+        self.db_path = db_path
+        self.max_age = max_age_hours * 3600
+        self.bloom = BloomFilter(bloom_capacity)
+        self.skipped = 0
+
+        self.conn = connect(db_path)
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS seen_urls (url TEXT PRIMARY KEY, scraped_at REAL NOT NULL)"
+            )
+
+        # Solo las URLs todavía frescas entran en el filtro; las caducadas se van a refrescar igualmente
+        loaded = 0
+        for (url,) in self.conn.execute(
+            "SELECT url FROM seen_urls WHERE scraped_at >= ?", (time.time() - self.max_age,)
+        ):
+            self.bloom.add(url)
+            loaded += 1
+        rprint(f"[cyan]Índice de URLs vistas: {loaded} URLs frescas cargadas[/cyan]")
+
+
+    def is_fresh(self, url: str) -> bool:
+
+        # El filtro Bloom descarta sin tocar disco la gran mayoría de URLs nuevas
+        if url not in self.bloom:
+            return False
+
+        row = self.conn.execute("SELECT scraped_at FROM seen_urls WHERE url = ?", (url,)).fetchone()
+        fresh = row is not None and time.time() - row[0] < self.max_age
+        if fresh:
+            self.skipped += 1
+        return fresh
+
+
+    def mark(self, url: str) -> None:
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO seen_urls (url, scraped_at) VALUES (?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET scraped_at = excluded.scraped_at",
+                (url, time.time())
+            )
+        self.bloom.add(url)
+
+
+    def close(self) -> None:
+
+        if self.skipped:
+            rprint(f"[cyan]URLs omitidas por estar frescas: {self.skipped}[/cyan]")
+        self.conn.close()
+
+
+def open_seen_index() -> Optional[SeenIndex]:
+
+    if not config.SKIP_SEEN:
+        return None
+    return SeenIndex(config.SQLITE_PATH, config.SEEN_MAX_AGE_HOURS, config.SEEN_BLOOM_CAPACITY)
@@ -0,0 +1,54 @@
+import os
+import threading
+from typing import Any, Dict
+from playwright.sync_api import BrowserContext
+from rich import print as rprint
+from core import metrics
+
+
+# Estado de sesión de Playwright (cookies y localStorage) guardado en disco: lo que un sitio recuerda
+# tras un paso previo (ubicación de entrega, aviso de cookies...) se hace una vez y lo reutilizan todos
+# los contextos nuevos, también los de ejecuciones posteriores. Si el sitio lo vuelve a pedir, el scraper
+# repite el paso y guarda de nuevo
+class SessionState:
+
+    def __init__(self, path: str, name: str = "sesion") -> None:
+        self.path = path
+        self.name = name
+        self._lock = threading.Lock()
+
+
+    @classmethod
+    def for_site(cls, data_dir: str, name: str) -> "SessionState":
+
+        return cls(os.path.join(data_dir, "sessions", f"{name}.json"), name)
+
+
+    def exists(self) -> bool:
+
+        return os.path.exists(self.path)
+
+
+    def context_options(self) -> Dict[str, Any]:
+
+        # Se consulta al crear cada contexto: los creados después de un save ya salen con el estado nuevo
+        return {"storage_state": self.path} if self.exists() else {}
+
+
+    def save(self, context: BrowserContext) -> None:
+
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Escritura atómica: otro hilo puede estar creando un contexto con el fichero anterior
+            tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+            context.storage_state(path=tmp_path)
+            os.replace(tmp_path, self.path)
+        metrics.incr(f"{self.name}.session_saves")
+        rprint(f"[green]Estado de sesión guardado en {self.path}[/green]")
+
+
+    def clear(self) -> None:
+
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
@@ -0,0 +1,116 @@
+import hashlib
+import logging
+import time
+from typing import Callable, Iterable, List, Optional, Tuple, TypeVar
+from rich import print as rprint
+from core import metrics
+
+
+# Reparto de una crawl grande (p. ej. ciudades × categorías) entre procesos o máquinas: cada unidad de
+# trabajo va al shard que dicta un hash estable de su clave, así todos los nodos calculan el mismo reparto
+# sin hablar entre ellos y una unidad cae siempre en el mismo shard de una ejecución a otra.
+# Los shards se numeran de 1 a N ("2/4" = segundo de cuatro)
+Shard = Tuple[int, int]
+T = TypeVar("T")
+
+_shard: Optional[Shard] = None
+
+
+def parse_shard(value: str) -> Optional[Shard]:
+
+    if not value:
+        return None
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard no válido: {value} (formato i/N, p. ej. 2/4)")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Shard no válido: {value} (i debe estar entre 1 y N)")
+    return index, count
+
+
+def split(shard: Optional[Shard], parts: int) -> List[Shard]:
+
+    # Divide un shard en parts sub-shards para los procesos de un mismo nodo: el shard i/N con parts
+    # procesos pasa a ser (i + (k-1)*N)/(N*parts). Como hash % (N*parts) = i-1 + (k-1)*N implica
+    # hash % N = i-1, los sub-shards reparten justo las unidades de i/N, sea cual sea parts en cada nodo
+    index, count = shard or (1, 1)
+    return [(index + (k - 1) * count, count * parts) for k in range(1, parts + 1)]
+
+
+def set_shard(shard: Optional[Shard]) -> None:
+
+    global _shard
+    _shard = shard
+
+
+def current() -> Optional[Shard]:
+
+    return _shard
+
+
+def label(shard: Optional[Shard] = None) -> str:
+
+    shard = shard or _shard
+    return f"{shard[0]}/{shard[1]}" if shard else "único"
+
+
+def shard_of(key: str, count: int) -> int:
+
+    # hash() de Python cambia en cada proceso; sha1 da el mismo resultado en cualquier máquina
+    return int(hashlib.sha1(key.encode("utf-8")).hexdigest()[:8], 16) % count + 1
+
+
+def owns(key: str, shard: Optional[Shard] = None) -> bool:
+
+    shard = shard or _shard
+    return shard is None or shard_of(key, shard[1]) == shard[0]
+
+
+def select(units: Iterable[T], key: Callable[[T], str], shard: Optional[Shard] = None) -> List[T]:
+
+    return [unit for unit in units if owns(key(unit), shard)]
+
+
+class ShardProgress:
+
+    def __init__(self, total: int, done: int = 0, shard: Optional[Shard] = None) -> None:
+        self.name = label(shard)
+        self.total = total
+        self.done = done
+        self.done_at_start = done
+        self.records = 0
+        self.started = time.monotonic()
+        self._report_gauges()
+
+
+    def record(self, count: int = 1) -> None:
+
+        self.records += count
+
+
+    def unit_done(self, key: str) -> None:
+
+        self.done += 1
+        elapsed = time.monotonic() - self.started
+        per_minute = self.records / elapsed * 60 if elapsed > 0 else 0.0
+        remaining = self.total - self.done
+        message = (
+            f"Shard {self.name}: {key} terminada, {self.done}/{self.total} unidades, "
+            f"{self.records} registros ({per_minute:.1f}/min)"
+        )
+        if remaining:
+            # La estimación usa el ritmo de esta ejecución, no el de las unidades hechas antes de un --resume
+            eta = elapsed / max(1, self.done - self.done_at_start) * remaining
+            message += f", quedan ~{eta / 60:.0f} min"
+        rprint(f"[blue]{message}[/blue]")
+        logging.info(message)
+        self._report_gauges()
+
+
+    def _report_gauges(self) -> None:
+
+        elapsed = time.monotonic() - self.started
+        metrics.set_gauge("shard.units_done", self.done)
+        metrics.set_gauge("shard.units_total", self.total)
+        metrics.set_gauge("shard.records_per_min", round(self.records / elapsed * 60, 2) if elapsed > 0 else 0.0)
@@ -0,0 +1,126 @@
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from rich import print as rprint
+
+
+# Una tabla por tipo de registro. "url" es siempre la clave primaria; lo que no
+# tenga columna propia se guarda en "extra" como JSON.
+SCHEMAS: Dict[str, Dict[str, List[str]]] = {
+    "pa_companies": {
+        "columns": ["nombre", "descripcion", "direccion", "codigo_postal", "telefono",
+                    "website", "actividades", "categoria"],
+        "indexes": ["codigo_postal", "categoria"],
+    },
+    "axesor_companies": {
+        "columns": ["nombre", "direccion", "codigo_postal", "cif", "forma_juridica",
+                    "fecha_constitucion", "objeto_social", "cnae", "sic"],
+        "indexes": ["cif", "cnae", "codigo_postal"],
+    },
+    "products": {
+        "columns": ["nombre", "precio", "categoria", "marca", "descripcion"],
+        "indexes": ["categoria"],
+    },
+}
+
+POSTAL_CODE_PATTERN = re.compile(r"\b(\d{5})\b")
+
+
+def connect(db_path: str, check_same_thread: bool = True) -> sqlite3.Connection:
+
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=check_same_thread)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+class SQLiteStore:
+
+    def __init__(self, db_path: str, table: str, batch_size: int = 100,
+                 extra: Optional[Dict[str, Any]] = None) -> None:
+        if table not in SCHEMAS:
+            raise ValueError(f"Tabla desconocida: {table}")
+
+        self.db_path = db_path
+        self.table = table
+        self.batch_size = max(1, batch_size)
+        self.extra = extra or {}
+        self.columns = SCHEMAS[table]["columns"]
+        self.records_written = 0
+        self._batch: List[tuple] = []
+
+        self.conn = connect(db_path)
+        self._create_schema()
+
+        all_columns = ["url", *self.columns, "extra", "scraped_at"]
+        updates = ", ".join(f"{col} = excluded.{col}" for col in all_columns[1:])
+        self._upsert_sql = (
+            f"INSERT INTO {table} ({', '.join(all_columns)}) "
+            f"VALUES ({', '.join('?' for _ in all_columns)}) "
+            f"ON CONFLICT(url) DO UPDATE SET {updates}"
+        )
+
+
+    def _create_schema(self) -> None:
+
+        column_defs = ", ".join(f"{col} TEXT" for col in self.columns)
+        with self.conn:
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                f"url TEXT PRIMARY KEY, {column_defs}, extra TEXT, scraped_at TEXT NOT NULL)"
+            )
+            for col in SCHEMAS[self.table]["indexes"]:
+                self.conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{self.table}_{col} ON {self.table} ({col})"
+                )
+
+
+    def _to_row(self, record: Dict[str, Any]) -> tuple:
+
+        data = {**self.extra, **record}
+
+        if "codigo_postal" in self.columns and not data.get("codigo_postal"):
+            match = POSTAL_CODE_PATTERN.search(data.get("direccion") or "")
+            data["codigo_postal"] = match.group(1) if match else None
+
+        leftovers = {k: v for k, v in data.items() if k != "url" and k not in self.columns}
+        return (
+            data["url"],
+            *(data.get(col) for col in self.columns),
+            json.dumps(leftovers, ensure_ascii=False) if leftovers else None,
+            datetime.now().isoformat(timespec="seconds"),
+        )
+
+
+    def write(self, record: Dict[str, Any]) -> None:
+
+        self._batch.append(self._to_row(record))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+
+    def flush(self) -> None:
+
+        if not self._batch:
+            return
+
+        # Un único commit por lote: en WAL el coste es por transacción, no por fila
+        with self.conn:
+            self.conn.executemany(self._upsert_sql, self._batch)
+        self.records_written += len(self._batch)
+        self._batch.clear()
+
+
+    def close(self) -> None:
+
+        try:
+            self.flush()
+        except sqlite3.Error as e:
+            rprint(f"[red]Error guardando el último lote en {self.db_path}: {str(e)}[/red]")
+        finally:
+            self.conn.close()
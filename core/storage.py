@@ -0,0 +1,173 @@
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional
+from rich import print as rprint
+import config
+from core.sqlite_store import SQLiteStore
+
+
+# never: el sistema operativo decide cuándo llega a disco
+# flush: fsync en cada vaciado del buffer
+# always: fsync después de cada registro
+FSYNC_POLICIES = ("never", "flush", "always")
+
+
+class JsonLinesWriter:
+
+    def __init__(self, path: str, flush_every: int = 50, fsync: str = "never",
+                 export_json_array: bool = False) -> None:
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Política de fsync no válida: {fsync} (opciones: {', '.join(FSYNC_POLICIES)})")
+
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self.fsync = fsync
+        self.export_json_array = export_json_array
+        self.records_written = 0
+        self._pending = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+
+    def write(self, record: Dict[str, Any]) -> None:
+
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self._file.write("\n")
+        self.records_written += 1
+        self._pending += 1
+
+        if self.fsync == "always" or self._pending >= self.flush_every:
+            self.flush()
+
+
+    def flush(self) -> None:
+
+        if self._file.closed:
+            return
+
+        self._file.flush()
+        if self.fsync != "never":
+            os.fsync(self._file.fileno())
+        self._pending = 0
+
+
+    def close(self) -> None:
+
+        if self._file.closed:
+            return
+
+        self.flush()
+        self._file.close()
+
+        if self.export_json_array:
+            convert_to_json_array(self.path)
+
+
+    def __enter__(self) -> "JsonLinesWriter":
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def read_json_lines(path: str) -> Iterator[Dict[str, Any]]:
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Una línea truncada (p. ej. el proceso murió a mitad de escritura) no invalida el resto
+                rprint(f"[yellow]Línea {line_num} inválida en {path}, se omite[/yellow]")
+
+
+def convert_to_json_array(jsonl_path: str, json_path: Optional[str] = None) -> str:
+
+    if json_path is None:
+        json_path = os.path.splitext(jsonl_path)[0] + ".json"
+
+    tmp_path = json_path + ".tmp"
+    count = 0
+
+    # Un registro reescrito (p. ej. con más categorías) aparece varias veces en el JSONL: en el array
+    # solo entra la última línea de cada URL. Primera pasada: posición de esa última línea
+    last_line: Dict[str, int] = {}
+    if os.path.exists(jsonl_path):
+        for index, record in enumerate(read_json_lines(jsonl_path)):
+            if record.get("url"):
+                last_line[record["url"]] = index
+
+    # Mismo formato que json.dump(lista, indent=4), pero sin cargar todos los registros en memoria
+    with open(tmp_path, "w", encoding="utf-8") as out:
+        out.write("[")
+        if os.path.exists(jsonl_path):
+            for index, record in enumerate(read_json_lines(jsonl_path)):
+                if record.get("url") and last_line[record["url"]] != index:
+                    continue
+                out.write(",\n" if count else "\n")
+                block = json.dumps(record, ensure_ascii=False, indent=4)
+                out.write("\n".join("    " + line for line in block.splitlines()))
+                count += 1
+        out.write("\n]" if count else "]")
+
+    os.replace(tmp_path, json_path)
+    rprint(f"[green]Exportados {count} registros a {json_path}[/green]")
+    return json_path
+
+
+class MultiSink:
+
+    def __init__(self, sinks: List[Any]) -> None:
+        self.sinks = sinks
+
+
+    def write(self, record: Dict[str, Any]) -> None:
+
+        for sink in self.sinks:
+            sink.write(record)
+
+
+    def flush(self) -> None:
+
+        for sink in self.sinks:
+            sink.flush()
+
+
+    def close(self) -> None:
+
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                rprint(f"[red]Error cerrando salida {type(sink).__name__}: {str(e)}[/red]")
+
+
+def open_sinks(data_dir: str, json_filename: str, table: str,
+               extra: Optional[Dict[str, Any]] = None) -> MultiSink:
+
+    sinks: List[Any] = []
+
+    for kind in config.OUTPUT_SINKS:
+        if kind == "jsonl":
+            sinks.append(JsonLinesWriter(
+                os.path.join(data_dir, json_filename),
+                flush_every=config.OUTPUT_FLUSH_EVERY,
+                fsync=config.OUTPUT_FSYNC,
+                export_json_array=config.EXPORT_JSON_ARRAY
+            ))
+        elif kind == "sqlite":
+            sinks.append(SQLiteStore(
+                config.SQLITE_PATH,
+                table,
+                batch_size=config.SQLITE_BATCH_SIZE,
+                extra=extra
+            ))
+        else:
+            raise ValueError(f"Salida desconocida en OUTPUT_SINKS: {kind}")
+
+    return MultiSink(sinks)
@@ -0,0 +1,209 @@
+import importlib
+import logging
+import multiprocessing
+import time
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Dict, List, Optional, Tuple
+from rich import print as rprint
+import config
+from core import budget
+from core import metrics
+from core import rate_limit
+from core import sharding
+
+
+# Modo supervisor: cada sitio corre en su propio proceso (y por tanto con su propio Playwright);
+# un sitio colgado o que se cae no bloquea al resto y todos los resultados acaban en un resumen común
+
+# Cada cuántos segundos revisa el supervisor tiempos, latidos y presupuesto
+POLL_INTERVAL = 5
+
+
+def run_site(module_path: str, class_name: str, resume: bool, share: int, deadline: Optional[float],
+             shard: Optional[sharding.Shard], heartbeat, conn) -> None:
+
+    # Con varios procesos del mismo sitio contra sus hosts, cada uno se queda con su parte del límite de peticiones
+    rate_limit.set_share(share)
+    sharding.set_shard(shard)
+    budget.set_run_deadline(deadline)
+    budget.install_signal_handlers()
+    budget.set_heartbeat(heartbeat)
+    started = time.monotonic()
+    try:
+        site_class = getattr(importlib.import_module(module_path), class_name)
+        site = site_class(resume=resume)
+        site.main()
+        # Los sitios escriben a medida que avanzan y main() no devuelve registros: se cuentan en core.budget
+        result = {"status": "ok", "records": budget.records()}
+        # Solo el avance del shard viaja al supervisor, no todas las métricas
+        progress = {name: value for name, value in metrics.snapshot().items() if name.startswith("shard.")}
+        if progress:
+            result["progress"] = progress
+        if budget.stop_reason() is not None:
+            result.update({"status": "parcial", "stopped": budget.stop_reason()})
+    except Exception as e:
+        logging.error(f"Error procesando: {class_name}: {e}")
+        result = {"status": "error", "error": str(e)[:200]}
+
+    result["duration"] = time.monotonic() - started
+    conn.send(result)
+    conn.close()
+
+
+def _stop(job: Dict, status: str) -> None:
+
+    # SIGTERM: el sitio termina la página en curso, cierra la salida y guarda el checkpoint;
+    # si no ha salido en SHUTDOWN_GRACE segundos se le mata
+    if "stopping_since" not in job:
+        job["process"].terminate()
+        job["stopping_since"] = time.monotonic()
+        job["status"] = status
+
+
+def _jobs(sites: List[type], workers: int,
+          shard: Optional[sharding.Shard]) -> List[Tuple[type, Optional[sharding.Shard], str, int]]:
+
+    # Los sitios shardable (matriz ciudad × categoría) se parten en un proceso por worker;
+    # el resto corre entero en un proceso, en el nodo al que le toque por el nombre de la clase.
+    # El último campo es cuántos procesos comparten los hosts del sitio
+    jobs = []
+    for site_class in sites:
+        if getattr(site_class, "shardable", False):
+            parts = sharding.split(shard, workers) if workers > 1 else [shard]
+            for part in parts:
+                jobs.append((site_class, part, f"{site_class.__name__}[{sharding.label(part)}]", len(parts)))
+        elif sharding.owns(site_class.__name__, shard):
+            jobs.append((site_class, None, site_class.__name__, 1))
+    return jobs
+
+
+def run_pool(sites: List[type], workers: int, resume: bool = False, timeout: float = 0,
+             deadline: Optional[float] = None, shard: Optional[sharding.Shard] = None,
+             stall_timeout: float = config.SITE_STALL_TIMEOUT) -> List[Dict]:
+
+    # spawn en lugar de fork: Playwright y los hilos de core no sobreviven bien a un fork
+    context = multiprocessing.get_context("spawn")
+    pending = deque(_jobs(sites, workers, shard))
+    running: Dict[int, Dict] = {}
+    results: List[Dict] = []
+
+    rprint(f"[blue]Supervisor: {len(pending)} trabajos de {len(sites)} sitios con {workers} procesos[/blue]")
+
+    def finish(sentinel: int, status: Optional[str] = None) -> None:
+
+        job = running.pop(sentinel)
+        process, conn = job["process"], job["conn"]
+        try:
+            result = conn.recv() if conn.poll() else {}
+        except EOFError:
+            # El proceso murió sin llegar a enviar su resultado
+            result = {}
+        conn.close()
+        if status is None:
+            status = result.get("status") or job.get("status") or f"crash (código {process.exitcode})"
+        result.update({
+            "site": job["site"],
+            "status": status,
+            "exitcode": process.exitcode,
+            "duration": result.get("duration", time.monotonic() - job["started"]),
+        })
+        results.append(result)
+
+        color = "green" if status == "ok" else "yellow" if status == "parcial" else "red"
+        rprint(f"[{color}]Supervisor: {job['site']} terminado ({status}) en {result['duration']:.0f}s[/{color}]")
+        logging.info(f"Supervisor: {job['site']} {status} exitcode={process.exitcode}")
+
+    try:
+        while pending or running:
+            while pending and len(running) < workers:
+                site_class, job_shard, name, share = pending.popleft()
+                receiver, sender = context.Pipe(duplex=False)
+                # Hora de la última señal de avance del sitio, escrita por core.budget en el proceso hijo
+                heartbeat = context.Value("d", time.time())
+                process = context.Process(
+                    target=run_site,
+                    args=(site_class.__module__, site_class.__name__, resume, share, deadline, job_shard, heartbeat, sender),
+                    name=name,
+                    daemon=False
+                )
+                process.start()
+                sender.close()
+                running[process.sentinel] = {
+                    "site": name,
+                    "process": process,
+                    "conn": receiver,
+                    "heartbeat": heartbeat,
+                    "started": time.monotonic(),
+                }
+                rprint(f"[blue]Supervisor: {name} iniciado (pid {process.pid})[/blue]")
+
+            for sentinel in wait(list(running), timeout=POLL_INTERVAL):
+                running[sentinel]["process"].join()
+                finish(sentinel)
+
+            if budget.run_stopped():
+                if pending:
+                    rprint(f"[yellow]Supervisor: presupuesto agotado, {len(pending)} trabajos sin iniciar[/yellow]")
+                for _, _, name, _ in pending:
+                    results.append({"site": name, "status": "no iniciado", "exitcode": None, "duration": 0})
+                pending.clear()
+                # Los procesos en marcha comparten la hora límite y paran solos; el SIGTERM cubre la señal
+                # recibida por el supervisor y pone en marcha el plazo de gracia
+                for job in running.values():
+                    _stop(job, "parcial")
+
+            now = time.monotonic()
+            for job in running.values():
+                if timeout > 0 and now - job["started"] > timeout and "stopping_since" not in job:
+                    rprint(f"[red]Supervisor: {job['site']} supera {timeout:.0f}s, se detiene[/red]")
+                    _stop(job, "timeout")
+                idle = time.time() - job["heartbeat"].value
+                if stall_timeout > 0 and idle > stall_timeout and "stopping_since" not in job:
+                    rprint(f"[red]Supervisor: {job['site']} lleva {idle:.0f}s sin avanzar, se detiene[/red]")
+                    _stop(job, "colgado")
+                if "stopping_since" in job and now - job["stopping_since"] > config.SHUTDOWN_GRACE and job["process"].is_alive():
+                    rprint(f"[red]Supervisor: {job['site']} no ha parado en {config.SHUTDOWN_GRACE:.0f}s, se mata[/red]")
+                    job["process"].kill()
+                    job["status"] = "matado"
+
+    except KeyboardInterrupt:
+        rprint("[yellow]Supervisor interrumpido, deteniendo procesos...[/yellow]")
+        for job in running.values():
+            _stop(job, "interrumpido")
+        for sentinel, job in list(running.items()):
+            job["process"].join(config.SHUTDOWN_GRACE)
+            if job["process"].is_alive():
+                job["process"].kill()
+                job["process"].join()
+            finish(sentinel)
+        for _, _, name, _ in pending:
+            results.append({"site": name, "status": "no iniciado", "exitcode": None, "duration": 0})
+
+    return results
+
+
+def report(results: List[Dict]) -> None:
+
+    ok = [result for result in results if result["status"] == "ok"]
+    partial = [result for result in results if result["status"] == "parcial"]
+    rprint(f"[blue]Resumen: {len(ok)}/{len(results)} sitios completados, {len(partial)} parciales[/blue]")
+    for result in sorted(results, key=lambda r: r["site"]):
+        color = "green" if result["status"] == "ok" else "yellow" if result["status"] == "parcial" else "red"
+        detail = f"{result['records']} registros" if "records" in result else result.get("error", "")
+        if result.get("progress"):
+            progress = result["progress"]
+            detail += (
+                f", {int(progress['shard.units_done'])}/{int(progress['shard.units_total'])} unidades, "
+                f"{progress['shard.records_per_min']:.1f} registros/min"
+            )
+        if result.get("stopped"):
+            detail += f" ({result['stopped']})"
+        rprint(
+            f"[{color}]  {result['site']}: {result['status']} "
+            f"({result['duration']:.0f}s) {detail}[/{color}]"
+        )
+    logging.info(
+        "Resumen supervisor: " +
+        ", ".join(f"{result['site']}={result['status']}" for result in results)
+    )
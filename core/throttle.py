@@ -0,0 +1,50 @@
+from typing import Optional
+from rich import print as rprint
+import config
+from core import circuit
+from core import metrics
+from core import rate_limit
+
+
+# Control AIMD por dominio sobre el cubo de core.rate_limit: cada respuesta rápida y limpia
+# suma AIMD_INCREASE req/s hasta el techo; un 429, un 5xx, un timeout o una página de
+# bloqueo multiplica el ritmo por AIMD_DECREASE
+
+def is_backoff_status(status: Optional[int]) -> bool:
+
+    return status is not None and (status == 429 or status >= 500)
+
+
+def record(url: str, status: Optional[int] = None, latency: Optional[float] = None,
+           failure: Optional[str] = None) -> None:
+
+    # El mismo resultado alimenta el cortacircuitos del dominio
+    circuit.record(url, success=not (failure or is_backoff_status(status)))
+
+    host = rate_limit.host_of(url)
+    if not config.AIMD_ENABLED or not host:
+        return
+
+    bucket = rate_limit.bucket(host)
+    if bucket.base_rate <= 0:
+        return
+    # Sin AIMD_MAX_RPS explícito el ritmo solo se recupera hasta el límite de cortesía configurado
+    ceiling = bucket.base_rate
+    if config.AIMD_MAX_RPS > 0:
+        ceiling = max(bucket.base_rate, config.AIMD_MAX_RPS / rate_limit.share())
+    current = bucket.rate
+
+    if failure or is_backoff_status(status):
+        reason = failure or f"HTTP {status}"
+        rate = max(config.AIMD_MIN_RPS, current * config.AIMD_DECREASE)
+        metrics.incr(f"throttle.{host}.backoffs")
+        rprint(f"[red]Reduciendo ritmo en {host}: {current:.2f} → {rate:.2f} req/s ({reason})[/red]")
+    elif latency is not None and latency <= config.AIMD_LATENCY_TARGET:
+        rate = min(ceiling, current + config.AIMD_INCREASE)
+    else:
+        # Respuesta correcta pero lenta: se mantiene el ritmo
+        rate = current
+
+    if rate != current:
+        bucket.set_rate(rate)
+    metrics.set_gauge(f"throttle.{host}.rps", round(rate, 3))
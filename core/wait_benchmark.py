@@ -0,0 +1,154 @@
+import argparse
+import importlib
+import inspect
+import random
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from playwright.sync_api import Browser, BrowserContext, Page, sync_playwright
+from rich import print as rprint
+import config
+from core.navigation import WAIT_UNTIL_OPTIONS, WaitPolicy, wait_ready
+
+
+def completeness(result: Any) -> float:
+
+    # Fracción de campos con valor real; para listados, si se encontró algún enlace
+    if isinstance(result, dict):
+        fields = [value for key, value in result.items() if key != "url"]
+        if not fields:
+            return 0.0
+        return sum(1 for value in fields if value not in (None, "", "N/A")) / len(fields)
+    return 1.0 if result else 0.0
+
+
+def benchmark(browser: Browser, urls: Sequence[str], policy: WaitPolicy,
+              extract: Callable[[Page, str], Any],
+              wait_untils: Sequence[str] = WAIT_UNTIL_OPTIONS,
+              user_agents: Optional[List[str]] = None,
+              on_new_context: Optional[Callable[[BrowserContext], None]] = None,
+              before_ready: Optional[Callable[[Page], None]] = None,
+              rounds: int = 1) -> List[Dict[str, Any]]:
+
+    samples: Dict[str, Dict[str, list]] = {
+        wait_until: {"seconds": [], "completeness": [], "failures": []} for wait_until in wait_untils
+    }
+
+    for round_num in range(rounds):
+        for url in urls:
+            # Se alternan las políticas por URL para que la deriva del servidor afecte a todas por igual
+            for wait_until in random.sample(list(wait_untils), len(wait_untils)):
+                candidate = policy.with_wait_until(wait_until)
+                context = browser.new_context(
+                    user_agent=random.choice(user_agents) if user_agents else None,
+                    ignore_https_errors=True
+                )
+                try:
+                    if on_new_context is not None:
+                        on_new_context(context)
+                    page = context.new_page()
+
+                    start = time.perf_counter()
+                    page.goto(url, wait_until=candidate.wait_until, timeout=candidate.timeout)
+                    if before_ready is not None:
+                        before_ready(page)
+                    wait_ready(page, candidate)
+                    elapsed = time.perf_counter() - start
+
+                    samples[wait_until]["seconds"].append(elapsed)
+                    samples[wait_until]["completeness"].append(completeness(extract(page, url)))
+                    rprint(f"[cyan]{wait_until:>16} {elapsed:6.2f}s {url[:80]}[/cyan]")
+
+                except Exception as e:
+                    samples[wait_until]["failures"].append(url)
+                    rprint(f"[red]{wait_until:>16} fallo en {url[:80]}: {str(e)[:100]}[/red]")
+                finally:
+                    context.close()
+
+    results = []
+    for wait_until, data in samples.items():
+        seconds = data["seconds"]
+        results.append({
+            "wait_until": wait_until,
+            "samples": len(seconds),
+            "failures": len(data["failures"]),
+            "mean_s": statistics.fmean(seconds) if seconds else None,
+            "median_s": statistics.median(seconds) if seconds else None,
+            "max_s": max(seconds) if seconds else None,
+            "completeness": statistics.fmean(data["completeness"]) if data["completeness"] else 0.0,
+        })
+
+    return results
+
+
+def recommend(results: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+
+    # La más rápida (mediana) entre las que extraen tan completo como la mejor y sin fallos
+    valid = [r for r in results if r["samples"] and not r["failures"]]
+    if not valid:
+        return None
+    best_completeness = max(r["completeness"] for r in valid)
+    complete = [r for r in valid if r["completeness"] >= best_completeness - 1e-9]
+    return min(complete, key=lambda r: r["median_s"])
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+
+    rprint("[blue]wait_until        media   mediana   máx    completitud  fallos[/blue]")
+    for r in sorted(results, key=lambda r: r["median_s"] if r["median_s"] is not None else float("inf")):
+        if r["samples"]:
+            rprint(f"{r['wait_until']:<16} {r['mean_s']:6.2f}s {r['median_s']:7.2f}s {r['max_s']:6.2f}s"
+                   f"  {r['completeness']:10.0%}  {r['failures']:6d}")
+        else:
+            rprint(f"{r['wait_until']:<16} {'-':>7} {'-':>8} {'-':>7}  {'-':>10}  {r['failures']:6d}")
+
+    best = recommend(results)
+    if best:
+        rprint(f"[green]Recomendada: {best['wait_until']} (mediana {best['median_s']:.2f}s, "
+               f"completitud {best['completeness']:.0%})[/green]")
+    else:
+        rprint("[red]Ninguna política completó todas las URLs sin fallos[/red]")
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Compara políticas de espera sobre URLs reales de un sitio")
+    parser.add_argument("module", help="Módulo del sitio, p. ej. sites.paginasamarillas o supermarket.supermarket")
+    parser.add_argument("page_type", help="Tipo de página en WAIT_POLICIES del módulo, p. ej. listing o detail")
+    parser.add_argument("urls", nargs="+", help="URLs de ese tipo de página")
+    parser.add_argument("--wait-until", nargs="+", default=list(WAIT_UNTIL_OPTIONS), choices=WAIT_UNTIL_OPTIONS)
+    parser.add_argument("--rounds", type=int, default=1)
+    args = parser.parse_args()
+
+    module = importlib.import_module(args.module)
+    policy: WaitPolicy = module.WAIT_POLICIES[args.page_type]
+    site_class = next(
+        obj for _, obj in inspect.getmembers(module, inspect.isclass)
+        if obj.__module__ == module.__name__ and callable(getattr(obj, "main", None))
+    )
+    site = site_class()
+    extract = getattr(site, f"_extract_{args.page_type}")
+    profile = getattr(module, "BLOCKING_PROFILE", None)
+
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.launch(headless=True, timeout=60000)
+        try:
+            results = benchmark(
+                browser,
+                args.urls,
+                policy,
+                extract,
+                wait_untils=args.wait_until,
+                user_agents=config.USER_AGENTS,
+                on_new_context=profile.install if profile is not None and config.BLOCK_RESOURCES else None,
+                before_ready=getattr(site, "_check_and_handle_dialog", None),
+                rounds=args.rounds
+            )
+        finally:
+            browser.close()
+
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
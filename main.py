@@ -1,7 +1,13 @@
+import argparse
 import importlib
 import inspect
 import logging
+import time
 from pathlib import Path
+import config
+from core import budget
+from core import sharding
+from core import supervisor
 
 
 logging.basicConfig(
@@ -27,7 +33,8 @@ def load_all_sites():
             module = importlib.import_module(module_path)
             
             for name, obj in inspect.getmembers(module, inspect.isclass):
-                if obj.__module__ == module_path:
+                # Solo clases scraper: los TypedDict de metadatos también viven en el módulo
+                if obj.__module__ == module_path and callable(getattr(obj, 'main', None)):
                     sites.append(obj)
         
         except Exception as e:
@@ -36,14 +43,74 @@ def load_all_sites():
     return sites
 
 
+def parse_args():
+    
+    parser = argparse.ArgumentParser(description="Scraping Engine")
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help="Continuar cada scraper desde su último checkpoint en lugar de empezar de cero"
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=config.WORKERS,
+        help="Número de sitios en paralelo, cada uno en su propio proceso (1 = uno detrás de otro)"
+    )
+    parser.add_argument(
+        '--site-timeout',
+        type=float,
+        default=config.SITE_TIMEOUT,
+        help="Segundos máximos por sitio en modo supervisor antes de detenerlo (0 = sin límite)"
+    )
+    parser.add_argument(
+        '--run-budget',
+        type=float,
+        default=config.RUN_BUDGET,
+        help="Segundos para toda la ejecución; al agotarse cada sitio para de forma ordenada (0 = sin límite)"
+    )
+    parser.add_argument(
+        '--shard',
+        default=config.SHARD,
+        help="Parte de la matriz ciudad × categoría que recorre este nodo, i/N (p. ej. 2/4); vacío = todo"
+    )
+    return parser.parse_args()
+
+
 def main():
     
+    args = parse_args()
     sites = load_all_sites()
+    shard = sharding.parse_shard(args.shard)
+    sharding.set_shard(shard)
+    deadline = time.time() + args.run_budget if args.run_budget > 0 else None
+    budget.set_run_deadline(deadline)
+    budget.install_signal_handlers()
+
+    if args.workers > 1:
+        results = supervisor.run_pool(
+            sites,
+            args.workers,
+            resume=args.resume,
+            timeout=args.site_timeout,
+            deadline=deadline,
+            shard=shard
+        )
+        supervisor.report(results)
+        return
+
     for site_class in sites:
+        if budget.run_stopped():
+            logging.info(f"Presupuesto agotado, no se inicia: {site_class.__name__}")
+            continue
+        if not getattr(site_class, "shardable", False) and not sharding.owns(site_class.__name__):
+            logging.info(f"Corresponde a otro shard, no se inicia: {site_class.__name__}")
+            continue
         try:
             logging.info(f"Procesando: {site_class.__name__}...")
-            site = site_class()
+            site = site_class(resume=args.resume)
             site.main()
+            logging.info(f"Terminado: {site_class.__name__}, {budget.records()} registros")
         
         except Exception as e:
             logging.error(f"Error procesando: {site_class.__name__}: {e}")
@@ -1,4 +1,5 @@
+import sys
 from supermarket.supermarket import Supermarket
 
-supermarket_scraper = Supermarket()
+supermarket_scraper = Supermarket(resume="--resume" in sys.argv)
 supermarket_scraper.main()
\ No newline at end of file
@@ -1,14 +1,90 @@
 import re
-import json
-import random
-import time
 import os
 from typing import List, Dict, Optional, TypedDict
 import config
 from datetime import datetime
-from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext
+from playwright.sync_api import sync_playwright, Page, Browser
 from rich import print as rprint
-from contextlib import contextmanager
+from core.storage import MultiSink, open_sinks
+from core.browser_pool import ContextPool
+from core.resource_blocking import BlockingProfile
+from core import budget
+from core import metrics
+from core import navigation
+from core import retry
+from core import throttle
+from core import extraction
+from core.extraction import label_rule
+from core.navigation import WaitPolicy
+from core.seen_index import SeenIndex, open_seen_index
+from core.checkpoint import Checkpoint
+from core.http_fetch import HttpFetcher
+from core.async_engine import AsyncDetailFetcher
+from core.frontier import Frontier
+from core.coordination import open_lease_manager
+
+
+BLOCKING_PROFILE = BlockingProfile(
+    "axesor",
+    blocked_types=("image", "media", "font", "stylesheet"),
+    allowed_hosts=("axesor.es",)
+)
+
+# Página de bloqueo de axesor: div.error_cabecera con "Estimado usuario..."
+BLOCKED_WHEN = "div.error_cabecera"
+
+WAIT_POLICIES = {
+    "places": WaitPolicy("domcontentloaded", "tr a", blocked_when=BLOCKED_WHEN),
+    # En el listado la misma página marca el final de la paginación: se trata en scrap_company_links
+    "listing": WaitPolicy("domcontentloaded", "a[href^='//www.axesor.es/Informes-Empresas/']"),
+    "detail": WaitPolicy("domcontentloaded", "tbody tr", blocked_when=BLOCKED_WHEN),
+}
+
+# Enlaces a informes de una página de listado (sin filtrar): lo usan el navegador síncrono y el reparto en paralelo
+LISTING_JS = '''() => Array.from(document.querySelectorAll("a[href^='//www.axesor.es/Informes-Empresas/']"))
+    .map(el => el.getAttribute('href'))
+'''
+
+NEW_VALUE = "td.c-empresa__detail-value"
+
+DETAIL_SPEC = {
+    "variants": [
+        {
+            "name": "nuevo (c-empresa)",
+            "when": ".c-empresa__detail-label",
+            "fields": {
+                "nombre": {**label_rule("Nombre", "th", NEW_VALUE), "fallbacks": [{"selector": "h1, h2, h3"}]},
+                "direccion": label_rule("Dirección", "th", NEW_VALUE),
+                "cif": label_rule("CIF", "th", NEW_VALUE),
+                "forma_juridica": label_rule("Forma jurídica", "th", NEW_VALUE),
+                "fecha_constitucion": label_rule("Fecha de constitución", "th", NEW_VALUE),
+                "objeto_social": {
+                    **label_rule("Objeto social", "th", NEW_VALUE, sub="span.category"),
+                    "fallbacks": [label_rule("Objeto social", "th", NEW_VALUE)],
+                },
+                "cnae": label_rule("CNAE", "th", NEW_VALUE),
+                "sic": label_rule("SIC", "th", NEW_VALUE),
+            },
+        },
+        {
+            "name": "antiguo",
+            "fields": {
+                "nombre": {"selector": "h3.name"},
+                "direccion": {"selector": "#Direccion + td"},
+                "cif": label_rule("CIF:", "td", "td"),
+                "forma_juridica": label_rule("Forma jurídica:", "td", "td"),
+                "fecha_constitucion": label_rule("Fecha de constitución:", "td", "td"),
+                "objeto_social": {
+                    **label_rule("Objeto social:", "td", "td", sub="span.category"),
+                    "fallbacks": [label_rule("Objeto social:", "td", "td")],
+                },
+                "cnae": label_rule("CNAE:", "td", "td"),
+                "sic": label_rule("SIC:", "td", "td"),
+            },
+        },
+    ]
+}
+
 
 
 class CompanyMetadata(TypedDict):
@@ -26,71 +102,54 @@ class CompanyMetadata(TypedDict):
 
 class Axesor:
     
-    def __init__(self) -> None:
+    def __init__(self, resume: bool = False) -> None:
         self.USER_AGENTS: List[str] = config.USER_AGENTS
         self.playwright = None
         self.browser: Optional[Browser] = None
-        self.request_delay = (2, 4)
-        self.max_retries = 3
-        self.json_filename = f"axesor_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-
-
-    @contextmanager
-    def _get_page(self, user_agent: str = None):
-        
-        context = None
-        page = None
-        try:
-            user_agent = user_agent or random.choice(self.USER_AGENTS)
-            context = self.browser.new_context(
-                user_agent=user_agent,
-                ignore_https_errors=True
-            )
-            page = context.new_page()
-            yield page
-        
-        finally:
-            if page is not None:
-                page.close()
-            if context is not None:
-                context.close()
-
-
-    def _random_delay(self):
+        self.context_pool: Optional[ContextPool] = None
+        self.http: Optional[HttpFetcher] = None
+        self.async_fetcher: Optional[AsyncDetailFetcher] = None
+        self.listing_fanout: Optional[AsyncDetailFetcher] = None
+        self.frontier: Optional[Frontier] = None
+        self.errors: Dict[str, str] = {}
+        self.max_retries = config.RETRY_MAX_ATTEMPTS
+        self.json_filename = f"axesor_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        self.sink: Optional[MultiSink] = None
+        self.seen: Optional[SeenIndex] = None
+        self.resume = resume
+        self.checkpoint = Checkpoint.for_site(os.path.join(os.path.dirname(__file__), 'data'), "axesor")
+
+
+    def _get_page(self):
         
-        delay = random.uniform(*self.request_delay)
-        rprint(f"[yellow]Esperando {delay:.2f} segundos...[/yellow]")
-        time.sleep(delay)
+        return self.context_pool.page()
 
 
     def _append_to_json(self, data: CompanyMetadata):
-        
-        data_dir = os.path.join(os.path.dirname(__file__), 'data')
-        os.makedirs(data_dir, exist_ok=True)
-
-        json_path = os.path.join(data_dir, self.json_filename)
-        if os.path.exists(json_path):
-            with open(json_path, 'r', encoding='utf-8') as f:
-                existing_data = json.load(f)
-        else:
-            existing_data = []
 
-        existing_data.append(data)
+        if self.sink is None:
+            self.sink = open_sinks(
+                os.path.join(os.path.dirname(__file__), 'data'),
+                self.json_filename,
+                table="axesor_companies"
+            )
 
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(existing_data, f, ensure_ascii=False, indent=4)
+        self.sink.write(data)
+        budget.count_record()
+        if self.seen is not None:
+            self.seen.mark(data["url"])
 
 
     def scrap_places(self, URL: str) -> List[str]:
         
         rprint("[yellow]Intentando obtener municipios de Comunidad Madrid[/yellow]")
-        self._random_delay()
         
         for attempt in range(self.max_retries):
             try:
                 with self._get_page() as page:
-                    page.goto(URL, wait_until="networkidle", timeout=60000)
-                    page.wait_for_selector("tr a", timeout=30000)
+                    response = navigation.goto(page, URL, WAIT_POLICIES["places"])
+                    navigation.raise_for_status(response, URL)
+                    navigation.wait_ready(page, WAIT_POLICIES["places"])
 
                     places: List[str] = page.eval_on_selector_all(
                         "tr a",
@@ -110,49 +169,56 @@ class Axesor:
                     return filtered_places
 
             except Exception as e:
-                if attempt == self.max_retries - 1:
-                    print(f"Error después de {self.max_retries} intentos: {str(e)[:100]}")
+                if not retry.should_retry(e, attempt, self.max_retries):
+                    print(f"Error tras {attempt + 1} intentos: {str(e)[:100]}")
                     return []
                 rprint(f"[red]Intento {attempt + 1} fallido, reintentando...[/red]")
-                self._random_delay()
+                retry.backoff(attempt)
 
 
-    def scrap_company_links(self, place_url: str) -> List[str]:
+    def scrap_company_links(self, place_url: str, cursor: Optional[Dict] = None) -> List[str]:
         
         rprint(f"[yellow]Extrayendo enlaces de empresas de: {place_url}[/yellow]")
-        self._random_delay()
         
+        cursor = cursor or {}
         company_links = []
-        current_url = place_url
-        page_num = 1
+        current_url = cursor.get('listing_url', place_url)
+        page_num = cursor.get('page_num', 1)
+        # Última página que la barra de paginación ha mostrado: hasta ella las páginas existen
+        last_visible_page = cursor.get('last_visible_page', 0)
         
         while True:
             rprint(f"[cyan]Procesando página {page_num}: {current_url}[/cyan]")
+            self.checkpoint.save(listing_url=current_url, page_num=page_num, last_visible_page=last_visible_page)
+            if budget.exhausted():
+                return company_links
             
             for attempt in range(self.max_retries):
                 try:
                     with self._get_page() as page:
-                        response = page.goto(current_url, wait_until="networkidle", timeout=60000)
+                        response = navigation.goto(page, current_url, WAIT_POLICIES["listing"])
                         
                         if response.status == 404:
                             rprint(f"[yellow]Página {page_num} no encontrada (404)[/yellow]")
                             rprint(f"[green]Total empresas en municipio: {len(company_links)}[/green]")
                             return company_links
+
+                        navigation.raise_for_status(response, current_url)
                         
                         error_element = page.query_selector('div.error_cabecera.reloaded h2.resaltado')
                         if error_element and "Estimado usuario" in (error_element.inner_text() or ""):
+                            # Pasada la última página Axesor sirve este mismo aviso; si la paginación anunciaba
+                            # la página (o es la primera), es un bloqueo de verdad
+                            if page_num == 1 or page_num <= last_visible_page:
+                                throttle.record(current_url, failure="página de bloqueo")
+                                raise navigation.BlockedPage(current_url)
+                            rprint(f"[green]Fin de la paginación en la página {page_num}[/green]")
                             rprint(f"[green]Total empresas en municipio: {len(company_links)}[/green]")
                             return company_links
                         
-                        page.wait_for_selector("a[href^='//www.axesor.es/Informes-Empresas/']", timeout=30000)
+                        navigation.wait_ready(page, WAIT_POLICIES["listing"])
 
-                        raw_links = page.eval_on_selector_all(
-                            "a[href^='//www.axesor.es/Informes-Empresas/']",
-                            "elements => elements.map(el => el.getAttribute('href'))"
-                        )
-
-                        pattern = re.compile(r"^//www\.axesor\.es/Informes-Empresas/.*")
-                        current_page_links = [f"https:{href}" for href in raw_links if pattern.match(href)]
+                        current_page_links = self._extract_listing(page, current_url)
                         current_count = len(current_page_links)
                         
                         if current_count == 0:
@@ -161,39 +227,89 @@ class Axesor:
                             return company_links
                         
                         company_links.extend(current_page_links)
+                        self._enqueue_listing(place_url, current_page_links)
+                        budget.count_page()
                         rprint(f"[green]Encontradas {current_count} empresas en página {page_num} (Total: {len(company_links)})[/green]")
                         
                         pagination_info = self._detect_pagination(page)
                         
                         rprint(f"[cyan]Info paginación: {pagination_info}[/cyan]")
+                        last_visible_page = max(last_visible_page, pagination_info.get('max_visible_page', page_num))
                         
                         if not pagination_info['has_more_pages']:
                             rprint(f"[green]No hay más páginas disponibles[/green]")
                             rprint(f"[green]Total empresas en municipio: {len(company_links)}[/green]")
                             return company_links
 
-                        next_page_num = page_num + 1
-                        base_url = place_url.rstrip('/')
-                        
-                        if re.search(r'/\d+$', base_url):
-                            current_url = re.sub(r'/\d+$', f'/{next_page_num}', base_url)
+                        max_visible_page = pagination_info.get('max_visible_page', page_num)
+                        if self.listing_fanout is not None and max_visible_page > page_num + 1:
+                            page_num = self._fan_out_listings(place_url, company_links, page_num + 1, max_visible_page)
                         else:
-                            current_url = f"{base_url}/{next_page_num}"
+                            page_num += 1
+                        current_url = self._listing_page_url(place_url, page_num)
                         
                         rprint(f"[green]Siguiente página: {current_url}[/green]")
-                        page_num += 1
                         break
 
                 except Exception as e:
-                    if attempt == self.max_retries - 1:
-                        rprint(f"[red]Error después de {self.max_retries} intentos: {str(e)[:100]}[/red]")
+                    if not retry.should_retry(e, attempt, self.max_retries):
+                        rprint(f"[red]Error tras {attempt + 1} intentos: {str(e)[:100]}[/red]")
                         rprint(f"[green]Total empresas en municipio: {len(company_links)}[/green]")
+                        if isinstance(e, navigation.BlockedPage):
+                            # El municipio no está terminado: main lo deja pendiente para --resume
+                            raise
                         return company_links
                     
                     rprint(f"[red]Intento {attempt + 1} fallido, reintentando...[/red]")
-                    self._random_delay()
-            
-            self._random_delay()
+                    retry.backoff(attempt)
+
+
+    def _extract_listing(self, page: Page, listing_url: str) -> List[str]:
+        
+        return self._listing_links(page.evaluate(LISTING_JS))
+
+
+    def _listing_links(self, raw_links: List[str]) -> List[str]:
+
+        pattern = re.compile(r"^//www\.axesor\.es/Informes-Empresas/.*")
+        return [f"https:{href}" for href in raw_links if href and pattern.match(href)]
+
+
+    def _listing_page_url(self, place_url: str, page_num: int) -> str:
+
+        base_url = place_url.rstrip('/')
+        if re.search(r'/\d+$', base_url):
+            return re.sub(r'/\d+$', f'/{page_num}', base_url)
+        return f"{base_url}/{page_num}"
+
+
+    def _enqueue_listing(self, place_url: str, links: List[str]) -> None:
+
+        self.frontier.enqueue(
+            [url for url in links if not (self.seen is not None and self.seen.is_fresh(url))],
+            kind="detail",
+            parent=place_url
+        )
+
+
+    def _fan_out_listings(self, place_url: str, company_links: List[str], first: int, last: int) -> int:
+
+        # Páginas first..last-1 a la vez; last se pide luego por la ruta normal para leer su paginación.
+        # El reparto se corta en la primera página con 404, vacía, bloqueada o fallida y desde ahí se sigue en secuencia
+        urls = [self._listing_page_url(place_url, num) for num in range(first, last)]
+        rprint(f"[cyan]Descargando páginas {first}-{last - 1} en paralelo...[/cyan]")
+        results = self.listing_fanout.evaluate_many(urls, LISTING_JS)
+
+        for num, url, raw_links in zip(range(first, last), urls, results):
+            current_page_links = self._listing_links(raw_links or [])
+            if not current_page_links:
+                reason = self.listing_fanout.errors.get(url, "sin empresas")
+                rprint(f"[yellow]Página {num} detiene el reparto ({reason[:80]}), se sigue en secuencia[/yellow]")
+                return num
+            company_links.extend(current_page_links)
+            self._enqueue_listing(place_url, current_page_links)
+            rprint(f"[green]Encontradas {len(current_page_links)} empresas en página {num} (Total: {len(company_links)})[/green]")
+        return last
 
 
     def _detect_pagination(self, page: Page) -> Dict[str, any]:
@@ -258,52 +374,38 @@ class Axesor:
             return {'has_more_pages': False, 'reason': f'error: {str(e)}'}
 
 
+    def _extract_detail(self, page: Page, company_url: str) -> CompanyMetadata:
+        
+        metadata: CompanyMetadata = extraction.extract(page, DETAIL_SPEC)
+        metadata["direccion"] = self._clean_address(metadata["direccion"])
+        metadata["url"] = company_url
+
+        return metadata
+
+
     def scrap_company_metadata(self, company_url: str) -> Optional[CompanyMetadata]:
         
         rprint("[blue]*[/blue]" * 15)
-        self._random_delay()
+
+        if self.http is not None:
+            record = self.http.extract(company_url, DETAIL_SPEC)
+            if record is not None:
+                record["direccion"] = self._clean_address(record["direccion"])
+                metadata: CompanyMetadata = {**record, "url": company_url}
+                rprint(f"[green]Datos obtenidos por HTTP para {metadata['nombre']}:[/green]")
+                for key, value in metadata.items():
+                    if key != "url":
+                        rprint(f"[cyan]{key.capitalize()}:[/cyan] {value}")
+                return metadata
         
         for attempt in range(self.max_retries):
             try:
                 with self._get_page() as page:
-                    page.goto(company_url, wait_until="networkidle", timeout=60000)
-                    page.wait_for_selector("tbody tr", timeout=30000)
+                    response = navigation.goto(page, company_url, WAIT_POLICIES["detail"])
+                    navigation.raise_for_status(response, company_url)
+                    navigation.wait_ready(page, WAIT_POLICIES["detail"])
                     
-                    new_format = page.query_selector(".c-empresa__detail-label") is not None
-                    
-                    if new_format:
-                        rprint("[cyan]Formato nuevo detectado (c-empresa)[/cyan]")
-                        metadata: CompanyMetadata = {
-                            "nombre": self._get_text_safe(page, "th:has-text('Nombre') + td.c-empresa__detail-value") or 
-                                     self._get_text_safe(page, "h1, h2, h3") or "N/A",
-                            "direccion": self._clean_address(
-                                self._get_text_safe(page, "th:has-text('Dirección') + td.c-empresa__detail-value")
-                            ),
-                            "cif": self._get_text_safe(page, "th:has-text('CIF') + td.c-empresa__detail-value"),
-                            "forma_juridica": self._get_text_safe(page, "th:has-text('Forma jurídica') + td.c-empresa__detail-value"),
-                            "fecha_constitucion": self._get_text_safe(page, "th:has-text('Fecha de constitución') + td.c-empresa__detail-value"),
-                            "objeto_social": self._get_text_safe(page, "th:has-text('Objeto social') + td.c-empresa__detail-value span.category") or
-                                           self._get_text_safe(page, "th:has-text('Objeto social') + td.c-empresa__detail-value"),
-                            "cnae": self._get_text_safe(page, "th:has-text('CNAE') + td.c-empresa__detail-value"),
-                            "sic": self._get_text_safe(page, "th:has-text('SIC') + td.c-empresa__detail-value"),
-                            "url": company_url
-                        }
-                    else:
-                        rprint("[cyan]Formato antiguo detectado[/cyan]")
-                        metadata: CompanyMetadata = {
-                            "nombre": self._get_text_safe(page, "h3.name") or "N/A",
-                            "direccion": self._clean_address(
-                                self._get_text_safe(page, "#Direccion + td")
-                            ),
-                            "cif": self._get_text_safe(page, "td:has-text('CIF:') + td"),
-                            "forma_juridica": self._get_text_safe(page, "td:has-text('Forma jurídica:') + td"),
-                            "fecha_constitucion": self._get_text_safe(page, "td:has-text('Fecha de constitución:') + td"),
-                            "objeto_social": self._get_text_safe(page, "td:has-text('Objeto social:') + td span.category") or
-                                           self._get_text_safe(page, "td:has-text('Objeto social:') + td"),
-                            "cnae": self._get_text_safe(page, "td:has-text('CNAE:') + td"),
-                            "sic": self._get_text_safe(page, "td:has-text('SIC:') + td"),
-                            "url": company_url
-                        }
+                    metadata = self._extract_detail(page, company_url)
                     
                     rprint(f"[green]Datos obtenidos para {metadata['nombre']}:[/green]")
                     for key, value in metadata.items():
@@ -313,21 +415,50 @@ class Axesor:
                     return metadata
                     
             except Exception as e:
-                if attempt == self.max_retries - 1:
-                    print(f"Error al extraer metadatos después de {self.max_retries} intentos: {str(e)[:100]}")
+                if not retry.should_retry(e, attempt, self.max_retries):
+                    self.errors[company_url] = f"{type(e).__name__}: {str(e)[:200]}"
+                    print(f"Error al extraer metadatos tras {attempt + 1} intentos: {str(e)[:100]}")
                     return None
                 rprint(f"[red]Intento {attempt + 1} fallido, reintentando...[/red]")
-                self._random_delay()
+                retry.backoff(attempt)
 
 
-    def _get_text_safe(self, page: Page, selector: str) -> str:
-        
-        try:
-            element = page.query_selector(selector)
-            return element.inner_text().strip() if element else "N/A"
-        except:
-            return "N/A"
-    
+    def _drain_companies(self) -> int:
+
+        # Vacía las fichas pendientes de la frontera: de una en una o por lotes con el motor async
+        companies_processed = 0
+        batch_size = self.async_fetcher.concurrency * 2 if self.async_fetcher is not None else 1
+
+        while True:
+            if budget.exhausted():
+                return companies_processed
+            batch = self.frontier.claim("detail", limit=batch_size)
+            if not batch:
+                return companies_processed
+
+            if self.async_fetcher is not None:
+                rprint(f"[cyan]Descargando {len(batch)} fichas en paralelo "
+                       f"(máx. {self.async_fetcher.concurrency} por dominio)...[/cyan]")
+                records = self.async_fetcher.fetch_many(batch, DETAIL_SPEC)
+                self.errors.update(self.async_fetcher.errors)
+                results = [
+                    {**record, "direccion": self._clean_address(record["direccion"]), "url": url} if record is not None else None
+                    for url, record in zip(batch, records)
+                ]
+            else:
+                results = [self.scrap_company_metadata(url) for url in batch]
+
+            for company_url, company_data in zip(batch, results):
+                if company_data is None:
+                    self.frontier.fail(company_url, self.errors.pop(company_url, "sin datos"))
+                    rprint(f"[red]Error al procesar {company_url}[/red]")
+                    continue
+
+                self._append_to_json(company_data)
+                self.frontier.complete(company_url)
+                companies_processed += 1
+                rprint(f"[green]Empresa guardada en JSON[/green]")
+
 
     def _clean_address(self, address: str) -> str:
         
@@ -346,55 +477,144 @@ class Axesor:
     def main(self) -> None:
         
         try:
+            metrics.reset()
+            budget.start_site()
             self.playwright = sync_playwright().start()
+            self.seen = open_seen_index()
             rprint("[green]Conectando...[/green]")
 
+            cursor = self.checkpoint.load() if self.resume else {}
+            if cursor.get('output'):
+                self.json_filename = cursor['output']
+
+            crawl = os.path.splitext(self.json_filename)[0]
+            self.frontier = Frontier(crawl, leases=open_lease_manager("axesor"))
+            if self.resume:
+                self.frontier.recover()
+
             self.browser = self.playwright.chromium.launch(
                 headless=True,
                 timeout=60000
             )
+            self.context_pool = ContextPool(
+                self.browser,
+                self.USER_AGENTS,
+                size=config.CONTEXT_POOL_SIZE,
+                max_uses=config.CONTEXT_MAX_USES,
+                ua_policy=config.UA_ROTATION,
+                on_new_context=BLOCKING_PROFILE.install if config.BLOCK_RESOURCES else None
+            )
+            if config.HTTP_FAST_PATH:
+                self.http = HttpFetcher(
+                    self.playwright,
+                    self.USER_AGENTS,
+                    name=BLOCKING_PROFILE.name,
+                    blocked_when=BLOCKED_WHEN
+                )
+            if config.ASYNC_DETAIL_CONCURRENCY > 0:
+                self.async_fetcher = AsyncDetailFetcher(
+                    self.USER_AGENTS,
+                    BLOCKING_PROFILE.name,
+                    WAIT_POLICIES["detail"],
+                    concurrency=config.ASYNC_DETAIL_CONCURRENCY,
+                    blocking_profile=BLOCKING_PROFILE
+                )
+            if config.LISTING_FANOUT > 0:
+                self.listing_fanout = AsyncDetailFetcher(
+                    self.USER_AGENTS,
+                    f"{BLOCKING_PROFILE.name}.listados",
+                    WAIT_POLICIES["listing"],
+                    concurrency=config.LISTING_FANOUT,
+                    blocking_profile=BLOCKING_PROFILE
+                )
 
             places: List[str] = self.scrap_places(
                 "https://www.axesor.es/directorio-informacion-empresas/empresas-de-Madrid"
             )
             
             total_companies_processed = 0
+            blocked: Optional[str] = None
+            self.frontier.enqueue(places, kind="place")
             
             rprint(f"[blue]Procesando {len(places)} municipios...[/blue]")
             rprint(f"[blue]Archivo de salida: ./data/{self.json_filename}[/blue]")
             
-            for place_index, place in enumerate(places, 1):
+            if cursor.get('place_url'):
+                rprint(f"[cyan]Reanudando en {cursor['place_url']}, página {cursor.get('page_num', 1)}[/cyan]")
+            elif self.resume:
+                rprint("[yellow]No hay checkpoint pendiente, se empieza desde el principio[/yellow]")
+            
+            while not budget.exhausted():
+                claimed = self.frontier.claim("place")
+                if not claimed:
+                    break
+                place = claimed[0]
+                place_cursor = cursor if cursor.get('place_url') == place else {}
+                place_counts = self.frontier.counts("place")
+                place_index = place_counts["done"] + place_counts["failed"] + 1
+                
                 rprint(f"[magenta]{'='*50}[/magenta]")
-                rprint(f"[magenta]Procesando municipio {place_index}/{len(places)}: {place}[/magenta]")
+                rprint(f"[magenta]Procesando municipio {place_index}/{sum(place_counts.values())}: {place}[/magenta]")
                 rprint(f"[magenta]{'='*50}[/magenta]")
                 
-                company_links: List[str] = self.scrap_company_links(place)
-                
-                if not company_links:
-                    rprint(f"[yellow]No se encontraron empresas en {place}[/yellow]")
-                    continue
-                
-                rprint(f"[blue]Extrayendo metadatos de {len(company_links)} empresas del municipio...[/blue]")
+                self.checkpoint.save(
+                    output=self.json_filename,
+                    place_url=place,
+                    listing_url=place_cursor.get('listing_url', place),
+                    page_num=place_cursor.get('page_num', 1),
+                    last_visible_page=place_cursor.get('last_visible_page', 0)
+                )
+                try:
+                    company_links: List[str] = self.scrap_company_links(place, place_cursor)
+                except navigation.BlockedPage:
+                    blocked = place
+                    company_links = []
                 
-                for company_index, company_url in enumerate(company_links, 1):
-                    rprint(f"[cyan]Empresa {company_index}/{len(company_links)} del municipio {place_index}/{len(places)}[/cyan]")
-                    
-                    company_data = self.scrap_company_metadata(company_url)
-                    if company_data:
-                        self._append_to_json(company_data)
-                        total_companies_processed += 1
-                        rprint(f"[green]Empresa guardada en JSON. Total: {total_companies_processed}[/green]")
-                    
-                    rprint(f"[yellow]Progreso total: {total_companies_processed} empresas procesadas[/yellow]")
+                # Las fichas de la frontera incluyen las que quedaron pendientes de una ejecución interrumpida
+                detail_counts = self.frontier.counts("detail")
+                rprint(f"[blue]Extrayendo metadatos de {detail_counts['pending']} empresas pendientes...[/blue]")
+                total_companies_processed += self._drain_companies()
+                rprint(f"[yellow]Progreso total: {total_companies_processed} empresas procesadas[/yellow]")
                 
-                rprint(f"[green]Municipio {place} completado ({len([l for l in company_links])} empresas)[/green]")
-                self._random_delay()
-
+                if budget.stop_reason() is not None or blocked:
+                    # El municipio queda en vuelo y el checkpoint en su página: --resume sigue desde ahí
+                    break
+                self.frontier.complete(place)
+                rprint(f"[green]Municipio {place} completado ({len(company_links)} empresas)[/green]")
+
+            if blocked:
+                rprint(f"[red]Axesor bloquea los listados de {blocked}; el municipio queda pendiente para --resume[/red]")
+                rprint(f"[yellow]Proceso detenido. Total de empresas procesadas: {total_companies_processed}[/yellow]")
+                return
+
+            if budget.stop_reason() is not None:
+                rprint(f"[yellow]Proceso detenido. Total de empresas procesadas: {total_companies_processed}[/yellow]")
+                return
+
+            if places:
+                self.checkpoint.clear()
+            
             rprint(f"[green]Proceso completado! Total de empresas procesadas: {total_companies_processed}[/green]")
             rprint(f"[green]Total de municipios procesados: {len(places)}[/green]")
             rprint(f"[green]Archivo final: ./data/{self.json_filename}[/green]")
 
         finally:
+            if self.sink is not None:
+                self.sink.close()
+            if self.seen is not None:
+                self.seen.close()
+            if self.http is not None:
+                self.http.close()
+            if self.async_fetcher is not None:
+                self.async_fetcher.close()
+            if self.listing_fanout is not None:
+                self.listing_fanout.close()
+            if self.frontier is not None:
+                self.frontier.close()
+            if self.context_pool is not None:
+                self.context_pool.close()
+            metrics.report(type(self).__name__)
+            budget.report(type(self).__name__)
             if hasattr(self, 'browser') and self.browser:
                 self.browser.close()
             if hasattr(self, 'playwright') and self.playwright:
@@ -0,0 +1,715 @@
+import re
+import os
+from urllib.parse import urljoin
+from typing import Iterator, List, Dict, Optional, Tuple, TypedDict
+import config
+from datetime import datetime
+from playwright.sync_api import sync_playwright, Page, Browser
+from rich import print as rprint
+from core.storage import MultiSink, open_sinks
+from core.browser_pool import ContextPool
+from core.resource_blocking import BlockingProfile
+from core import budget
+from core import metrics
+from core import navigation
+from core import retry
+from core import sharding
+from core import extraction
+from core.navigation import WaitPolicy
+from core.seen_index import SeenIndex, open_seen_index
+from core.checkpoint import Checkpoint
+from core.http_fetch import HttpFetcher
+from core.async_engine import AsyncDetailFetcher
+from core.frontier import Frontier
+from core.coordination import open_lease_manager
+from core.pipeline import ListingPrefetcher, listing_browser
+from core.detail_cache import DetailCache
+
+
+BLOCKING_PROFILE = BlockingProfile(
+    "paginasamarillas",
+    blocked_types=("image", "media", "font", "stylesheet"),
+    allowed_hosts=("paginasamarillas.es",)
+)
+
+# El HTML llega renderizado desde el servidor: basta con el DOM y el selector de cada tipo de página
+WAIT_POLICIES = {
+    "listing": WaitPolicy("domcontentloaded", ".listado-item"),
+    "detail": WaitPolicy("domcontentloaded", 'h1[itemprop="name"]'),
+}
+
+# Tarjetas de una página de listado: enlace a la ficha y los datos que ya se ven en el listado.
+# Lo usan el navegador síncrono y el reparto en paralelo
+LISTING_SELECTOR = ".listado-item"
+CARD_SPEC = {
+    "fields": {
+        "url": {"selector": ".row a", "attr": "href", "default": ""},
+        "nombre": {"selector": '[itemprop="name"]'},
+        "direccion": {
+            "require": '[itemprop="address"]',
+            "parts": [
+                {"selector": '[itemprop="streetAddress"]'},
+                {"selector": '[itemprop="postalCode"]'},
+                {"selector": '[itemprop="addressLocality"]'},
+            ],
+        },
+        "telefono": {"selector": '[itemprop="telephone"]'},
+        "website": {"selector": "a.web", "attr": "href"},
+    }
+}
+
+# Categoría (valor de la columna categoria) -> primera página de su listado; {ciudad} y {provincia} son
+# los slugs tal y como aparecen en las URLs del sitio (madrid, barcelona, valencia...)
+CATEGORIES: Dict[str, str] = {
+    "abogados": "https://www.paginasamarillas.es/a/abogados/{ciudad}/",
+    "bares": "https://www.paginasamarillas.es/a/bares/{ciudad}/",
+    "belleza": "https://www.paginasamarillas.es/a/belleza-y-estetica/{ciudad}/",
+    "cafeterias": "https://www.paginasamarillas.es/a/cafeterias/{ciudad}/",
+    "cerrajeros24h": "https://www.paginasamarillas.es/a/cerrajeros-24-horas/{ciudad}/",
+    "comidaChina": "https://www.paginasamarillas.es/r/restaurante-chino/{ciudad}/",
+    "copas": "https://www.paginasamarillas.es/a/bar-de-copas/{ciudad}/",
+    "dentistas": "https://www.paginasamarillas.es/a/dentistas/{ciudad}/",
+    "desguases": "https://www.paginasamarillas.es/a/desguaces/{ciudad}/",
+    "estancos": "https://www.paginasamarillas.es/a/estanco/{ciudad}/",
+    "farmacias": "https://www.paginasamarillas.es/a/farmacias/{ciudad}/",
+    "farmacias24h": "https://www.paginasamarillas.es/a/servicio-de-farmacia-24-horas/{ciudad}/",
+    "floristerias": "https://www.paginasamarillas.es/a/floristerias/{ciudad}/",
+    "fontaneros24h": "https://www.paginasamarillas.es/a/fontaneros/{ciudad}/",
+    "gasolineras": "https://www.paginasamarillas.es/a/gasolinera/{ciudad}/",
+    "gestorias": "https://www.paginasamarillas.es/a/gestorias/{ciudad}/",
+    "gimnasios": "https://www.paginasamarillas.es/a/gimnasios/{ciudad}/",
+    "guarderias": "https://www.paginasamarillas.es/a/guarderias/{ciudad}/",
+    "hoteles": "https://www.paginasamarillas.es/h/hotel/{ciudad}/",
+    "loteria": "https://www.paginasamarillas.es/a/administracion-de-loteria/{ciudad}/",
+    "parking": "https://www.paginasamarillas.es/a/parking/{ciudad}/",
+    "peluquerias": "https://www.paginasamarillas.es/a/peluqueria/{ciudad}/",
+    "pizzerias": "https://www.paginasamarillas.es/a/pizzeria/{ciudad}/",
+    "pollosAsados": "https://www.paginasamarillas.es/a/pollo-asado/{ciudad}/",
+    "restaurantes": "https://www.paginasamarillas.es/r/restaurantes/{provincia}/{ciudad}/",
+    "tiendas_ropa": "https://www.paginasamarillas.es/a/tiendas-de-ropa/{ciudad}/",
+    "salud": "https://www.paginasamarillas.es/a/centro-de-salud/{ciudad}/",
+    "supermercados": "https://www.paginasamarillas.es/a/supermercados/{ciudad}/",
+    "talleres": "https://www.paginasamarillas.es/a/taller-mecanico/{ciudad}/",
+    "talleres24h": "https://www.paginasamarillas.es/a/talleres-24-horas/{ciudad}/",
+    "taxis": "https://www.paginasamarillas.es/a/taxis/{ciudad}/",
+    "urgenciaMedica24h": "https://www.paginasamarillas.es/a/urgencia-medica/{ciudad}/",
+    "veterinarios": "https://www.paginasamarillas.es/a/veterinarios/{ciudad}/",
+    "veterinarios24h": "https://www.paginasamarillas.es/a/veterinario-24-horas/{ciudad}/",
+}
+
+DETAIL_SPEC = {
+    "fields": {
+        "nombre": {"selector": 'h1[itemprop="name"]'},
+        "descripcion": {"selector": '.claim p'},
+        "direccion": {
+            "require": '.address[itemprop="address"]',
+            "parts": [
+                {"selector": '[itemprop="streetAddress"]'},
+                {"selector": '[itemprop="postalCode"]'},
+                {"selector": '[itemprop="addressLocality"]'},
+            ],
+        },
+        "telefono": {"selector": '.telephone[itemprop="telephone"]'},
+        "website": {"selector": '.sitio-web[itemprop="url"]', "attr": "href"},
+        "actividades": {"selector": '.actividades p'},
+    }
+}
+
+
+
+class CompanyMetadata(TypedDict):
+    nombre: str
+    descripcion: str
+    direccion: str
+    telefono: str
+    website: str
+    actividades: str
+    url: str
+
+
+
+class PaginasAmarillas:
+
+    # El supervisor puede repartir las unidades ciudad × categoría entre varios procesos
+    shardable = True
+    
+    def __init__(self, resume: bool = False, categories: Optional[List[str]] = None,
+                 cities: Optional[List[str]] = None):
+        self.USER_AGENTS: List[str] = config.USER_AGENTS
+        self.playwright = None
+        self.browser: Optional[Browser] = None
+        self.context_pool: Optional[ContextPool] = None
+        self.http: Optional[HttpFetcher] = None
+        self.async_fetcher: Optional[AsyncDetailFetcher] = None
+        self.listing_fanout: Optional[AsyncDetailFetcher] = None
+        self.frontier: Optional[Frontier] = None
+        self.errors: Dict[str, str] = {}
+        self.max_retries = config.RETRY_MAX_ATTEMPTS
+        self.detail_cache: Optional[DetailCache] = None
+        # Datos de la tarjeta del listado de cada ficha pendiente
+        self.cards: Dict[str, CompanyMetadata] = {}
+        self.progress: Optional[sharding.ShardProgress] = None
+
+        # Cada shard tiene su propia salida y su propio checkpoint
+        shard = sharding.current()
+        self.name = f"paginasamarillas_s{shard[0]}de{shard[1]}" if shard else "paginasamarillas"
+        self.json_filename = f"{self.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        self.sink: Optional[MultiSink] = None
+        self.seen: Optional[SeenIndex] = None
+        self.resume = resume
+        self.checkpoint = Checkpoint.for_site(os.path.join(os.path.dirname(__file__), 'data'), self.name)
+
+        # PA_CATEGORIES en el entorno limita la ejecución a unas categorías (p. ej. para repartirlas entre máquinas)
+        self.categories = categories or config.PA_CATEGORIES or list(CATEGORIES)
+        unknown = [categoria for categoria in self.categories if categoria not in CATEGORIES]
+        if unknown:
+            raise ValueError(f"Categorías desconocidas: {', '.join(unknown)} (opciones: {', '.join(CATEGORIES)})")
+        self.cities = cities or config.PA_CITIES
+
+        # Campos que tiene que tener cada registro: si la tarjeta del listado ya los trae no se abre la ficha
+        self.required_fields = config.PA_REQUIRED_FIELDS
+        unknown = [field for field in self.required_fields if field not in DETAIL_SPEC["fields"]]
+        if unknown:
+            raise ValueError(f"Campos desconocidos en PA_REQUIRED_FIELDS: {', '.join(unknown)}")
+
+        # Matriz ciudad × categoría; cada shard se queda con las unidades que le asigna el hash de su clave
+        self.units = sharding.select(
+            [(categoria, ciudad) for ciudad in self.cities for categoria in self.categories],
+            key=self._unit_key
+        )
+
+
+    def _unit_key(self, unit: Tuple[str, str]) -> str:
+
+        return f"{unit[0]}/{unit[1]}"
+
+
+    def _get_page(self):
+        
+        return self.context_pool.page()
+
+
+    def _write(self, data: CompanyMetadata, categorias: List[str]):
+
+        if self.sink is None:
+            self.sink = open_sinks(
+                os.path.join(os.path.dirname(__file__), 'data'),
+                self.json_filename,
+                table="pa_companies"
+            )
+
+        # Una empresa de varias categorías lleva todas, separadas por comas
+        self.sink.write({**data, "categoria": ",".join(categorias)})
+
+
+    def _append_to_json(self, data: CompanyMetadata):
+
+        self._write(data, self.detail_cache.store(data["url"], data))
+        budget.count_record()
+        self.progress.record()
+        if self.seen is not None:
+            self.seen.mark(data["url"])
+
+
+    def _detect_pagination(self, page: Page) -> Dict[str, any]:
+        
+        try:
+            pagination_container = page.query_selector('div.pag2 ul.pagination')
+            
+            if not pagination_container:
+                rprint(f"[yellow]No se encontró contenedor de paginación[/yellow]")
+                return {'has_more_pages': False, 'reason': 'no_pagination_container'}
+            
+            current_page_element = pagination_container.query_selector('li.active a')
+            current_page = 1
+            if current_page_element:
+                current_page_text = current_page_element.inner_text().strip()
+                current_page = int(current_page_text) if current_page_text.isdigit() else 1
+            
+            page_links = pagination_container.query_selector_all('li a[href]:not([href*="javascript:void"])')
+            page_numbers = []
+            
+            for link in page_links:
+                page_text = link.inner_text().strip()
+                if page_text.isdigit():
+                    page_numbers.append(int(page_text))
+
+            next_button = pagination_container.query_selector('li a i.fa.icon-flecha-derecha')
+            has_next_button = next_button is not None
+
+            next_url = None
+            if has_next_button:
+                next_link = next_button.evaluate('el => el.closest("a")')
+                if next_link:
+                    next_url = page.evaluate('el => el.href', next_link)
+
+            max_visible_page = max(page_numbers) if page_numbers else current_page
+            has_more_pages = False
+            reason = ""
+            
+            if has_next_button and next_url and "javascript:void" not in next_url:
+                has_more_pages = True
+                reason = "next_button_with_valid_url"
+            elif current_page < max_visible_page:
+                has_more_pages = True
+                reason = f"current_page_{current_page}_less_than_max_{max_visible_page}"
+            else:
+                has_more_pages = False
+                reason = "no_more_pages_detected"
+            
+            result = {
+                'has_more_pages': has_more_pages,
+                'current_page': current_page,
+                'visible_pages': page_numbers,
+                'max_visible_page': max_visible_page,
+                'has_next_button': has_next_button,
+                'next_url': next_url,
+                'reason': reason
+            }
+            
+            return result
+            
+        except Exception as e:
+            rprint(f"[red]Error detectando paginación: {str(e)}[/red]")
+            return {'has_more_pages': False, 'reason': f'error: {str(e)}'}
+
+
+    def _cards(self, cards: List[Dict[str, str]], listing_url: str) -> List[CompanyMetadata]:
+
+        # Registros parciales: lo que la tarjeta no trae queda como N/A, igual que en la ficha
+        return [
+            {**{field: "N/A" for field in DETAIL_SPEC["fields"]}, **card, "url": urljoin(listing_url, card["url"])}
+            for card in cards if card["url"]
+        ]
+
+
+    def _extract_listing(self, page: Page, listing_url: str) -> List[CompanyMetadata]:
+        
+        return self._cards(extraction.extract_all(page, LISTING_SELECTOR, CARD_SPEC), listing_url)
+
+
+    def _card_complete(self, url: str) -> bool:
+
+        card = self.cards.get(url)
+        return card is not None and all(card.get(field, "N/A") != "N/A" for field in self.required_fields)
+
+
+    def _process_companies(self, cards: List[CompanyMetadata], listing_url: str, categoria: str) -> int:
+        
+        try:
+            company_links = [card["url"] for card in cards]
+            if not company_links:
+                rprint(f"[yellow]No se encontraron empresas en esta página[/yellow]")
+                return 0
+            
+            rprint(f"[cyan]Procesando {len(company_links)} empresas de esta página...[/cyan]")
+
+            # Empresas ya descargadas en otra categoría: no se vuelven a pedir, solo se reescriben con la nueva etiqueta
+            for data, categorias in self.detail_cache.tag(company_links, categoria):
+                self._write(data, categorias)
+                metrics.incr(f"{BLOCKING_PROFILE.name}.shared_details")
+                rprint(f"[cyan]  ↺ {data['nombre']} ya descargada, categorías: {', '.join(categorias)}[/cyan]")
+
+            pending_links = [url for url in company_links if not (self.seen is not None and self.seen.is_fresh(url))]
+            if len(pending_links) < len(company_links):
+                rprint(f"[yellow]  ↷ {len(company_links) - len(pending_links)} extraídas recientemente, se omiten[/yellow]")
+
+            # Solo se guardan las tarjetas de las URLs que entran en la frontera: las demás nunca se reclaman
+            queued = set(self.frontier.enqueue(pending_links, kind="detail", parent=listing_url))
+            self.cards.update((card["url"], card) for card in cards if card["url"] in queued)
+            return self._drain_companies()
+            
+        except Exception as e:
+            rprint(f"[red]Error procesando empresas de la página actual: {str(e)}[/red]")
+            return 0
+
+
+    def _drain_companies(self) -> int:
+
+        # Vacía las fichas pendientes de la frontera: de una en una o por lotes con el motor async
+        companies_processed = 0
+        batch_size = self.async_fetcher.concurrency * 2 if self.async_fetcher is not None else 1
+
+        while True:
+            if budget.exhausted():
+                return companies_processed
+            batch = self.frontier.claim("detail", limit=batch_size)
+            if not batch:
+                return companies_processed
+
+            # Con la tarjeta completa no hace falta abrir la ficha
+            from_cards = [url for url in batch if self._card_complete(url)]
+            for company_url in from_cards:
+                self._append_to_json(self.cards.pop(company_url))
+                self.frontier.complete(company_url)
+                companies_processed += 1
+                rprint(f"[green]  ✓ Guardada desde el listado[/green]")
+            metrics.incr(f"{BLOCKING_PROFILE.name}.card_only", len(from_cards))
+            batch = [url for url in batch if url not in from_cards]
+            if not batch:
+                continue
+
+            if self.async_fetcher is not None:
+                rprint(f"[cyan]Descargando {len(batch)} fichas en paralelo "
+                       f"(máx. {self.async_fetcher.concurrency} por dominio)...[/cyan]")
+                records = self.async_fetcher.fetch_many(batch, DETAIL_SPEC)
+                self.errors.update(self.async_fetcher.errors)
+                results = [{**record, "url": url} if record is not None else None for url, record in zip(batch, records)]
+            else:
+                results = [self.scrape_company_metadata(url) for url in batch]
+
+            for company_url, company_data in zip(batch, results):
+                card = self.cards.pop(company_url, None)
+                if company_data is None:
+                    self.frontier.fail(company_url, self.errors.pop(company_url, "sin datos"))
+                    rprint(f"[red]  ✗ Error al procesar empresa[/red]")
+                    continue
+
+                # La ficha manda; la tarjeta cubre lo que la ficha no trae
+                if card is not None:
+                    company_data = {**card, **{key: value for key, value in company_data.items() if value != "N/A"}}
+                self._append_to_json(company_data)
+                self.frontier.complete(company_url)
+                companies_processed += 1
+                rprint(f"[green]  ✓ Guardada en JSON[/green]")
+
+
+    def _listing_page_url(self, base_url: str, page_num: int) -> str:
+
+        base_url_clean = base_url.rstrip('/')
+        if re.search(r'/\d+$', base_url_clean):
+            return re.sub(r'/\d+$', f'/{page_num}', base_url_clean)
+        return f"{base_url_clean}/{page_num}"
+
+
+    def _fetch_listing(self, pool: ContextPool, current_url: str, page_num: int) -> Optional[Dict[str, any]]:
+
+        for attempt in range(self.max_retries):
+            try:
+                with pool.page() as page:
+                    response = navigation.goto(page, current_url, WAIT_POLICIES["listing"])
+                    
+                    if response.status == 404:
+                        rprint(f"[yellow]Página {page_num} no encontrada (404)[/yellow]")
+                        return None
+
+                    navigation.raise_for_status(response, current_url)
+                    
+                    navigation.wait_ready(page, WAIT_POLICIES["listing"])
+
+                    cards = self._extract_listing(page, page.url)
+                    
+                    pagination_info = self._detect_pagination(page)
+                    rprint(f"[cyan]Info paginación: {pagination_info}[/cyan]")
+                    
+                    if not pagination_info['has_more_pages']:
+                        rprint(f"[green]No hay más páginas disponibles - {pagination_info['reason']}[/green]")
+                        next_url = None
+                    elif pagination_info.get('next_url'):
+                        next_url = pagination_info['next_url']
+                    else:
+                        next_url = self._listing_page_url(current_url, page_num + 1)
+                    
+                    return {
+                        'url': current_url,
+                        'page_num': page_num,
+                        'cards': cards,
+                        'next_url': next_url,
+                        'max_visible_page': pagination_info.get('max_visible_page', page_num)
+                    }
+
+            except Exception as e:
+                if not retry.should_retry(e, attempt, self.max_retries):
+                    rprint(f"[red]Error tras {attempt + 1} intentos: {str(e)[:100]}[/red]")
+                    raise
+                
+                rprint(f"[red]Intento {attempt + 1} fallido, reintentando...[/red]")
+                retry.backoff(attempt)
+
+
+    def _fan_out_listings(self, base_url: str, first: int, last: int) -> Tuple[List[Dict[str, any]], int]:
+
+        # Páginas first..last-1 a la vez; last se pide luego por la ruta normal para leer su paginación.
+        # El reparto se corta en la primera página con 404, vacía o fallida y desde ahí se sigue en secuencia
+        pages = [(num, self._listing_page_url(base_url, num)) for num in range(first, last)]
+        pages = [(num, url) for num, url in pages if self.frontier.try_acquire(url)]
+        rprint(f"[cyan]Descargando páginas {first}-{last - 1} en paralelo...[/cyan]")
+        results = self.listing_fanout.evaluate_many(
+            [url for _, url in pages],
+            extraction.EXTRACT_ALL_JS,
+            {"selector": LISTING_SELECTOR, "spec": CARD_SPEC}
+        )
+
+        listings, stop = [], last
+        for (num, url), cards in zip(pages, results):
+            cards = self._cards(cards or [], url)
+            if not cards:
+                reason = self.listing_fanout.errors.get(url, "sin empresas")
+                rprint(f"[yellow]Página {num} detiene el reparto ({reason[:80]}), se sigue en secuencia[/yellow]")
+                stop = num
+                break
+            listings.append({
+                'url': url,
+                'page_num': num,
+                'cards': cards,
+                'next_url': self._listing_page_url(base_url, num + 1),
+                'max_visible_page': last
+            })
+
+        # Las páginas reclamadas desde el corte no llegan al consumidor: sus leases quedan libres
+        used = {listing['url'] for listing in listings}
+        for _, url in pages:
+            if url not in used:
+                self.frontier.drop_lease(url)
+        return listings, stop
+
+
+    def _discover_listings(self, base_url: str, current_url: str, page_num: int) -> Iterator[Dict[str, any]]:
+
+        # Productor: recorre la paginación con su propio navegador mientras el hilo principal descarga fichas
+        with listing_browser(
+            self.USER_AGENTS,
+            launch_options={"args": ["--ignore-certificate-errors", "--ignore-ssl-errors"]},
+            on_new_context=BLOCKING_PROFILE.install if config.BLOCK_RESOURCES else None
+        ) as pool:
+            while True:
+                if not self.frontier.try_acquire(current_url):
+                    rprint(f"[yellow]Página {page_num} asignada a otro nodo, se pasa a la siguiente[/yellow]")
+                    page_num += 1
+                    current_url = self._listing_page_url(base_url, page_num)
+                    continue
+
+                try:
+                    listing = self._fetch_listing(pool, current_url, page_num)
+                except Exception:
+                    self.frontier.drop_lease(current_url)
+                    raise
+                if listing is None:
+                    self.frontier.drop_lease(current_url)
+                    return
+
+                yield listing
+                if not listing['next_url']:
+                    return
+
+                if self.listing_fanout is not None and listing['max_visible_page'] > page_num + 1:
+                    fanned_out, page_num = self._fan_out_listings(base_url, page_num + 1, listing['max_visible_page'])
+                    yield from fanned_out
+                    current_url = self._listing_page_url(base_url, page_num)
+                else:
+                    current_url = listing['next_url']
+                    page_num += 1
+                rprint(f"[green]Siguiente página: {current_url}[/green]")
+
+
+    def scrape_company_urls(self, unit: Tuple[str, str]) -> bool:
+        
+        categoria, ciudad = unit
+        # Una ciudad se indica como "ciudad" o "provincia/ciudad" cuando no es capital de provincia
+        provincia, _, ciudad = ciudad.rpartition("/")
+        base_url = CATEGORIES[categoria].format(provincia=provincia or ciudad, ciudad=ciudad)
+        rprint(f"[yellow]Extrayendo enlaces de empresas de: {base_url}[/yellow]")
+        
+        cursor = self.checkpoint.state if self.resume and self.checkpoint.state.get('unit') == self._unit_key(unit) else {}
+        current_url = cursor.get('listing_url', base_url)
+        page_num = cursor.get('page_num', 1)
+        total_companies = 0
+        
+        if cursor:
+            rprint(f"[cyan]Reanudando en página {page_num}[/cyan]")
+        
+        listings = ListingPrefetcher(
+            lambda: self._discover_listings(base_url, current_url, page_num),
+            BLOCKING_PROFILE.name
+        )
+        try:
+            for listing in listings:
+                rprint(f"[cyan]Procesando página {listing['page_num']}: {listing['url']}[/cyan]")
+                # El checkpoint sigue a las fichas, no al productor: al reanudar se repite la página en curso
+                self.checkpoint.save(
+                    output=self.json_filename,
+                    unit=self._unit_key(unit),
+                    listing_url=listing['url'],
+                    page_num=listing['page_num']
+                )
+                if budget.exhausted():
+                    return False
+                self.frontier.enqueue([listing['url']], kind="listing", priority=1)
+                
+                companies_processed = self._process_companies(listing['cards'], listing['url'], categoria)
+                self.frontier.complete(listing['url'])
+                budget.count_page()
+                total_companies += companies_processed
+                rprint(f"[green]Procesadas {companies_processed} empresas en página {listing['page_num']}[/green]")
+
+        except Exception as e:
+            rprint(f"[red]Error recorriendo el listado: {str(e)[:100]}[/red]")
+            return False
+
+        finally:
+            listings.close()
+        
+        rprint(f"[green]Total empresas procesadas en {self._unit_key(unit)}: {total_companies}[/green]")
+        return True
+
+
+    def _extract_detail(self, page: Page, company_url: str) -> CompanyMetadata:
+        
+        metadata: CompanyMetadata = {**extraction.extract(page, DETAIL_SPEC), "url": company_url}
+        return metadata
+
+    
+    def scrape_company_metadata(self, company_url: str) -> Optional[CompanyMetadata]:
+
+        rprint("[blue]*[/blue]" * 15)
+
+        if self.http is not None:
+            record = self.http.extract(company_url, DETAIL_SPEC)
+            if record is not None:
+                metadata: CompanyMetadata = {**record, "url": company_url}
+                rprint(f"[green]Datos obtenidos por HTTP para {metadata['nombre']}:[/green]")
+                for key, value in metadata.items():
+                    if key != "url":
+                        rprint(f"[cyan]{key.capitalize()}:[/cyan] {value}")
+                return metadata
+
+        for attempt in range(self.max_retries):
+            try:
+                with self._get_page() as page:
+                    response = navigation.goto(page, company_url, WAIT_POLICIES["detail"])
+                    navigation.raise_for_status(response, company_url)
+                    navigation.wait_ready(page, WAIT_POLICIES["detail"])
+
+                    metadata = self._extract_detail(page, company_url)
+                    
+                    rprint(f"[green]Datos obtenidos para {metadata['nombre']}:[/green]")
+                    for key, value in metadata.items():
+                        if key != "url":
+                            rprint(f"[cyan]{key.capitalize()}:[/cyan] {value}")
+                    
+                    return metadata
+                    
+            except Exception as e:
+                if not retry.should_retry(e, attempt, self.max_retries):
+                    self.errors[company_url] = f"{type(e).__name__}: {str(e)[:200]}"
+                    print(f"Error al extraer metadatos tras {attempt + 1} intentos: {str(e)[:100]}")
+                    return None
+                rprint(f"[red]Intento {attempt + 1} fallido, reintentando...[/red]")
+                retry.backoff(attempt)
+
+
+    def main(self):
+        
+        try:
+            metrics.reset()
+            budget.start_site()
+            self.playwright = sync_playwright().start()
+            self.seen = open_seen_index()
+            rprint("[green]Conectando...[/green]")
+            
+            if self.resume:
+                cursor = self.checkpoint.load()
+                if cursor.get('output'):
+                    self.json_filename = cursor['output']
+                else:
+                    rprint("[yellow]No hay checkpoint pendiente, se empieza desde el principio[/yellow]")
+
+            crawl = os.path.splitext(self.json_filename)[0]
+            self.frontier = Frontier(crawl, leases=open_lease_manager("paginasamarillas"))
+            if self.resume:
+                self.frontier.recover()
+            self.detail_cache = DetailCache(crawl)
+            
+            self.browser = self.playwright.chromium.launch(
+                headless = True,
+                timeout = 60000,
+                args=["--ignore-certificate-errors", "--ignore-ssl-errors"]
+            )
+            self.context_pool = ContextPool(
+                self.browser,
+                self.USER_AGENTS,
+                size=config.CONTEXT_POOL_SIZE,
+                max_uses=config.CONTEXT_MAX_USES,
+                ua_policy=config.UA_ROTATION,
+                on_new_context=BLOCKING_PROFILE.install if config.BLOCK_RESOURCES else None
+            )
+            if config.HTTP_FAST_PATH:
+                self.http = HttpFetcher(self.playwright, self.USER_AGENTS, name=BLOCKING_PROFILE.name)
+            if config.ASYNC_DETAIL_CONCURRENCY > 0:
+                self.async_fetcher = AsyncDetailFetcher(
+                    self.USER_AGENTS,
+                    BLOCKING_PROFILE.name,
+                    WAIT_POLICIES["detail"],
+                    concurrency=config.ASYNC_DETAIL_CONCURRENCY,
+                    blocking_profile=BLOCKING_PROFILE
+                )
+            if config.LISTING_FANOUT > 0:
+                self.listing_fanout = AsyncDetailFetcher(
+                    self.USER_AGENTS,
+                    f"{BLOCKING_PROFILE.name}.listados",
+                    WAIT_POLICIES["listing"],
+                    concurrency=config.LISTING_FANOUT,
+                    blocking_profile=BLOCKING_PROFILE
+                )
+            
+            # Un único navegador, pool y límite de peticiones para todas las unidades del shard
+            completed = self.checkpoint.state.get('completed', []) if self.resume else []
+            pending = [unit for unit in self.units if self._unit_key(unit) not in completed]
+            self.progress = sharding.ShardProgress(len(self.units), done=len(self.units) - len(pending))
+            rprint(
+                f"[blue]Shard {sharding.label()}: {len(pending)} unidades pendientes de {len(self.units)} "
+                f"({len(self.categories)} categorías × {len(self.cities)} ciudades en total)[/blue]"
+            )
+            rprint(f"[blue]Archivo de salida: ./data/{self.json_filename}[/blue]")
+            
+            for index, unit in enumerate(pending, 1):
+                rprint(f"[magenta]{'='*50}[/magenta]")
+                rprint(f"[magenta]Unidad {index}/{len(pending)}: {self._unit_key(unit)}[/magenta]")
+                rprint(f"[magenta]{'='*50}[/magenta]")
+                
+                if self.scrape_company_urls(unit):
+                    completed.append(self._unit_key(unit))
+                    self.checkpoint.save(output=self.json_filename, completed=completed, unit=None)
+                    self.progress.unit_done(self._unit_key(unit))
+                if budget.stop_reason() is not None:
+                    return []
+            
+            failed = [self._unit_key(unit) for unit in pending if self._unit_key(unit) not in completed]
+            if failed:
+                # El checkpoint se conserva: --resume reintenta solo las unidades que fallaron
+                rprint(f"[yellow]Proceso terminado con {len(failed)} unidades fallidas: {', '.join(failed)}; "
+                       f"continúa con --resume[/yellow]")
+                return []
+
+            self.checkpoint.clear()
+            rprint(f"[green]Proceso completado![/green]")
+            return []
+            
+        except Exception as e:
+            # Se relanza para que main.py y el supervisor registren el sitio como fallido, no como terminado
+            rprint(f"[red]Error general: {str(e)[:120]}[/red]")
+            raise
+            
+        finally:
+            if self.sink is not None:
+                self.sink.close()
+            if self.seen is not None:
+                self.seen.close()
+            if self.http is not None:
+                self.http.close()
+            if self.async_fetcher is not None:
+                self.async_fetcher.close()
+            if self.listing_fanout is not None:
+                self.listing_fanout.close()
+            if self.detail_cache is not None:
+                self.detail_cache.close()
+            if self.frontier is not None:
+                self.frontier.close()
+            if self.context_pool is not None:
+                self.context_pool.close()
+            metrics.report(f"{type(self).__name__} (shard {sharding.label()})")
+            budget.report(type(self).__name__)
+            if hasattr(self, 'browser') and self.browser:
+                self.browser.close()
+            if hasattr(self, 'playwright') and self.playwright:
+                self.playwright.stop()
@@ -1,14 +1,89 @@
 import re
-import json
-import random
-import time
 import os
-from typing import List, Dict, Optional, TypedDict
+from contextlib import nullcontext
+from typing import Iterator, List, Dict, Optional, TypedDict
 import config
 from datetime import datetime
-from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext
+from playwright.sync_api import sync_playwright, Page, Browser
 from rich import print as rprint
-from contextlib import contextmanager
+from core.storage import MultiSink, open_sinks
+from core.browser_pool import ContextPool
+from core.resource_blocking import BlockingProfile
+from core import api_capture
+from core import budget
+from core import metrics
+from core import navigation
+from core import retry
+from core import extraction
+from core.navigation import WaitPolicy
+from core.retry import PageNotFound
+from core.checkpoint import Checkpoint
+from core.frontier import Frontier
+from core.coordination import open_lease_manager
+from core.pipeline import ListingPrefetcher, listing_browser
+from core.session_state import SessionState
+
+
+# App Angular: scripts, XHR y hojas de estilo (visibilidad del diálogo de ubicación) son necesarios
+BLOCKING_PROFILE = BlockingProfile(
+    "supermarket23",
+    blocked_types=("image", "media", "font")
+)
+
+# El diálogo de ubicación lo pinta Angular después del DOM inicial; _check_and_handle_dialog
+# necesita que la red se haya calmado para encontrarlo
+WAIT_POLICIES = {
+    "listing": WaitPolicy("networkidle"),
+    "detail": WaitPolicy("networkidle", 'h1[itemprop="name"]', client_rendered=True),
+}
+
+# Con la ubicación ya guardada en la sesión el diálogo casi nunca aparece: basta el DOM inicial y el
+# selector de cada página, y el diálogo solo se busca si el selector no llega. En modo api también sin
+# sesión: los productos se pintan con el JSON del catálogo, así que con el selector la captura ya lo tiene
+FAST_WAIT_POLICIES = {
+    "listing": WaitPolicy("domcontentloaded", 'a[href*="/producto/"]', client_rendered=True),
+    "detail": WaitPolicy("domcontentloaded", 'h1[itemprop="name"]', client_rendered=True),
+}
+
+DETAIL_SPEC = {
+    "fields": {
+        "nombre": {"selector": 'h1[itemprop="name"]'},
+        "precio": {
+            "selector": 'meta[itemprop="price"]',
+            "attr": "content",
+            "template": "{} USD",
+            "fallbacks": [{"selector": 'span.regular_price'}],
+        },
+        "categoria": {
+            "selector": 'span[itemtype="https://schema.org/CategoryCode"] a.link',
+            "fallbacks": [{"selector": 'meta[itemprop="name"][content]', "attr": "content"}],
+        },
+        "marca": {
+            "selector": 'span[itemprop="brand"] a.link',
+            "fallbacks": [{"selector": 'span[itemprop="brand"] meta[itemprop="name"]', "attr": "content"}],
+        },
+        "descripcion": {"selector": 'p[itemprop="description"]'},
+    }
+}
+
+
+
+# Claves candidatas de cada campo en el JSON de la API del catálogo (se usa la primera que aparezca)
+PRODUCT_KEYS = {
+    "nombre": ("name", "nombre", "title", "productName"),
+    "precio": ("price", "precio", "finalPrice", "salePrice", "regularPrice"),
+    "categoria": ("category", "categoria", "categoryName", "categories"),
+    "marca": ("brand", "marca", "brandName", "manufacturer"),
+    "descripcion": ("description", "descripcion", "shortDescription", "summary"),
+}
+
+# Claves del JSON que pueden formar parte de la URL de la ficha, por orden de preferencia
+URL_KEYS = ("slug", "urlKey", "url_key", "handle", "url", "permalink", "sku", "code", "id")
+
+# dom: se renderiza cada ficha; capture: los productos salen del JSON que carga cada página de listado
+# y solo se abre la ficha de los que falten; api: además, descubierto el endpoint, el catálogo se pide
+# directamente página a página sin renderizar los listados
+MODES = ("dom", "capture", "api")
 
 
 class ProductMetadata(TypedDict):
@@ -22,59 +97,48 @@ class ProductMetadata(TypedDict):
 
 class Supermarket:
 
-    def __init__(self) -> None:
+    def __init__(self, resume: bool = False) -> None:
         self.USER_AGENTS: List[str] = config.USER_AGENTS
         self.playwright = None
         self.browser: Optional[Browser] = None
-        self.request_delay = (2, 4)
-        self.max_retries = 3
-        self.json_filename = f"supermarket_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-
-
-    @contextmanager
-    def _get_page(self, user_agent: str = None):
-        
-        context = None
-        page = None
-        try:
-            user_agent = user_agent or random.choice(self.USER_AGENTS)
-            context = self.browser.new_context(
-                user_agent=user_agent,
-                ignore_https_errors=True
-            )
-            page = context.new_page()
-            yield page
+        self.context_pool: Optional[ContextPool] = None
+        self.frontier: Optional[Frontier] = None
+        self.errors: Dict[str, str] = {}
+        self.max_retries = config.RETRY_MAX_ATTEMPTS
+        self.json_filename = f"supermarket_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        self.sink: Optional[MultiSink] = None
+        self.resume = resume
+        self.checkpoint = Checkpoint.for_site(os.path.join(os.path.dirname(__file__), 'data'), "supermarket")
+        # Cookies y localStorage con la ubicación de entrega ya elegida, compartidos por todos los contextos y ejecuciones
+        self.session = SessionState.for_site(os.path.join(os.path.dirname(__file__), 'data'), BLOCKING_PROFILE.name)
+
+        self.mode = config.SUPERMARKET_MODE
+        if self.mode not in MODES:
+            raise ValueError(f"SUPERMARKET_MODE no válido: {self.mode} (opciones: {', '.join(MODES)})")
+        # Registros ya construidos desde la API para las fichas pendientes
+        self.api_records: Dict[str, ProductMetadata] = {}
+        # Endpoint del catálogo y forma de la URL de ficha, los descubre el productor de listados
+        self.api_endpoint: Optional[api_capture.ApiEndpoint] = None
+        self.api_page_size = 0
+        self.url_template = None
+
+
+    def _get_page(self):
         
-        finally:
-            if page is not None:
-                page.close()
-            if context is not None:
-                context.close()
-
-
-    def _random_delay(self):
-
-        delay = random.uniform(*self.request_delay)
-        rprint(f"[yellow]Esperando {delay:.2f} segundos...[/yellow]")
-        time.sleep(delay)
+        return self.context_pool.page()
 
 
     def _append_to_json(self, data: ProductMetadata):
 
-        data_dir = os.path.join(os.path.dirname(__file__), 'data')
-        os.makedirs(data_dir, exist_ok=True)
-
-        json_path = os.path.join(data_dir, self.json_filename)
-        if os.path.exists(json_path):
-            with open(json_path, 'r', encoding='utf-8') as f:
-                existing_data = json.load(f)
-        else:
-            existing_data = []
-
-        existing_data.append(data)
+        if self.sink is None:
+            self.sink = open_sinks(
+                os.path.join(os.path.dirname(__file__), 'data'),
+                self.json_filename,
+                table="products"
+            )
 
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(existing_data, f, ensure_ascii=False, indent=4)
+        self.sink.write(data)
+        budget.count_record()
 
 
     def _handle_location_dialog(self, page: Page) -> bool:
@@ -240,81 +304,6 @@ class Supermarket:
             return False
 
 
-    def _get_text_safe(self, page: Page, selector: str) -> str:
-
-        try:
-            element = page.query_selector(selector)
-            if element:
-                try:
-                    return element.inner_text().strip()
-                except:
-                    return "N/A"
-            return "N/A"
-        except:
-            return "N/A"
-
-
-    def _get_price_safe(self, page: Page) -> str:
-
-        try:
-            price_meta = page.query_selector('meta[itemprop="price"]')
-            if price_meta:
-                price_value = price_meta.get_attribute('content')
-                if price_value:
-                    return f"{price_value} USD"
-            
-            price_span = page.query_selector('span.regular_price')
-            if price_span:
-                return price_span.inner_text().strip()
-            
-            return "N/A"
-        except:
-            return "N/A"
-
-
-    def _get_category_safe(self, page: Page) -> str:
-
-        try:
-            category_link = page.query_selector('span[itemtype="https://schema.org/CategoryCode"] a.link')
-            if category_link:
-                return category_link.inner_text().strip()
-            
-            category_meta = page.query_selector('meta[itemprop="name"][content]')
-            if category_meta:
-                return category_meta.get_attribute('content') or "N/A"
-                
-            return "N/A"
-        except:
-            return "N/A"
-
-
-    def _get_brand_safe(self, page: Page) -> str:
-
-        try:
-            brand_link = page.query_selector('span[itemprop="brand"] a.link')
-            if brand_link:
-                return brand_link.inner_text().strip()
-
-            brand_meta = page.query_selector('span[itemprop="brand"] meta[itemprop="name"]')
-            if brand_meta:
-                return brand_meta.get_attribute('content') or "N/A"
-                
-            return "N/A"
-        except:
-            return "N/A"
-
-
-    def _get_description_safe(self, page: Page) -> str:
-
-        try:
-            desc_p = page.query_selector('p[itemprop="description"]')
-            if desc_p:
-                return desc_p.inner_text().strip()
-            return "N/A"
-        except:
-            return "N/A"
-
-
     def _check_and_handle_dialog(self, page: Page):
 
         try:
@@ -343,10 +332,13 @@ class Supermarket:
             
             if dialog_found:
                 rprint(f"[cyan]Manejando diálogo con selector: {dialog_selector_used}[/cyan]")
+                metrics.incr(f"{BLOCKING_PROFILE.name}.location_dialogs")
                 success = self._handle_location_dialog(page)
                 if success:
+                    # _handle_location_dialog ya espera a que el diálogo desaparezca y la red se calme
                     rprint("[green]Diálogo manejado exitosamente[/green]")
-                    time.sleep(2)
+                    # El sitio ha vuelto a pedir la ubicación (o es la primera vez): se guarda para los contextos siguientes
+                    self.session.save(page.context)
                 else:
                     rprint("[red]Error manejando el diálogo[/red]")
             else:
@@ -358,6 +350,42 @@ class Supermarket:
             rprint(f"[yellow]Traceback: {traceback.format_exc()[:200]}[/yellow]")
 
 
+    def _wait_policy(self, kind: str) -> WaitPolicy:
+
+        return FAST_WAIT_POLICIES[kind] if self.mode == "api" or self.session.exists() else WAIT_POLICIES[kind]
+
+
+    def _wait_ready(self, page: Page, policy: WaitPolicy) -> None:
+
+        if policy.wait_until == "networkidle":
+            self._check_and_handle_dialog(page)
+            navigation.wait_ready(page, policy)
+            return
+        try:
+            navigation.wait_ready(page, policy)
+        except navigation.PageNotReady:
+            # El sitio ha vuelto a pedir la ubicación (sesión caducada) o la página va lenta
+            self._check_and_handle_dialog(page)
+            navigation.wait_ready(page, policy)
+
+
+    def _prepare_session(self, url: str) -> None:
+
+        # La ubicación se elige una sola vez; los contextos siguientes arrancan con el estado guardado
+        if self.session.exists():
+            rprint(f"[cyan]Reutilizando estado de sesión: {self.session.path}[/cyan]")
+            return
+
+        rprint("[cyan]Eligiendo la ubicación de entrega para la sesión...[/cyan]")
+        try:
+            with self._get_page() as page:
+                response = navigation.goto(page, url, WAIT_POLICIES["listing"])
+                navigation.raise_for_status(response, url)
+                self._check_and_handle_dialog(page)
+        except Exception as e:
+            rprint(f"[yellow]No se pudo preparar la sesión, se elegirá la ubicación al aparecer el diálogo: {str(e)[:100]}[/yellow]")
+
+
     def _detect_pagination(self, page: Page) -> Dict[str, any]:
 
         try:
@@ -414,116 +442,121 @@ class Supermarket:
             return {'has_more_pages': False, 'reason': f'error: {str(e)}'}
 
 
-    def _process_products_from_current_page(self, page: Page) -> int:
+    def _extract_listing(self, page: Page, listing_url: str) -> List[str]:
+
+        selectors_to_try = [
+            'a.primary_img',
+            'a[href*="/es/producto/"]',
+            'a[href*="/producto/"]',
+            '.product-item a',
+            '.product-link',
+            'a[href*="/es/productos/"]'
+        ]
+
+        product_links = []
+
+        for selector in selectors_to_try:
+            try:
+                rprint(f"[cyan]Probando selector: {selector}[/cyan]")
+                links = page.eval_on_selector_all(
+                    selector,
+                    '''nodes => nodes
+                        .map(node => {
+                            const href = node.getAttribute('href');
+                            if (!href) return null;
+
+                            if (href.includes('/producto/') || href.includes('/es/producto/')) {
+                                return href.startsWith('/') ? 'https://www.supermarket23.com' + href : href;
+                            }
+                            return null;
+                        })
+                        .filter(Boolean)
+                    '''
+                )
+
+                if links and len(links) > 0:
+                    # Deduplicar conservando el orden para que el índice del checkpoint sea estable
+                    product_links = list(dict.fromkeys(links))
+                    rprint(f"[green]Encontrados {len(product_links)} enlaces únicos con selector: {selector}[/green]")
+                    break
+                else:
+                    rprint(f"[yellow]No se encontraron enlaces con selector: {selector}[/yellow]")
+
+            except Exception as e:
+                rprint(f"[red]Error con selector {selector}: {str(e)[:50]}[/red]")
+                continue
+
+        return product_links
+
+
+    def _process_products(self, product_links: List[str], listing_url: str,
+                          records: Optional[Dict[str, ProductMetadata]] = None) -> int:
 
         try:
-            rprint("[cyan]Intentando extraer enlaces de productos...[/cyan]")
-
-            selectors_to_try = [
-                'a.primary_img',
-                'a[href*="/es/producto/"]',
-                'a[href*="/producto/"]',
-                '.product-item a',
-                '.product-link',
-                'a[href*="/es/productos/"]'
-            ]
-            
-            product_links = []
-            
-            for selector in selectors_to_try:
-                try:
-                    rprint(f"[cyan]Probando selector: {selector}[/cyan]")
-                    links = page.eval_on_selector_all(
-                        selector,
-                        '''nodes => nodes
-                            .map(node => {
-                                const href = node.getAttribute('href');
-                                if (!href) return null;
-                                
-                                if (href.includes('/producto/') || href.includes('/es/producto/')) {
-                                    return href.startsWith('/') ? 'https://www.supermarket23.com' + href : href;
-                                }
-                                return null;
-                            })
-                            .filter(Boolean)
-                        '''
-                    )
-                    
-                    if links and len(links) > 0:
-                        product_links = list(set(links))
-                        rprint(f"[green]Encontrados {len(product_links)} enlaces únicos con selector: {selector}[/green]")
-                        break
-                    else:
-                        rprint(f"[yellow]No se encontraron enlaces con selector: {selector}[/yellow]")
-                        
-                except Exception as e:
-                    rprint(f"[red]Error con selector {selector}: {str(e)[:50]}[/red]")
-                    continue
-            
-            products_processed = 0
-            
             if not product_links:
                 rprint(f"[red]No se encontraron productos en esta página con ningún selector[/red]")
-                
-                try:
-                    all_product_links = page.eval_on_selector_all(
-                        'a[href*="/producto/"]',
-                        'nodes => nodes.map(node => node.getAttribute("href")).filter(Boolean).slice(0, 5)'
-                    )
-                    rprint(f"[yellow]Enlaces de producto encontrados (primeros 5): {all_product_links}[/yellow]")
-                    
-                    primary_img_count = page.locator('a.primary_img').count()
-                    rprint(f"[yellow]Elementos con clase 'primary_img': {primary_img_count}[/yellow]")
-                    
-                except Exception as debug_error:
-                    rprint(f"[yellow]Error en debug: {debug_error}[/yellow]")
-                    
                 return 0
             
             rprint(f"[cyan]Procesando {len(product_links)} productos de esta página...[/cyan]")
             
-            for i, product_url in enumerate(product_links, 1):
-                rprint(f"[cyan]  Producto {i}/{len(product_links)}: {product_url[:80]}...[/cyan]")
-                
-                if i > 1:
-                    time.sleep(random.uniform(1, 2))
-                
-                product_data = self.scrape_product_metadata(product_url)
-                
-                if product_data:
-                    self._append_to_json(product_data)
-                    products_processed += 1
-                    rprint(f"[green]  ✓ Guardado en JSON[/green]")
-                else:
-                    rprint(f"[red]  ✗ Error al procesar producto[/red]")
-            
-            return products_processed
+            # Solo se aprovecha lo que trae nombre y precio; el resto va por la ficha. Y solo de las URLs que
+            # entran en la frontera: las demás nunca se reclaman y su registro se quedaría en memoria
+            queued = set(self.frontier.enqueue(product_links, kind="detail", parent=listing_url))
+            self.api_records.update(
+                (url, record) for url, record in (records or {}).items()
+                if url in queued and record["nombre"] != "N/A" and record["precio"] != "N/A"
+            )
+            return self._drain_products()
             
         except Exception as e:
             rprint(f"[red]Error procesando productos de la página actual: {str(e)}[/red]")
             return 0
 
 
-    def scrape_product_urls(self, base_url: str) -> List[str]:
+    def _drain_products(self) -> int:
+
+        products_processed = 0
 
-        rprint(f"[yellow]Extrayendo enlaces de productos de: {base_url}[/yellow]")
-        self._random_delay()
-        
-        current_url = base_url
-        page_num = 1
-        total_products_processed = 0
-        
         while True:
-            rprint(f"[cyan]Procesando página {page_num}: {current_url}[/cyan]")
+            if budget.exhausted():
+                return products_processed
+            batch = self.frontier.claim("detail")
+            if not batch:
+                return products_processed
+
+            product_url = batch[0]
+            rprint(f"[cyan]  Producto: {product_url[:80]}...[/cyan]")
+            
+            if product_url in self.api_records:
+                product_data = self.api_records.pop(product_url)
+                metrics.incr(f"{BLOCKING_PROFILE.name}.api_records")
+            else:
+                product_data = self.scrape_product_metadata(product_url)
             
-            for attempt in range(self.max_retries):
-                try:
-                    with self._get_page() as page:
+            if product_data:
+                self._append_to_json(product_data)
+                self.frontier.complete(product_url)
+                products_processed += 1
+                rprint(f"[green]  ✓ Guardado en JSON[/green]")
+            else:
+                self.frontier.fail(product_url, self.errors.pop(product_url, "sin datos"))
+                rprint(f"[red]  ✗ Error al procesar producto[/red]")
+
+
+    def _fetch_listing(self, pool: ContextPool, current_url: str, page_num: int) -> Dict[str, any]:
+
+        for attempt in range(self.max_retries):
+            try:
+                with pool.page() as page:
+                    capture_scope = api_capture.ResponseCapture(page) if self.mode != "dom" else nullcontext()
+                    with capture_scope as capture:
                         rprint(f"[cyan]Navegando a: {current_url}[/cyan]")
-                        page.goto(current_url, wait_until="networkidle", timeout=60000)
-                        
-                        self._check_and_handle_dialog(page)
-                        
+                        policy = self._wait_policy("listing")
+                        response = navigation.goto(page, current_url, policy)
+                        navigation.raise_for_status(response, current_url)
+                    
+                        self._wait_ready(page, policy)
+                    
                         rprint("[cyan]Buscando productos en la página...[/cyan]")
                         product_selectors = [
                             'a.primary_img',
@@ -532,7 +565,7 @@ class Supermarket:
                             '.product-item a',
                             '.product-link'
                         ]
-                        
+                    
                         products_found = False
                         for selector in product_selectors:
                             try:
@@ -543,68 +576,236 @@ class Supermarket:
                             except:
                                 rprint(f"[yellow]No se encontraron productos con selector: {selector}[/yellow]")
                                 continue
-                        
+                    
                         if not products_found:
                             rprint("[red]No se encontraron productos con ningún selector[/red]")
                             page_content = page.content()
                             if "producto" in page_content.lower():
                                 rprint("[yellow]La palabra 'producto' está en la página, revisando estructura...[/yellow]")
                             raise Exception("No se encontraron productos en la página")
-                        
-                        products_processed = self._process_products_from_current_page(page)
-                        total_products_processed += products_processed
-                        rprint(f"[green]Procesados {products_processed} productos en página {page_num} (Total: {total_products_processed})[/green]")
-                        
+                    
+                        rprint("[cyan]Intentando extraer enlaces de productos...[/cyan]")
+                        product_links = self._extract_listing(page, page.url)
+                    
+                        if not product_links:
+                            try:
+                                all_product_links = page.eval_on_selector_all(
+                                    'a[href*="/producto/"]',
+                                    'nodes => nodes.map(node => node.getAttribute("href")).filter(Boolean).slice(0, 5)'
+                                )
+                                rprint(f"[yellow]Enlaces de producto encontrados (primeros 5): {all_product_links}[/yellow]")
+                            
+                                primary_img_count = page.locator('a.primary_img').count()
+                                rprint(f"[yellow]Elementos con clase 'primary_img': {primary_img_count}[/yellow]")
+                            
+                            except Exception as debug_error:
+                                rprint(f"[yellow]Error en debug: {debug_error}[/yellow]")
+                    
                         pagination_info = self._detect_pagination(page)
                         rprint(f"[cyan]Info paginación: {pagination_info}[/cyan]")
-                        
+                    
                         if not pagination_info['has_more_pages']:
                             rprint(f"[green]No hay más páginas disponibles - {pagination_info['reason']}[/green]")
-                            rprint(f"[green]Total productos procesados: {total_products_processed}[/green]")
-                            return []
-
-                        next_page_num = page_num + 1
-                        current_url = f"https://www.supermarket23.com/es/productos?pagina={next_page_num}"
-                        
-                        rprint(f"[green]Siguiente página: {current_url}[/green]")
-                        page_num += 1
-                        break
-
-                except Exception as e:
-                    rprint(f"[red]Error en intento {attempt + 1}: {str(e)}[/red]")
-                    if attempt == self.max_retries - 1:
-                        rprint(f"[red]Error después de {self.max_retries} intentos: {str(e)[:200]}[/red]")
-                        rprint(f"[green]Total productos procesados: {total_products_processed}[/green]")
-                        return []
+                            next_url = None
+                        else:
+                            next_url = f"https://www.supermarket23.com/es/productos?pagina={page_num + 1}"
                     
-                    rprint(f"[red]Intento {attempt + 1} fallido, reintentando...[/red]")
-                    self._random_delay()
-            
-            self._random_delay()
+                        records = {}
+                        if capture is not None:
+                            records = self._records_from_capture(capture, product_links, page_num)
+                    
+                        return {'url': current_url, 'page_num': page_num, 'links': product_links, 'records': records, 'next_url': next_url}
+
+            except Exception as e:
+                rprint(f"[red]Error en intento {attempt + 1}: {str(e)}[/red]")
+                if not retry.should_retry(e, attempt, self.max_retries):
+                    rprint(f"[red]Error tras {attempt + 1} intentos: {str(e)[:200]}[/red]")
+                    raise
+                
+                rprint(f"[red]Intento {attempt + 1} fallido, reintentando...[/red]")
+                retry.backoff(attempt)
+
+
+    def _api_record(self, item: Dict[str, any], product_url: str) -> ProductMetadata:
+
+        record = api_capture.map_record(item, PRODUCT_KEYS)
+        # Mismo formato que el precio leído de la ficha
+        if re.fullmatch(r"\d+(\.\d+)?", record["precio"]):
+            record["precio"] = f"{record['precio']} USD"
+        metadata: ProductMetadata = {**record, "url": product_url}
+        return metadata
+
+
+    def _records_from_items(self, items: List[Dict[str, any]]) -> Dict[str, ProductMetadata]:
+
+        records = {}
+        for item in items:
+            product_url = api_capture.item_url(item, self.url_template)
+            if product_url:
+                records[product_url] = self._api_record(item, product_url)
+        return records
+
+
+    def _records_from_capture(self, capture: api_capture.ResponseCapture, product_links: List[str],
+                              page_num: int) -> Dict[str, ProductMetadata]:
+
+        # La respuesta JSON con más productos de las que ha cargado la página es la del catálogo
+        api_url, items = None, []
+        for url, body in capture.json_bodies():
+            found = api_capture.find_items(body, (PRODUCT_KEYS["nombre"], PRODUCT_KEYS["precio"]))
+            if len(found) > len(items):
+                api_url, items = url, found
+        if not items:
+            rprint("[yellow]No se encontró JSON de productos en el listado, se abrirán las fichas[/yellow]")
+            return {}
+
+        if self.api_endpoint is None:
+            self.api_endpoint = api_capture.ApiEndpoint.detect(api_url, page_num)
+            self.api_page_size = len(items)
+            rprint(f"[green]API del catálogo: {api_url} ({len(items)} productos por página, paginación: "
+                   f"{self.api_endpoint.page_param if self.api_endpoint else 'no detectada'})[/green]")
+        if self.url_template is None:
+            self.url_template = api_capture.learn_url_template(items, product_links, URL_KEYS)
+            if self.url_template is None:
+                rprint("[yellow]No se pudo relacionar el JSON con las URLs de las fichas, se abrirán las fichas[/yellow]")
+                return {}
+
+        records = self._records_from_items(items)
+        metrics.incr(f"{BLOCKING_PROFILE.name}.api_items", len(records))
+        return records
+
+
+    def _fetch_api_listing(self, pool: ContextPool, current_url: str, page_num: int) -> Dict[str, any]:
+
+        # Página del catálogo pedida directamente al endpoint, sin renderizar el listado
+        api_url = self.api_endpoint.page_url(page_num, self.api_page_size)
+        for attempt in range(self.max_retries):
+            try:
+                with pool.page() as page:
+                    rprint(f"[cyan]API: {api_url}[/cyan]")
+                    body = api_capture.fetch_json(page.context, api_url)
+                break
+            except PageNotFound:
+                body = None
+                break
+            except Exception as e:
+                if not retry.should_retry(e, attempt, self.max_retries):
+                    rprint(f"[red]Error tras {attempt + 1} intentos: {str(e)[:200]}[/red]")
+                    raise
+                rprint(f"[red]Intento {attempt + 1} fallido, reintentando...[/red]")
+                retry.backoff(attempt)
+
+        items = api_capture.find_items(body, (PRODUCT_KEYS["nombre"], PRODUCT_KEYS["precio"])) if body is not None else []
+        records = self._records_from_items(items)
+        metrics.incr(f"{BLOCKING_PROFILE.name}.api_pages")
+        metrics.incr(f"{BLOCKING_PROFILE.name}.api_items", len(records))
+        if not records:
+            rprint(f"[green]La API no devuelve productos en la página {page_num}: fin del catálogo[/green]")
+        next_url = f"https://www.supermarket23.com/es/productos?pagina={page_num + 1}" if records else None
+        return {'url': current_url, 'page_num': page_num, 'links': list(records), 'records': records, 'next_url': next_url}
+
+
+    def _discover_listings(self, current_url: str, page_num: int) -> Iterator[Dict[str, any]]:
+
+        # Productor: recorre la paginación con su propio navegador mientras el hilo principal descarga fichas
+        with listing_browser(
+            self.USER_AGENTS,
+            launch_options={"headless": False},
+            on_new_context=BLOCKING_PROFILE.install if config.BLOCK_RESOURCES else None,
+            session=self.session
+        ) as pool:
+            while True:
+                if not self.frontier.try_acquire(current_url):
+                    rprint(f"[yellow]Página {page_num} asignada a otro nodo, se pasa a la siguiente[/yellow]")
+                    page_num += 1
+                    current_url = f"https://www.supermarket23.com/es/productos?pagina={page_num}"
+                    continue
+
+                try:
+                    if self.mode == "api" and self.api_endpoint is not None and self.url_template is not None:
+                        listing = self._fetch_api_listing(pool, current_url, page_num)
+                    else:
+                        listing = self._fetch_listing(pool, current_url, page_num)
+                except Exception:
+                    self.frontier.drop_lease(current_url)
+                    raise
+                yield listing
+                if not listing['next_url']:
+                    return
+
+                current_url = listing['next_url']
+                page_num += 1
+                rprint(f"[green]Siguiente página: {current_url}[/green]")
+
+
+    def scrape_product_urls(self, base_url: str) -> List[str]:
+
+        rprint(f"[yellow]Extrayendo enlaces de productos de: {base_url}[/yellow]")
+        
+        cursor = self.checkpoint.state if self.resume else {}
+        current_url = cursor.get('listing_url', base_url)
+        page_num = cursor.get('page_num', 1)
+        total_products_processed = 0
+        
+        if cursor:
+            rprint(f"[cyan]Reanudando en página {page_num}[/cyan]")
+        
+        listings = ListingPrefetcher(
+            lambda: self._discover_listings(current_url, page_num),
+            BLOCKING_PROFILE.name
+        )
+        try:
+            for listing in listings:
+                rprint(f"[cyan]Procesando página {listing['page_num']}: {listing['url']}[/cyan]")
+                # El checkpoint sigue a las fichas, no al productor: al reanudar se repite la página en curso
+                self.checkpoint.save(
+                    output=self.json_filename,
+                    listing_url=listing['url'],
+                    page_num=listing['page_num']
+                )
+                if budget.exhausted():
+                    return []
+                self.frontier.enqueue([listing['url']], kind="listing", priority=1)
+                
+                products_processed = self._process_products(listing['links'], listing['url'], listing['records'])
+                self.frontier.complete(listing['url'])
+                budget.count_page()
+                total_products_processed += products_processed
+                rprint(f"[green]Procesados {products_processed} productos en página {listing['page_num']} (Total: {total_products_processed})[/green]")
+
+        except Exception as e:
+            rprint(f"[red]Error recorriendo el listado: {str(e)[:200]}[/red]")
+            rprint(f"[green]Total productos procesados: {total_products_processed}[/green]")
+            return []
+
+        finally:
+            listings.close()
+        
+        rprint(f"[green]Total productos procesados: {total_products_processed}[/green]")
+        self.checkpoint.clear()
+        return []
+
+
+    def _extract_detail(self, page: Page, product_url: str) -> ProductMetadata:
+
+        metadata: ProductMetadata = {**extraction.extract(page, DETAIL_SPEC), "url": product_url}
+        return metadata
 
 
     def scrape_product_metadata(self, product_url: str) -> Optional[ProductMetadata]:
 
         rprint("[blue]*[/blue]" * 15)
-        self._random_delay()
 
         for attempt in range(self.max_retries):
             try:
                 with self._get_page() as page:
-                    page.goto(product_url, wait_until="networkidle", timeout=60000)
+                    policy = self._wait_policy("detail")
+                    response = navigation.goto(page, product_url, policy)
+                    navigation.raise_for_status(response, product_url)
                     
-                    self._check_and_handle_dialog(page)
-                    
-                    page.wait_for_selector('h1[itemprop="name"]', timeout=30000)
-
-                    metadata: ProductMetadata = {
-                        "nombre": self._get_text_safe(page, 'h1[itemprop="name"]'),
-                        "precio": self._get_price_safe(page),
-                        "categoria": self._get_category_safe(page),
-                        "marca": self._get_brand_safe(page),
-                        "descripcion": self._get_description_safe(page),
-                        "url": product_url
-                    }
+                    self._wait_ready(page, policy)
+
+                    metadata = self._extract_detail(page, product_url)
                     
                     rprint(f"[green]Datos obtenidos para {metadata['nombre']}:[/green]")
                     for key, value in metadata.items():
@@ -614,39 +815,74 @@ class Supermarket:
                     return metadata
                     
             except Exception as e:
-                if attempt == self.max_retries - 1:
-                    print(f"Error al extraer metadatos después de {self.max_retries} intentos: {str(e)[:100]}")
+                if not retry.should_retry(e, attempt, self.max_retries):
+                    self.errors[product_url] = f"{type(e).__name__}: {str(e)[:200]}"
+                    print(f"Error al extraer metadatos tras {attempt + 1} intentos: {str(e)[:100]}")
                     return None
                 rprint(f"[red]Intento {attempt + 1} fallido, reintentando...[/red]")
-                self._random_delay()
+                retry.backoff(attempt)
 
 
     def main(self):
 
         try:
+            metrics.reset()
+            budget.start_site()
             self.playwright = sync_playwright().start()
             rprint("[green]Conectando...[/green]")
+            
+            if self.resume:
+                cursor = self.checkpoint.load()
+                if cursor.get('output'):
+                    self.json_filename = cursor['output']
+                else:
+                    rprint("[yellow]No hay checkpoint pendiente, se empieza desde el principio[/yellow]")
+
+            crawl = os.path.splitext(self.json_filename)[0]
+            self.frontier = Frontier(crawl, leases=open_lease_manager("supermarket"))
+            if self.resume:
+                self.frontier.recover()
 
             self.browser = self.playwright.chromium.launch(
                 headless=False,
                 timeout=60000
             )
+            self.context_pool = ContextPool(
+                self.browser,
+                self.USER_AGENTS,
+                size=config.CONTEXT_POOL_SIZE,
+                max_uses=config.CONTEXT_MAX_USES,
+                ua_policy=config.UA_ROTATION,
+                on_new_context=BLOCKING_PROFILE.install if config.BLOCK_RESOURCES else None,
+                session=self.session
+            )
             
             URL = "https://www.supermarket23.com/es/productos?pagina=1"
+            self._prepare_session(URL)
             
             rprint(f"[blue]Iniciando scraping de: {URL}[/blue]")
             rprint(f"[blue]Archivo de salida: ./data/{self.json_filename}[/blue]")
             
             products = self.scrape_product_urls(URL)
-            rprint(f"[green]Proceso completado![/green]")
+            if budget.stop_reason() is None:
+                rprint(f"[green]Proceso completado![/green]")
             
             return products
                 
         except Exception as e:
+            # Se relanza para que main.py y el supervisor registren el sitio como fallido, no como terminado
             rprint(f"[red]Error general: {str(e)[:120]}[/red]")
-            return []
+            raise
             
         finally:
+            if self.sink is not None:
+                self.sink.close()
+            if self.frontier is not None:
+                self.frontier.close()
+            if self.context_pool is not None:
+                self.context_pool.close()
+            metrics.report(type(self).__name__)
+            budget.report(type(self).__name__)
             if hasattr(self, 'browser') and self.browser:
                 self.browser.close()
             if hasattr(self, 'playwright') and self.playwright:
@@ -0,0 +1,41 @@
+import types
+import pytest
+from core import circuit
+from core import metrics
+from core import rate_limit
+
+
+class FakeClock:
+
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+
+    def __call__(self) -> float:
+
+        return self.now
+
+
+    def advance(self, seconds: float) -> None:
+
+        self.now += seconds
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(monkeypatch):
+
+    # Cubos, cortacircuitos y métricas son estado del proceso: cada test empieza de cero
+    monkeypatch.setattr(rate_limit, "_buckets", {})
+    monkeypatch.setattr(rate_limit, "_overrides", {})
+    monkeypatch.setattr(rate_limit, "_share", 1)
+    monkeypatch.setattr(circuit, "_breakers", {})
+    metrics.reset()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+
+    fake = FakeClock()
+    for module in (rate_limit, circuit):
+        monkeypatch.setattr(module, "time", types.SimpleNamespace(monotonic=fake, time=fake, sleep=fake.advance))
+    return fake
@@ -0,0 +1,73 @@
+from urllib.parse import parse_qsl, urlsplit
+from core import api_capture
+from core.api_capture import ApiEndpoint
+
+
+def query(url: str) -> dict:
+
+    return dict(parse_qsl(urlsplit(url).query))
+
+
+def test_detect_page_param():
+
+    endpoint = ApiEndpoint.detect("https://api.example/productos?categoria=7&page=1")
+
+    assert endpoint.page_param == "page"
+    assert ApiEndpoint.detect("https://api.example/productos?categoria=7") is None
+
+
+def test_page_pagination():
+
+    endpoint = ApiEndpoint.detect("https://api.example/productos?page=1&size=24")
+
+    assert query(endpoint.page_url(5)) == {"page": "5", "size": "24"}
+
+
+def test_page_pagination_captured_after_resume():
+
+    # Capturada en la página 4 del listado de una API que numera desde 0
+    endpoint = ApiEndpoint.detect("https://api.example/productos?page=3", page_num=4)
+
+    assert query(endpoint.page_url(1))["page"] == "0"
+    assert query(endpoint.page_url(5))["page"] == "4"
+
+
+def test_offset_pagination():
+
+    endpoint = ApiEndpoint.detect("https://api.example/productos?offset=0&limit=20")
+
+    assert query(endpoint.page_url(1, 20))["offset"] == "0"
+    assert query(endpoint.page_url(3, 20))["offset"] == "40"
+
+
+def test_offset_pagination_captured_after_resume():
+
+    endpoint = ApiEndpoint.detect("https://api.example/productos?skip=60&take=20", page_num=4)
+
+    assert endpoint.page_param == "skip"
+    assert query(endpoint.page_url(1, 20))["skip"] == "0"
+    assert query(endpoint.page_url(5, 20))["skip"] == "80"
+
+
+def test_find_items_picks_the_longest_matching_list():
+
+    data = {
+        "menu": [{"name": "Bebidas"}, {"name": "Lácteos"}, {"name": "Carnes"}],
+        "result": {"items": [{"name": "Leche", "price": 1.2}, {"name": "Pan", "price": 0.8}]},
+    }
+
+    assert api_capture.find_items(data, (("name",), ("price", "precio"))) == data["result"]["items"]
+
+
+def test_map_record_and_item_url():
+
+    item = {"Name": " Leche entera ", "category": {"name": "Lácteos"}, "tags": ["fresco", "1L"], "slug": "leche-entera"}
+    record = api_capture.map_record(item, {"nombre": ("title", "name"), "categoria": ("category",),
+                                           "etiquetas": ("tags",), "marca": ("brand",)})
+
+    assert record == {"nombre": "Leche entera", "categoria": "Lácteos", "etiquetas": "fresco, 1L", "marca": "N/A"}
+    template = api_capture.learn_url_template(
+        [item], ["https://tienda.example/es/producto/leche-entera", "https://tienda.example/es/producto/pan"], ("slug",)
+    )
+    assert template == ("slug", "https://tienda.example/es/producto/{}")
+    assert api_capture.item_url({"slug": "pan"}, template) == "https://tienda.example/es/producto/pan"
@@ -0,0 +1,169 @@
+import pytest
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+import config
+from core import async_engine
+from core import retry
+from core.async_engine import AsyncDetailFetcher
+from core.navigation import WaitPolicy
+
+
+# Sitio simulado: URL -> (estado HTTP, lo que devuelve el script, veces que tarda en aparecer el selector)
+PAGES = {
+    "https://a.example/1": (200, "uno", 0),
+    "https://a.example/2": (200, "dos", 0),
+    "https://a.example/borrada": (404, None, 0),
+    "https://b.example/lenta": (200, "lenta", 1),
+}
+
+
+class FakeResponse:
+
+    def __init__(self, status: int) -> None:
+        self.status = status
+
+
+class FakePage:
+
+    def __init__(self, site: "FakeSite") -> None:
+        self.site = site
+        self.url = None
+
+
+    async def goto(self, url, wait_until, timeout):
+
+        self.url = url
+        self.site.visits.append(url)
+        return FakeResponse(PAGES[url][0])
+
+
+    async def query_selector(self, selector):
+
+        return None
+
+
+    async def wait_for_selector(self, selector, timeout):
+
+        pending = self.site.slow.get(self.url, PAGES[self.url][2])
+        if pending > 0:
+            self.site.slow[self.url] = pending - 1
+            raise PlaywrightTimeoutError("timeout")
+
+
+    async def evaluate(self, script, arg=None):
+
+        if script == "document.readyState":
+            return "complete"
+        return PAGES[self.url][1]
+
+
+class FakeContext:
+
+    def __init__(self, site: "FakeSite") -> None:
+        self.site = site
+
+
+    async def new_page(self):
+
+        return FakePage(self.site)
+
+
+    async def close(self):
+
+        self.site.closed += 1
+
+
+class FakeSite:
+
+    def __init__(self) -> None:
+        self.visits = []
+        self.slow = {}
+        self.contexts = 0
+        self.closed = 0
+        self.fail_next_context = False
+
+
+    async def new_context(self, **options):
+
+        if self.fail_next_context:
+            self.fail_next_context = False
+            raise OSError("navegador caído")
+        self.contexts += 1
+        return FakeContext(self)
+
+
+    async def close(self):
+
+        pass
+
+
+@pytest.fixture
+def fetcher(monkeypatch):
+
+    monkeypatch.setattr(config, "RATE_LIMIT_RPS", 0)
+    monkeypatch.setattr(config, "CIRCUIT_ENABLED", False)
+
+    async def no_backoff(attempt):
+
+        pass
+
+    monkeypatch.setattr(retry, "backoff_async", no_backoff)
+    site = FakeSite()
+
+    async def start(self):
+
+        self._browser = site
+
+    monkeypatch.setattr(AsyncDetailFetcher, "_start", start)
+    fetcher = AsyncDetailFetcher(["ua"], "test", WaitPolicy("domcontentloaded", "h1", client_rendered=True),
+                                 concurrency=2, max_retries=3)
+    fetcher.site = site
+    yield fetcher
+    fetcher.close()
+
+
+def test_results_keep_the_url_order(fetcher):
+
+    urls = ["https://a.example/2", "https://a.example/1"]
+
+    assert fetcher.evaluate_many(urls, "script") == ["dos", "uno"]
+    assert fetcher.errors == {}
+
+
+def test_permanent_errors_fail_only_their_url(fetcher):
+
+    urls = ["https://a.example/1", "https://a.example/borrada"]
+
+    assert fetcher.evaluate_many(urls, "script") == ["uno", None]
+    assert fetcher.errors["https://a.example/borrada"].startswith("PageNotFound")
+    assert fetcher.site.visits.count("https://a.example/borrada") == 1
+
+
+def test_slow_client_rendered_page_is_retried(fetcher):
+
+    assert fetcher.evaluate_many(["https://b.example/lenta"], "script") == ["lenta"]
+    assert fetcher.site.visits.count("https://b.example/lenta") == 2
+
+
+def test_context_failure_is_retried_for_that_url(fetcher):
+
+    fetcher.site.fail_next_context = True
+
+    assert fetcher.evaluate_many(["https://a.example/1", "https://a.example/2"], "script") == ["uno", "dos"]
+
+
+def test_pages_are_reused_between_batches(fetcher):
+
+    fetcher.evaluate_many(["https://a.example/1"], "script")
+    fetcher.evaluate_many(["https://a.example/2"], "script")
+
+    assert fetcher.site.contexts == 1
+
+
+def test_contexts_are_recycled_after_max_uses(fetcher):
+
+    fetcher.max_uses = 2
+    for _ in range(5):
+        fetcher.evaluate_many(["https://a.example/1"], "script")
+
+    assert fetcher.site.contexts == 3
+    assert fetcher.site.closed == 2
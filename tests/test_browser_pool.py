@@ -0,0 +1,129 @@
+import pytest
+from core.browser_pool import ContextPool
+from core.navigation import BlockedPage
+from core.retry import PageNotFound
+
+
+class FakePage:
+
+    def __init__(self) -> None:
+        self.closed = False
+
+
+    def is_closed(self) -> bool:
+
+        return self.closed
+
+
+class FakeContext:
+
+    def __init__(self, user_agent: str, options: dict) -> None:
+        self.user_agent = user_agent
+        self.options = options
+        self.closed = False
+
+
+    def new_page(self) -> FakePage:
+
+        return FakePage()
+
+
+    def close(self) -> None:
+
+        self.closed = True
+
+
+class FakeBrowser:
+
+    def __init__(self) -> None:
+        self.contexts = []
+
+
+    def new_context(self, user_agent: str, **options) -> FakeContext:
+
+        context = FakeContext(user_agent, options)
+        self.contexts.append(context)
+        return context
+
+
+USER_AGENTS = ["ua-1", "ua-2", "ua-3"]
+
+
+def test_contexts_are_reused_until_max_uses():
+
+    browser = FakeBrowser()
+    pool = ContextPool(browser, USER_AGENTS, size=1, max_uses=3)
+    for _ in range(7):
+        with pool.page():
+            pass
+
+    assert pool.navigations == 7
+    assert len(browser.contexts) == 3
+    assert [context.closed for context in browser.contexts] == [True, True, False]
+
+
+def test_round_robin_user_agents():
+
+    browser = FakeBrowser()
+    pool = ContextPool(browser, USER_AGENTS, size=1, max_uses=1, ua_policy="round_robin")
+    for _ in range(4):
+        with pool.page():
+            pass
+
+    assert [context.user_agent for context in browser.contexts] == ["ua-1", "ua-2", "ua-3", "ua-1"]
+
+
+def test_invalid_user_agent_policy():
+
+    with pytest.raises(ValueError):
+        ContextPool(FakeBrowser(), USER_AGENTS, ua_policy="aleatorio")
+
+
+def test_transient_errors_discard_the_context():
+
+    browser = FakeBrowser()
+    pool = ContextPool(browser, USER_AGENTS, size=1)
+    with pytest.raises(BlockedPage):
+        with pool.page():
+            raise BlockedPage("https://example.es")
+    with pool.page():
+        pass
+
+    assert len(browser.contexts) == 2
+    assert browser.contexts[0].closed
+
+
+@pytest.mark.parametrize("error", [PageNotFound("HTTP 404"), ValueError("fallo del scraper")])
+def test_page_errors_keep_the_context(error):
+
+    browser = FakeBrowser()
+    pool = ContextPool(browser, USER_AGENTS, size=1)
+    with pytest.raises(type(error)):
+        with pool.page():
+            raise error
+    with pool.page():
+        pass
+
+    assert len(browser.contexts) == 1
+
+
+def test_pool_waits_for_a_free_context():
+
+    pool = ContextPool(FakeBrowser(), USER_AGENTS, size=1, acquire_timeout=0.01)
+    with pool.page():
+        with pytest.raises(TimeoutError):
+            with pool.page():
+                pass
+
+
+def test_close_discards_idle_contexts():
+
+    browser = FakeBrowser()
+    pool = ContextPool(browser, USER_AGENTS, size=2, context_options={"locale": "es-ES"})
+    with pool.page():
+        with pool.page():
+            pass
+    pool.close()
+
+    assert all(context.closed for context in browser.contexts)
+    assert browser.contexts[0].options == {"ignore_https_errors": True, "locale": "es-ES"}
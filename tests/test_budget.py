@@ -0,0 +1,105 @@
+import signal
+import types
+import pytest
+from core import budget
+
+
+@pytest.fixture(autouse=True)
+def fresh_budget(monkeypatch):
+
+    # Presupuesto y parada son estado del proceso
+    for name, value in [("_run_deadline", None), ("_site_deadline", None), ("_max_pages", 0), ("_max_records", 0),
+                        ("_pages", 0), ("_records", 0), ("_stop_reason", None), ("_run_stop_reason", None)]:
+        monkeypatch.setattr(budget, name, value)
+
+
+@pytest.fixture
+def now(monkeypatch):
+
+    clock = types.SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(budget, "time", types.SimpleNamespace(time=lambda: clock.value))
+    return clock
+
+
+def test_no_limits_never_stop(now):
+
+    budget.start_site(seconds=0, max_pages=0, max_records=0)
+    for _ in range(1000):
+        budget.count_page()
+        budget.count_record()
+    now.value += 10 ** 6
+
+    assert budget.exhausted() is None
+    assert budget.stop_reason() is None
+    assert budget.records() == 1000
+
+
+def test_site_time_runs_out_and_stays_until_the_next_site(now):
+
+    budget.start_site(seconds=10)
+    now.value += 9
+    assert budget.exhausted() is None
+
+    now.value += 2
+    assert budget.exhausted() == "tiempo del sitio agotado"
+    assert budget.stop_reason() == "tiempo del sitio agotado"
+
+    budget.start_site(seconds=10)
+    assert budget.stop_reason() is None
+    assert budget.exhausted() is None
+
+
+def test_run_deadline_stops_every_later_site(now):
+
+    budget.set_run_deadline(now.value + 5)
+    budget.start_site(seconds=60)
+    assert not budget.run_stopped()
+
+    now.value += 5
+    assert budget.run_stopped()
+    assert budget.exhausted() == "tiempo global agotado"
+    budget.start_site(seconds=60)
+    assert budget.exhausted() == "tiempo global agotado"
+
+
+def test_page_and_record_caps(now):
+
+    budget.start_site(max_pages=2)
+    budget.count_page()
+    assert budget.exhausted() is None
+    budget.count_page()
+    assert budget.exhausted() == "tope de 2 páginas"
+
+    budget.start_site(max_records=3)
+    assert budget.records() == 0
+    for _ in range(3):
+        budget.count_record()
+    assert budget.exhausted() == "tope de 3 registros"
+    assert budget.records() == 3
+
+
+def test_first_reason_wins(now):
+
+    budget.start_site(seconds=10, max_pages=1)
+    budget.count_page()
+    assert budget.exhausted() == "tope de 1 páginas"
+
+    now.value += 20
+    assert budget.exhausted() == "tope de 1 páginas"
+
+
+def test_sigterm_requests_a_graceful_stop_of_the_whole_run(now):
+
+    previous = signal.getsignal(signal.SIGTERM)
+    try:
+        budget.install_signal_handlers()
+        budget.start_site()
+        signal.raise_signal(signal.SIGTERM)
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+    assert budget.stop_reason() == "señal SIGTERM"
+    assert budget.run_stopped()
+    # El sitio siguiente arranca ya parado
+    budget.start_site()
+    assert budget.exhausted() == "señal SIGTERM"
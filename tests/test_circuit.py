@@ -0,0 +1,117 @@
+import pytest
+import config
+from core import circuit
+from core.circuit import CircuitBreaker
+
+
+def make_breaker() -> CircuitBreaker:
+
+    return CircuitBreaker("www.example.es", failure_rate=0.5, window=4, min_requests=4, cooldown=60)
+
+
+def test_stays_closed_below_the_minimum_requests(clock):
+
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record(success=False)
+
+    assert breaker.state == circuit.CLOSED
+    assert breaker.reserve() == 0.0
+
+
+def test_opens_at_the_failure_rate(clock):
+
+    breaker = make_breaker()
+    for success in (True, False, True, False):
+        breaker.record(success)
+
+    assert breaker.state == circuit.OPEN
+    assert breaker.reserve() == pytest.approx(60)
+    clock.advance(45)
+    assert breaker.reserve() == pytest.approx(15)
+
+
+def test_only_the_last_window_counts(clock):
+
+    breaker = make_breaker()
+    for _ in range(6):
+        breaker.record(success=True)
+    breaker.record(success=False)
+    assert breaker.state == circuit.CLOSED
+
+    # 2 fallos de 8 en total, pero 2 de las últimas 4
+    breaker.record(success=False)
+    assert breaker.state == circuit.OPEN
+
+
+def test_single_probe_after_cooldown(clock):
+
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(success=False)
+    clock.advance(60)
+
+    assert breaker.reserve() == 0.0
+    assert breaker.state == circuit.HALF_OPEN
+    # Mientras la prueba está en vuelo el resto espera
+    assert breaker.reserve() == circuit.PROBE_POLL
+
+
+def test_successful_probe_closes(clock):
+
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(success=False)
+    clock.advance(60)
+    breaker.reserve()
+    breaker.record(success=True)
+
+    assert breaker.state == circuit.CLOSED
+    assert breaker.reserve() == 0.0
+
+
+def test_failed_probe_reopens(clock):
+
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(success=False)
+    clock.advance(60)
+    breaker.reserve()
+    breaker.record(success=False)
+
+    assert breaker.state == circuit.OPEN
+    assert breaker.reserve() == pytest.approx(60)
+
+
+def test_lost_probe_is_replaced(clock):
+
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(success=False)
+    clock.advance(60)
+    breaker.reserve()
+    clock.advance(circuit.PROBE_TIMEOUT)
+
+    assert breaker.reserve() == 0.0
+
+
+def test_results_in_flight_while_open_are_ignored(clock):
+
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(success=False)
+    breaker.record(success=True)
+
+    assert breaker.state == circuit.OPEN
+
+
+def test_module_breakers_are_per_host(clock, monkeypatch):
+
+    monkeypatch.setattr(config, "CIRCUIT_ENABLED", True)
+    monkeypatch.setattr(config, "CIRCUIT_MIN_REQUESTS", 2)
+    monkeypatch.setattr(config, "CIRCUIT_FAILURE_RATE", 0.5)
+    for _ in range(2):
+        circuit.record("https://caido.example/a", success=False)
+
+    assert circuit.breaker("caido.example").state == circuit.OPEN
+    assert circuit.breaker("otro.example").state == circuit.CLOSED
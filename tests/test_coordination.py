@@ -0,0 +1,114 @@
+import os
+import types
+import pytest
+from core import coordination
+from core.coordination import ACQUIRED, DONE, HELD, FileLockBackend, LeaseManager, SQLiteLeaseBackend
+
+
+TTL = 60
+
+
+@pytest.fixture
+def now(monkeypatch):
+
+    clock = types.SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(coordination, "time", types.SimpleNamespace(time=lambda: clock.value))
+    return clock
+
+
+@pytest.fixture(params=["sqlite", "filesystem"])
+def backend(request, tmp_path):
+
+    if request.param == "sqlite":
+        backend = SQLiteLeaseBackend(os.path.join(tmp_path, "coordination.db"))
+    else:
+        backend = FileLockBackend(os.path.join(tmp_path, "leases"))
+    yield backend
+    backend.close()
+
+
+def test_lease_is_exclusive_until_it_expires(backend, now):
+
+    assert backend.acquire("url", "a", TTL) == ACQUIRED
+    assert backend.acquire("url", "b", TTL) == HELD
+    # El dueño puede volver a pedirla
+    assert backend.acquire("url", "a", TTL) == ACQUIRED
+
+    now.value += TTL + 1
+    assert backend.acquire("url", "b", TTL) == ACQUIRED
+    assert backend.acquire("url", "a", TTL) == HELD
+
+
+def test_renew_extends_only_the_owners_lease(backend, now):
+
+    backend.acquire("url", "a", TTL)
+    now.value += TTL - 1
+    backend.renew(["url"], "a", TTL)
+    backend.renew(["url"], "b", 1)
+    now.value += 2
+
+    assert backend.acquire("url", "b", TTL) == HELD
+
+
+def test_done_is_final(backend, now):
+
+    backend.acquire("url", "a", TTL)
+    backend.release("url", "a", done=True)
+    now.value += TTL * 10
+
+    assert backend.acquire("url", "a", TTL) == DONE
+    assert backend.acquire("url", "b", TTL) == DONE
+
+
+def test_release_without_done_frees_the_url(backend, now):
+
+    backend.acquire("url", "a", TTL)
+    backend.release("url", "b", done=False)
+    assert backend.acquire("url", "b", TTL) == HELD
+
+    backend.release("url", "a", done=False)
+    assert backend.acquire("url", "b", TTL) == ACQUIRED
+
+
+def test_manager_keys_are_scoped_to_the_crawl(backend, now):
+
+    first = LeaseManager(backend, "crawl-1:sitio", "a", ttl=TTL)
+    second = LeaseManager(backend, "crawl-2:sitio", "b", ttl=TTL)
+    try:
+        assert first.acquire("url") == ACQUIRED
+        first.release("url", done=True)
+        assert second.acquire("url") == ACQUIRED
+    finally:
+        first._stop.set()
+        second._stop.set()
+
+
+def test_manager_close_frees_unfinished_leases(tmp_path, now):
+
+    path = os.path.join(tmp_path, "leases")
+    manager = LeaseManager(FileLockBackend(path), "crawl:sitio", "a", ttl=TTL)
+    manager.acquire("hecha")
+    manager.acquire("a-medias")
+    manager.release("hecha", done=True)
+    manager.close()
+
+    other = FileLockBackend(path)
+    assert other.acquire("crawl:sitio:hecha", "b", TTL) == DONE
+    assert other.acquire("crawl:sitio:a-medias", "b", TTL) == ACQUIRED
+
+
+def test_a_backend_needs_a_shared_crawl_name(monkeypatch, tmp_path):
+
+    monkeypatch.setattr(coordination.config, "COORDINATION_BACKEND", "sqlite")
+    monkeypatch.setattr(coordination.config, "COORDINATION_PATH", os.path.join(tmp_path, "coordination.db"))
+    monkeypatch.setattr(coordination.config, "COORDINATION_CRAWL", "")
+
+    with pytest.raises(ValueError):
+        coordination.open_lease_manager("axesor")
+
+    monkeypatch.setattr(coordination.config, "COORDINATION_CRAWL", "crawl-2026-10")
+    leases = coordination.open_lease_manager("axesor")
+    try:
+        assert leases.crawl == "crawl-2026-10:axesor"
+    finally:
+        leases.close()
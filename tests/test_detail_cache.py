@@ -0,0 +1,48 @@
+import os
+import pytest
+from core.detail_cache import DetailCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+
+    cache = DetailCache("crawl", os.path.join(tmp_path, "cache.db"))
+    yield cache
+    cache.close()
+
+
+def test_new_urls_are_not_retagged(cache):
+
+    assert cache.tag(["a", "b"], "bares") == []
+    assert cache.store("a", {"url": "a", "nombre": "Bar"}) == ["bares"]
+
+
+def test_downloaded_url_is_retagged_once_per_new_tag(cache):
+
+    cache.tag(["a"], "bares")
+    cache.store("a", {"url": "a", "nombre": "Bar"})
+
+    assert cache.tag(["a"], "cafeterias") == [({"url": "a", "nombre": "Bar"}, ["bares", "cafeterias"])]
+    assert cache.tag(["a"], "cafeterias") == []
+    assert cache.tag(["a"], "bares") == []
+    assert cache.shared == 1
+
+
+def test_tags_seen_before_the_download_are_kept(cache):
+
+    # La empresa aparece en dos categorías antes de que se descargue su ficha
+    cache.tag(["a"], "bares")
+    cache.tag(["a"], "cafeterias")
+
+    assert cache.store("a", {"url": "a"}) == ["bares", "cafeterias"]
+
+
+def test_crawls_do_not_share_records(cache, tmp_path):
+
+    cache.tag(["a"], "bares")
+    cache.store("a", {"url": "a"})
+    other = DetailCache("otra", os.path.join(tmp_path, "cache.db"))
+    try:
+        assert other.tag(["a"], "cafeterias") == []
+    finally:
+        other.close()
@@ -0,0 +1,114 @@
+import os
+import pytest
+from core.coordination import FileLockBackend, LeaseManager
+from core.frontier import DONE, FAILED, IN_FLIGHT, PENDING, Frontier
+
+
+@pytest.fixture
+def db_path(tmp_path):
+
+    return os.path.join(tmp_path, "frontier.db")
+
+
+@pytest.fixture
+def frontier(db_path):
+
+    frontier = Frontier("crawl", db_path)
+    yield frontier
+    frontier.close()
+
+
+def test_enqueue_returns_only_new_urls(frontier):
+
+    assert frontier.enqueue(["a", "b", "a"], kind="detail") == ["a", "b"]
+    assert frontier.enqueue(["b", "c"], kind="detail") == ["c"]
+    assert frontier.counts("detail")[PENDING] == 3
+
+
+def test_claim_follows_priority_then_order(frontier):
+
+    frontier.enqueue(["d1", "d2"], kind="detail")
+    frontier.enqueue(["urgente"], kind="detail", priority=1)
+    frontier.enqueue(["listado"], kind="listing")
+
+    assert frontier.claim("detail", limit=2) == ["urgente", "d1"]
+    assert frontier.claim("detail", limit=5) == ["d2"]
+    assert frontier.claim("detail") == []
+    assert frontier.state_of("d1") == IN_FLIGHT
+    assert frontier.state_of("listado") == PENDING
+
+
+def test_state_transitions(frontier):
+
+    frontier.enqueue(["ok", "mal", "devuelta"], kind="detail")
+    frontier.claim("detail", limit=3)
+    frontier.complete("ok")
+    frontier.fail("mal", "HTTP 500")
+    frontier.release("devuelta")
+
+    assert frontier.state_of("ok") == DONE
+    assert frontier.state_of("mal") == FAILED
+    assert frontier.state_of("devuelta") == PENDING
+    assert frontier.counts() == {PENDING: 1, IN_FLIGHT: 0, DONE: 1, FAILED: 1}
+    # Una URL terminada no vuelve a entrar
+    assert frontier.enqueue(["ok"], kind="detail") == []
+
+
+def test_recover_returns_in_flight_urls_on_resume(frontier, db_path):
+
+    frontier.enqueue(["a", "b", "c"], kind="detail")
+    frontier.claim("detail", limit=2)
+    frontier.complete("a")
+
+    resumed = Frontier("crawl", db_path)
+    try:
+        assert resumed.recover() == 1
+        assert resumed.state_of("b") == PENDING
+        assert resumed.claim("detail", limit=5) == ["b", "c"]
+    finally:
+        resumed.close()
+
+
+def test_crawls_are_isolated(frontier, db_path):
+
+    frontier.enqueue(["a"], kind="detail")
+    other = Frontier("otra", db_path)
+    try:
+        assert other.enqueue(["a"], kind="detail") == ["a"]
+        assert other.claim("detail") == ["a"]
+        assert frontier.state_of("a") == PENDING
+    finally:
+        other.close()
+
+
+def test_url_done_on_another_node_is_done_here(tmp_path, db_path):
+
+    leases_path = os.path.join(tmp_path, "leases")
+    node_a = Frontier("crawl", db_path, leases=LeaseManager(FileLockBackend(leases_path), "c:s", "a"))
+    node_b = Frontier("crawl", os.path.join(tmp_path, "b.db"), leases=LeaseManager(FileLockBackend(leases_path), "c:s", "b"))
+    try:
+        node_a.enqueue(["x", "y"], kind="detail")
+        node_b.enqueue(["x", "y"], kind="detail")
+        assert node_a.claim("detail") == ["x"]
+        node_a.complete("x")
+
+        assert node_b.claim("detail") == ["y"]
+        assert node_b.state_of("x") == DONE
+    finally:
+        node_a.close()
+        node_b.close()
+
+
+def test_try_acquire_and_drop_lease(tmp_path, db_path):
+
+    leases_path = os.path.join(tmp_path, "leases")
+    node_a = Frontier("crawl", db_path, leases=LeaseManager(FileLockBackend(leases_path), "c:s", "a"))
+    node_b = Frontier("crawl", os.path.join(tmp_path, "b.db"), leases=LeaseManager(FileLockBackend(leases_path), "c:s", "b"))
+    try:
+        assert node_a.try_acquire("listado-2")
+        assert not node_b.try_acquire("listado-2")
+        node_a.drop_lease("listado-2")
+        assert node_b.try_acquire("listado-2")
+    finally:
+        node_a.close()
+        node_b.close()
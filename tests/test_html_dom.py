@@ -0,0 +1,103 @@
+import os
+import pytest
+from core import extraction
+from core import html_dom
+from sites.axesor import DETAIL_SPEC as AXESOR_SPEC
+from sites.paginasamarillas import CARD_SPEC, DETAIL_SPEC as PA_SPEC
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def fixture(name: str) -> str:
+
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_paginasamarillas_detail_spec():
+
+    record = extraction.extract_html(fixture("paginasamarillas_ficha.html"), PA_SPEC)
+
+    assert record == {
+        "nombre": "Bar La Esquina",
+        "descripcion": "Tapas y raciones desde 1985",
+        "direccion": "Calle Mayor, 12, 28013, Madrid",
+        "telefono": "910 000 000",
+        "website": "https://laesquina.example",
+        "actividades": "Bares\nRestaurantes",
+    }
+
+
+def test_axesor_old_layout_with_labels():
+
+    record = extraction.extract_html(fixture("axesor_ficha.html"), AXESOR_SPEC)
+
+    assert record["nombre"] == "CONSTRUCCIONES EJEMPLO SL"
+    assert record["direccion"] == "Calle Falsa, 123, 28001 Madrid"
+    assert record["cif"] == "B12345678"
+    assert record["fecha_constitucion"] == "01/02/2003"
+    assert record["objeto_social"] == "Construcción de edificios"
+    assert record["cnae"] == "4121"
+    assert record["sic"] == "N/A"
+
+
+def test_variant_selected_by_when():
+
+    html = """
+    <table><tr><th class="c-empresa__detail-label">Nombre</th>
+    <td class="c-empresa__detail-value">NUEVA SA</td></tr></table>
+    """
+    variant, record = extraction.evaluate_html(html_dom.parse(html), AXESOR_SPEC)
+
+    assert variant == "nuevo (c-empresa)"
+    assert record["nombre"] == "NUEVA SA"
+
+
+def test_cards_of_a_listing():
+
+    document = html_dom.parse("""
+    <div class="listado-item"><div class="row"><a href="/f/uno">x</a></div>
+      <span itemprop="name">Uno</span><span itemprop="telephone">911</span></div>
+    <div class="listado-item"><div class="row"><a href="/f/dos">x</a></div>
+      <span itemprop="name">Dos</span></div>
+    """)
+    cards = [extraction.evaluate_html(item, CARD_SPEC)[1] for item in document.select(".listado-item")]
+
+    assert [card["url"] for card in cards] == ["/f/uno", "/f/dos"]
+    assert [card["telefono"] for card in cards] == ["911", "N/A"]
+    assert cards[1]["direccion"] == "N/A"
+
+
+@pytest.mark.parametrize("selector, expected", [
+    ("li.activo", ["b"]),
+    ("ul > li", ["a", "b", "c"]),
+    ("li + li", ["b", "c"]),
+    ('a[href^="/f/"]', ["enlace"]),
+    ('[data-id*="2"]', ["b"]),
+    ("#lista li:not-supported", None),
+])
+def test_selector_subset(selector, expected):
+
+    document = html_dom.parse("""
+    <ul id="lista"><li>a<li class="activo" data-id="x2">b<li>c</ul>
+    <p><a href="/f/1">enlace</a></p>
+    """)
+    if expected is None:
+        with pytest.raises(ValueError):
+            document.select(selector)
+        return
+    assert [element.inner_text() for element in document.select(selector)] == expected
+
+
+def test_unclosed_rows_and_cells_are_siblings():
+
+    document = html_dom.parse("""
+    <table><tbody><tr><td>a<td><p>b<tr><td>c<td>d</table>
+    <dl><dt>nombre<dd><span>Uno<dt>web<dd>uno.es</dl>
+    """)
+
+    assert [len(row.select("td")) for row in document.select("tr")] == [2, 2]
+    assert [cell.inner_text() for cell in document.select("tbody > tr > td")] == ["a", "b", "c", "d"]
+    assert [term.inner_text() for term in document.select("dl > dt")] == ["nombre", "web"]
+    assert [value.inner_text() for value in document.select("dl > dd")] == ["Uno", "uno.es"]
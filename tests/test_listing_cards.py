@@ -0,0 +1,72 @@
+import os
+import pytest
+from core.detail_cache import DetailCache
+from core.frontier import Frontier
+from sites.paginasamarillas import PaginasAmarillas
+
+
+LISTING = "https://www.paginasamarillas.es/a/bares/madrid/"
+
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+
+    scraper = PaginasAmarillas(categories=["bares"], cities=["madrid"])
+    db_path = os.path.join(tmp_path, "crawl.db")
+    scraper.frontier = Frontier("crawl", db_path)
+    scraper.detail_cache = DetailCache("crawl", db_path)
+    scraper.required_fields = ["nombre", "telefono"]
+    written = []
+    monkeypatch.setattr(scraper, "_write", lambda data, categorias: written.append((data, categorias)))
+    monkeypatch.setattr(scraper, "_drain_companies", lambda: 0)
+    scraper.written = written
+    yield scraper
+    scraper.frontier.close()
+    scraper.detail_cache.close()
+
+
+def test_cards_become_partial_records(scraper):
+
+    cards = scraper._cards([
+        {"url": "/f/bar-uno", "nombre": "Bar Uno", "telefono": "911"},
+        {"url": "", "nombre": "Sin enlace"},
+    ], LISTING)
+
+    assert cards == [{
+        "nombre": "Bar Uno", "descripcion": "N/A", "direccion": "N/A", "telefono": "911",
+        "website": "N/A", "actividades": "N/A", "url": "https://www.paginasamarillas.es/f/bar-uno",
+    }]
+
+
+def test_card_complete_follows_required_fields(scraper):
+
+    scraper.cards = {
+        "completa": {"nombre": "Bar", "telefono": "911", "website": "N/A"},
+        "sin-telefono": {"nombre": "Bar", "telefono": "N/A"},
+    }
+
+    assert scraper._card_complete("completa")
+    assert not scraper._card_complete("sin-telefono")
+    assert not scraper._card_complete("desconocida")
+
+
+def test_cards_are_kept_only_for_queued_urls(scraper):
+
+    cards = scraper._cards([{"url": "/f/uno", "nombre": "Uno"}, {"url": "/f/dos", "nombre": "Dos"}], LISTING)
+    scraper.frontier.enqueue(["https://www.paginasamarillas.es/f/uno"], kind="detail")
+    scraper._process_companies(cards, LISTING, "bares")
+
+    assert list(scraper.cards) == ["https://www.paginasamarillas.es/f/dos"]
+
+
+def test_business_from_another_category_is_rewritten_not_fetched(scraper):
+
+    url = "https://www.paginasamarillas.es/f/uno"
+    scraper.detail_cache.tag([url], "cafeterias")
+    scraper.detail_cache.store(url, {"url": url, "nombre": "Uno"})
+    scraper.frontier.enqueue([url], kind="detail")
+
+    scraper._process_companies(scraper._cards([{"url": "/f/uno", "nombre": "Uno"}], LISTING), LISTING, "bares")
+
+    assert scraper.written == [({"url": url, "nombre": "Uno"}, ["cafeterias", "bares"])]
+    assert scraper.cards == {}
@@ -0,0 +1,167 @@
+import asyncio
+import os
+from collections import Counter
+import pytest
+import config
+from core.coordination import ACQUIRED, HELD, LeaseManager, SQLiteLeaseBackend
+from core.async_engine import AsyncDetailFetcher
+from core.frontier import Frontier
+from core.navigation import WaitPolicy
+from sites.paginasamarillas import PaginasAmarillas
+
+
+BASE = "https://www.paginasamarillas.es/a/bares/madrid/"
+
+
+def page(num: int) -> str:
+
+    return f"https://www.paginasamarillas.es/a/bares/madrid/{num}"
+
+
+def card(name: str) -> dict:
+
+    return {"url": f"/f/{name}", "nombre": name}
+
+
+class FakeFanout:
+
+    def __init__(self, results: dict) -> None:
+        self.results = results
+        self.requested = []
+        self.errors = {}
+
+
+    def evaluate_many(self, urls, script, arg=None):
+
+        self.requested = list(urls)
+        return [self.results.get(url) for url in urls]
+
+
+@pytest.fixture
+def scraper(tmp_path):
+
+    scraper = PaginasAmarillas(categories=["bares"], cities=["madrid"])
+    db_path = os.path.join(tmp_path, "crawl.db")
+    backend = SQLiteLeaseBackend(os.path.join(tmp_path, "leases.db"))
+    scraper.frontier = Frontier("crawl", db_path, leases=LeaseManager(backend, "crawl", "nodo-a", ttl=60))
+    scraper.other_node = SQLiteLeaseBackend(os.path.join(tmp_path, "leases.db"))
+    yield scraper
+    scraper.frontier.close()
+    scraper.other_node.close()
+
+
+def test_visible_range_is_fetched_at_once(scraper):
+
+    scraper.listing_fanout = FakeFanout({page(n): [card(f"bar-{n}")] for n in range(2, 5)})
+
+    listings, stop = scraper._fan_out_listings(BASE, 2, 5)
+
+    # La última página visible se deja para la ruta normal, que lee su paginación
+    assert scraper.listing_fanout.requested == [page(2), page(3), page(4)]
+    assert [listing["page_num"] for listing in listings] == [2, 3, 4]
+    assert [listing["next_url"] for listing in listings] == [page(3), page(4), page(5)]
+    assert listings[0]["cards"][0]["url"] == "https://www.paginasamarillas.es/f/bar-2"
+    assert stop == 5
+
+
+def test_fan_out_stops_at_the_first_empty_page_and_frees_the_rest(scraper):
+
+    scraper.listing_fanout = FakeFanout({page(2): [card("bar-2")], page(3): [], page(4): [card("bar-4")]})
+
+    listings, stop = scraper._fan_out_listings(BASE, 2, 5)
+
+    assert [listing["page_num"] for listing in listings] == [2]
+    assert stop == 3
+    assert scraper.other_node.acquire(f"crawl:{page(2)}", "nodo-b", 60) == HELD
+    assert scraper.other_node.acquire(f"crawl:{page(3)}", "nodo-b", 60) == ACQUIRED
+    assert scraper.other_node.acquire(f"crawl:{page(4)}", "nodo-b", 60) == ACQUIRED
+
+
+def test_pages_leased_by_another_node_are_not_requested(scraper):
+
+    scraper.other_node.acquire(f"crawl:{page(3)}", "nodo-b", 60)
+    scraper.listing_fanout = FakeFanout({page(n): [card(f"bar-{n}")] for n in range(2, 5)})
+
+    listings, stop = scraper._fan_out_listings(BASE, 2, 5)
+
+    assert scraper.listing_fanout.requested == [page(2), page(4)]
+    assert [listing["page_num"] for listing in listings] == [2, 4]
+    assert stop == 5
+
+
+# Navegador async mínimo que cuenta cuántas páginas de cada host cargan a la vez
+class CountingBrowser:
+
+    def __init__(self) -> None:
+        self.in_flight = Counter()
+        self.peak = Counter()
+
+
+    async def new_context(self, **options):
+
+        return CountingContext(self)
+
+
+    async def close(self):
+
+        pass
+
+
+class CountingContext:
+
+    def __init__(self, browser: CountingBrowser) -> None:
+        self.browser = browser
+
+
+    async def new_page(self):
+
+        return CountingPage(self.browser)
+
+
+    async def close(self):
+
+        pass
+
+
+class CountingPage:
+
+    def __init__(self, browser: CountingBrowser) -> None:
+        self.browser = browser
+        self.url = None
+
+
+    async def goto(self, url, wait_until, timeout):
+
+        host = url.split("/")[2]
+        self.url = url
+        self.browser.in_flight[host] += 1
+        self.browser.peak[host] = max(self.browser.peak[host], self.browser.in_flight[host])
+        await asyncio.sleep(0.02)
+        self.browser.in_flight[host] -= 1
+        return None
+
+
+    async def evaluate(self, script, arg=None):
+
+        return self.url
+
+
+def test_fan_out_concurrency_is_per_host(monkeypatch):
+
+    monkeypatch.setattr(config, "RATE_LIMIT_RPS", 0)
+    monkeypatch.setattr(config, "CIRCUIT_ENABLED", False)
+    browser = CountingBrowser()
+
+    async def start(self):
+
+        self._browser = browser
+
+    monkeypatch.setattr(AsyncDetailFetcher, "_start", start)
+    fetcher = AsyncDetailFetcher(["ua"], "test", WaitPolicy("domcontentloaded"), concurrency=2)
+    try:
+        urls = [f"https://{host}/{n}" for n in range(6) for host in ("a.example", "b.example")]
+        assert fetcher.evaluate_many(urls, "script") == urls
+    finally:
+        fetcher.close()
+
+    assert browser.peak == {"a.example": 2, "b.example": 2}
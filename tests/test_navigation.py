@@ -0,0 +1,157 @@
+import types
+import pytest
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+import config
+from core import navigation
+from core import wait_benchmark
+from core.navigation import BlockedPage, PageNotReady, WaitPolicy
+from core.retry import PageNotFound, PageStructureError, TransientError
+
+
+class FakePage:
+
+    def __init__(self, status: int = 200, ready: bool = True, blocked: bool = False,
+                 ready_state: str = "complete") -> None:
+        self.status = status
+        self.ready = ready
+        self.blocked = blocked
+        self.ready_state = ready_state
+        self.url = None
+        self.calls = []
+
+
+    def goto(self, url, wait_until, timeout):
+
+        self.url = url
+        self.calls.append(("goto", wait_until, timeout))
+        return types.SimpleNamespace(status=self.status)
+
+
+    def query_selector(self, selector):
+
+        return object() if self.blocked else None
+
+
+    def wait_for_selector(self, selector, timeout):
+
+        self.calls.append(("wait_for_selector", selector, timeout))
+        if not self.ready:
+            raise PlaywrightTimeoutError("timeout")
+
+
+    def evaluate(self, script):
+
+        return self.ready_state
+
+
+@pytest.fixture(autouse=True)
+def no_limits(monkeypatch):
+
+    monkeypatch.setattr(config, "RATE_LIMIT_RPS", 0)
+    monkeypatch.setattr(config, "CIRCUIT_ENABLED", False)
+    monkeypatch.setattr(config, "WAIT_UNTIL", "")
+
+
+def test_wait_policy_rejects_unknown_events():
+
+    with pytest.raises(ValueError):
+        WaitPolicy("idle")
+
+
+def test_with_wait_until_keeps_the_rest_of_the_policy():
+
+    policy = WaitPolicy("networkidle", "h1", timeout=5000, selector_timeout=2000, blocked_when="#captcha")
+    candidate = policy.with_wait_until("commit")
+
+    assert candidate.wait_until == "commit"
+    assert (candidate.selector, candidate.timeout, candidate.selector_timeout, candidate.blocked_when) == \
+        ("h1", 5000, 2000, "#captcha")
+    assert policy.wait_until == "networkidle"
+
+
+def test_goto_uses_the_policy_event_unless_forced(monkeypatch):
+
+    page = FakePage()
+    navigation.goto(page, "https://a.example/", WaitPolicy("load", timeout=1234))
+    monkeypatch.setattr(config, "WAIT_UNTIL", "commit")
+    navigation.goto(page, "https://a.example/", WaitPolicy("load", timeout=1234))
+
+    assert page.calls == [("goto", "load", 1234), ("goto", "commit", 1234)]
+
+
+def test_goto_detects_block_pages():
+
+    with pytest.raises(BlockedPage):
+        navigation.goto(FakePage(blocked=True), "https://a.example/", WaitPolicy(blocked_when="#captcha"))
+
+
+@pytest.mark.parametrize("status, error", [(200, None), (404, PageNotFound), (410, PageNotFound),
+                                           (429, TransientError), (503, TransientError)])
+def test_raise_for_status(status, error):
+
+    response = types.SimpleNamespace(status=status)
+    if error is None:
+        navigation.raise_for_status(response, "https://a.example/")
+    else:
+        with pytest.raises(error):
+            navigation.raise_for_status(response, "https://a.example/")
+
+
+def test_wait_ready_waits_for_the_selector_only_when_there_is_one():
+
+    page = FakePage()
+    navigation.wait_ready(page, WaitPolicy("load"))
+    navigation.wait_ready(page, WaitPolicy("load", "h1", selector_timeout=700))
+
+    assert page.calls == [("wait_for_selector", "h1", 700)]
+
+
+@pytest.mark.parametrize("policy, ready_state, error", [
+    (WaitPolicy("domcontentloaded", "h1"), "complete", PageStructureError),
+    (WaitPolicy("domcontentloaded", "h1"), "interactive", PageNotReady),
+    (WaitPolicy("domcontentloaded", "h1", client_rendered=True), "complete", PageNotReady),
+])
+def test_missing_selector_is_retried_only_while_the_page_may_still_render(policy, ready_state, error):
+
+    with pytest.raises(error):
+        navigation.wait_ready(FakePage(ready=False, ready_state=ready_state), policy)
+
+
+@pytest.mark.parametrize("result, expected", [
+    ({"url": "u", "nombre": "Bar", "telefono": "N/A", "web": "", "email": None}, 0.25),
+    ({"url": "u", "nombre": "Bar"}, 1.0),
+    ({"url": "u"}, 0.0),
+    (["/f/uno"], 1.0),
+    ([], 0.0),
+    (None, 0.0),
+])
+def test_completeness(result, expected):
+
+    assert wait_benchmark.completeness(result) == expected
+
+
+def result(wait_until: str, median: float, completeness: float = 1.0, failures: int = 0, samples: int = 3) -> dict:
+
+    return {"wait_until": wait_until, "samples": samples, "failures": failures, "median_s": median,
+            "completeness": completeness}
+
+
+def test_recommend_picks_the_fastest_complete_policy():
+
+    results = [result("networkidle", 4.0), result("load", 2.0), result("domcontentloaded", 1.0),
+               result("commit", 0.5, completeness=0.5)]
+
+    assert wait_benchmark.recommend(results)["wait_until"] == "domcontentloaded"
+
+
+def test_recommend_skips_policies_with_failures():
+
+    results = [result("load", 2.0), result("domcontentloaded", 1.0, failures=1),
+               result("commit", None, samples=0, failures=3)]
+
+    assert wait_benchmark.recommend(results)["wait_until"] == "load"
+
+
+def test_recommend_returns_none_when_every_policy_failed():
+
+    assert wait_benchmark.recommend([result("load", 2.0, failures=1), result("commit", None, samples=0)]) is None
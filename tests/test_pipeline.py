@@ -0,0 +1,88 @@
+import threading
+import time
+import pytest
+from core import metrics
+from core.pipeline import ListingPrefetcher
+
+
+class Producer:
+
+    def __init__(self, count: int, fail_at: int = -1) -> None:
+        self.count = count
+        self.fail_at = fail_at
+        self.produced = 0
+        self.closed_in = None
+
+
+    def __call__(self):
+
+        try:
+            for i in range(self.count):
+                if i == self.fail_at:
+                    raise RuntimeError("paginación rota")
+                self.produced += 1
+                yield {"page_num": i + 1}
+        finally:
+            self.closed_in = threading.current_thread().name
+
+
+def wait_until(condition, timeout: float = 5) -> None:
+
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_listings_arrive_in_order_and_end():
+
+    producer = Producer(5)
+    listings = ListingPrefetcher(producer, "test", maxsize=2)
+
+    assert [listing["page_num"] for listing in listings] == [1, 2, 3, 4, 5]
+    listings.close()
+    # El generador se cierra en el hilo productor, donde vive su navegador
+    assert producer.closed_in == "listados-test"
+    assert metrics.snapshot()["pipeline.test.listings"] == 5
+
+
+def test_producer_stays_at_most_maxsize_pages_ahead():
+
+    producer = Producer(50)
+    listings = ListingPrefetcher(producer, "test", maxsize=2)
+    iterator = iter(listings)
+
+    # Dos en la cola y una tercera esperando hueco
+    wait_until(lambda: producer.produced == 3)
+    time.sleep(0.2)
+    assert producer.produced == 3
+
+    next(iterator)
+    wait_until(lambda: producer.produced == 4)
+    time.sleep(0.2)
+    assert producer.produced == 4
+    listings.close()
+
+
+def test_producer_error_is_raised_after_the_pages_before_it():
+
+    listings = ListingPrefetcher(Producer(5, fail_at=2), "test", maxsize=2)
+    received = []
+
+    with pytest.raises(RuntimeError, match="paginación rota"):
+        for listing in listings:
+            received.append(listing["page_num"])
+    assert received == [1, 2]
+    listings.close()
+
+
+def test_close_stops_a_blocked_producer():
+
+    producer = Producer(1000)
+    listings = ListingPrefetcher(producer, "test", maxsize=1)
+    wait_until(lambda: producer.produced == 2)
+
+    listings.close()
+
+    assert producer.closed_in == "listados-test"
+    assert producer.produced < 1000
@@ -0,0 +1,104 @@
+import pytest
+import config
+from core import rate_limit
+from core.rate_limit import TokenBucket
+
+
+@pytest.fixture(autouse=True)
+def no_jitter(monkeypatch):
+
+    monkeypatch.setattr(config, "RATE_LIMIT_JITTER", 0.0)
+    monkeypatch.setattr(config, "RATE_LIMIT_RPS", 0.5)
+    monkeypatch.setattr(config, "RATE_LIMIT_BURST", 1)
+
+
+def test_burst_then_one_slot_per_interval(clock):
+
+    bucket = TokenBucket(rate=2.0, burst=2)
+
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+
+
+def test_tokens_refill_up_to_burst(clock):
+
+    bucket = TokenBucket(rate=1.0, burst=2)
+    bucket.reserve()
+    bucket.reserve()
+
+    clock.advance(10)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 1.0
+
+
+def test_set_rate_keeps_accrued_tokens(clock):
+
+    bucket = TokenBucket(rate=1.0, burst=1)
+    bucket.reserve()
+    clock.advance(0.5)
+    bucket.set_rate(2.0)
+
+    # Medio token ganado al ritmo anterior; el medio que falta llega a 2 req/s
+    assert bucket.reserve() == pytest.approx(0.25)
+    assert bucket.base_rate == 1.0
+
+
+def test_parse_host_limits():
+
+    limits = rate_limit.parse_host_limits("www.Axesor.es=0.2:3, www.paginasamarillas.es=0.5,sin-limite.es=0")
+
+    assert limits == {
+        "www.axesor.es": (0.2, 3),
+        "www.paginasamarillas.es": (0.5, 1),
+        "sin-limite.es": (0.0, 1),
+    }
+    assert rate_limit.parse_host_limits("") == {}
+
+
+@pytest.mark.parametrize("value", ["host=rapido", "host=1:x", "host=-1"])
+def test_parse_host_limits_rejects_invalid(value):
+
+    with pytest.raises(ValueError):
+        rate_limit.parse_host_limits(value)
+
+
+def test_reserve_uses_one_bucket_per_host(clock):
+
+    assert rate_limit.reserve("https://a.example/1") == 0.0
+    assert rate_limit.reserve("https://a.example/2") == pytest.approx(2.0)
+    assert rate_limit.reserve("https://b.example/1") == 0.0
+
+
+def test_zero_rate_host_is_not_limited(clock, monkeypatch):
+
+    monkeypatch.setattr(rate_limit, "_overrides", {"libre.example": (0.0, 1)})
+
+    assert [rate_limit.reserve("https://libre.example/") for _ in range(3)] == [0.0, 0.0, 0.0]
+
+
+def test_share_divides_the_host_rate(clock):
+
+    rate_limit.set_share(2)
+    assert rate_limit.bucket("a.example").rate == pytest.approx(0.25)
+
+    rate_limit.set_share(1)
+    assert rate_limit.bucket("a.example").rate == pytest.approx(0.5)
+
+
+def test_host_override_applies_with_the_global_limit_off(clock, monkeypatch):
+
+    monkeypatch.setattr(config, "RATE_LIMIT_RPS", 0)
+    monkeypatch.setattr(rate_limit, "_overrides", {"lento.example": (1.0, 1)})
+
+    assert rate_limit.reserve("https://otro.example/") == 0.0
+    assert rate_limit.reserve("https://otro.example/") == 0.0
+    assert rate_limit.reserve("https://lento.example/") == 0.0
+    assert rate_limit.reserve("https://lento.example/") == pytest.approx(1.0)
+
+
+def test_configure_divides_the_rate_by_the_share(clock):
+
+    rate_limit.set_share(4)
+    rate_limit.configure("a.example", 2.0, 1)
+
+    assert rate_limit.bucket("a.example").rate == pytest.approx(0.5)
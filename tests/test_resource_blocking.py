@@ -0,0 +1,28 @@
+from core.resource_blocking import BlockingProfile
+
+
+def test_blocks_resource_types_and_ad_hosts():
+
+    profile = BlockingProfile("sitio", blocked_types=("image", "font"))
+
+    assert profile.should_block("image", "https://www.sitio.es/logo.png")
+    assert profile.should_block("script", "https://www.googletagmanager.com/gtm.js")
+    assert profile.should_block("script", "https://stats.g.doubleclick.net/x.js")
+    assert not profile.should_block("script", "https://www.sitio.es/app.js")
+    assert not profile.should_block("document", "https://www.sitio.es/")
+
+
+def test_allowed_hosts_block_third_parties_except_documents():
+
+    profile = BlockingProfile("sitio", allowed_hosts=("sitio.es",))
+
+    assert not profile.should_block("script", "https://static.sitio.es/app.js")
+    assert profile.should_block("script", "https://cdn.otro.com/lib.js")
+    assert not profile.should_block("document", "https://www.otro.com/")
+
+
+def test_urls_without_host_are_never_blocked():
+
+    profile = BlockingProfile("sitio", blocked_types=("image",))
+
+    assert not profile.should_block("image", "data:image/png;base64,AAAA")
@@ -0,0 +1,102 @@
+import pytest
+from playwright.sync_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+import config
+from core import metrics
+from core import retry
+from core.navigation import BlockedPage, PageNotReady
+from core.retry import PageNotFound, PageStructureError, RetryBudget, TransientError
+
+
+@pytest.fixture(autouse=True)
+def fresh_budget(monkeypatch):
+
+    monkeypatch.setattr(retry, "_budget", RetryBudget(100))
+
+
+@pytest.mark.parametrize("error", [
+    TransientError("HTTP 503"),
+    BlockedPage("https://a.example/"),
+    PageNotReady("sin selector"),
+    PlaywrightError("net::ERR_CONNECTION_RESET"),
+    PlaywrightTimeoutError("Timeout 30000ms exceeded"),
+    TimeoutError(),
+    ConnectionResetError(),
+    OSError("sin red"),
+])
+def test_transient_errors(error):
+
+    assert retry.is_transient(error)
+
+
+@pytest.mark.parametrize("error", [
+    PageNotFound("HTTP 404"),
+    PageStructureError("sin h1"),
+    ValueError("fallo nuestro"),
+    KeyError("campo"),
+])
+def test_permanent_errors(error):
+
+    assert not retry.is_transient(error)
+
+
+def test_permanent_errors_are_not_retried():
+
+    assert not retry.should_retry(PageNotFound("HTTP 404"), 0, 3)
+    assert metrics.snapshot()["retry.permanent_errors"] == 1
+
+
+def test_retries_stop_at_the_last_attempt():
+
+    error = TransientError("HTTP 503")
+
+    assert [retry.should_retry(error, attempt, 3) for attempt in range(3)] == [True, True, False]
+    assert metrics.snapshot()["retry.retries"] == 2
+    assert metrics.snapshot()["retry.exhausted"] == 1
+
+
+def test_budget_is_shared_by_every_url(monkeypatch):
+
+    monkeypatch.setattr(retry, "_budget", RetryBudget(2))
+    error = TransientError("HTTP 503")
+
+    assert retry.should_retry(error, 0, 5)
+    assert retry.should_retry(error, 0, 5)
+    assert not retry.should_retry(error, 0, 5)
+    assert metrics.snapshot()["retry.budget_exhausted"] == 1
+
+
+def test_permanent_errors_do_not_spend_the_budget(monkeypatch):
+
+    monkeypatch.setattr(retry, "_budget", RetryBudget(1))
+    retry.should_retry(PageStructureError("sin h1"), 0, 3)
+
+    assert retry._budget.remaining == 1
+
+
+def test_backoff_delay_grows_exponentially_up_to_the_cap(monkeypatch):
+
+    monkeypatch.setattr(config, "RETRY_BASE_DELAY", 2)
+    monkeypatch.setattr(config, "RETRY_MAX_DELAY", 10)
+    monkeypatch.setattr(retry.random, "uniform", lambda low, high: high)
+
+    assert [retry.backoff_delay(attempt) for attempt in range(4)] == [2, 4, 8, 10]
+
+
+def test_backoff_delay_uses_full_jitter(monkeypatch):
+
+    monkeypatch.setattr(config, "RETRY_BASE_DELAY", 2)
+    monkeypatch.setattr(config, "RETRY_MAX_DELAY", 60)
+    delays = [retry.backoff_delay(3) for _ in range(200)]
+
+    assert all(0 <= delay <= 16 for delay in delays)
+    assert min(delays) < 8 < max(delays)
+
+
+def test_backoff_sleeps_the_computed_delay(monkeypatch):
+
+    slept = []
+    monkeypatch.setattr(retry, "backoff_delay", lambda attempt: 1.5)
+    monkeypatch.setattr(retry.time, "sleep", slept.append)
+    retry.backoff(2)
+
+    assert slept == [1.5]
@@ -0,0 +1,56 @@
+import os
+import time
+import pytest
+from core import seen_index
+from core.seen_index import BloomFilter, SeenIndex
+
+
+@pytest.fixture
+def db_path(tmp_path):
+
+    return os.path.join(tmp_path, "seen.db")
+
+
+def test_bloom_filter_has_no_false_negatives():
+
+    bloom = BloomFilter(1000)
+    urls = [f"https://example.es/ficha/{i}" for i in range(1000)]
+    for url in urls:
+        bloom.add(url)
+
+    assert all(url in bloom for url in urls)
+    false_positives = sum(f"https://example.es/otra/{i}" in bloom for i in range(1000))
+    assert false_positives < 50
+
+
+def test_marked_urls_are_fresh(db_path):
+
+    index = SeenIndex(db_path, max_age_hours=1, bloom_capacity=100)
+    index.mark("https://example.es/a")
+
+    assert index.is_fresh("https://example.es/a")
+    assert not index.is_fresh("https://example.es/b")
+    assert index.skipped == 1
+    index.close()
+
+
+def test_fresh_urls_survive_a_restart(db_path):
+
+    index = SeenIndex(db_path, max_age_hours=1, bloom_capacity=100)
+    index.mark("https://example.es/a")
+    index.close()
+
+    reopened = SeenIndex(db_path, max_age_hours=1, bloom_capacity=100)
+    assert reopened.is_fresh("https://example.es/a")
+    reopened.close()
+
+
+def test_old_urls_are_scraped_again(db_path, monkeypatch):
+
+    index = SeenIndex(db_path, max_age_hours=1, bloom_capacity=100)
+    index.mark("https://example.es/a")
+    later = time.time() + 2 * 3600
+    monkeypatch.setattr(seen_index.time, "time", lambda: later)
+
+    assert not index.is_fresh("https://example.es/a")
+    index.close()
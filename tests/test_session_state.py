@@ -0,0 +1,104 @@
+import json
+import os
+import pytest
+from core import metrics
+from core.browser_pool import ContextPool
+from core.session_state import SessionState
+from supermarket.supermarket import Supermarket
+
+
+STATE = {"cookies": [{"name": "provincia", "value": "madrid"}], "origins": []}
+
+
+class FakeContext:
+
+    def __init__(self, options: dict) -> None:
+        self.options = options
+
+
+    def storage_state(self, path: str) -> None:
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(STATE, f)
+
+
+    def new_page(self):
+
+        return object()
+
+
+    def close(self) -> None:
+
+        pass
+
+
+class FakeBrowser:
+
+    def __init__(self) -> None:
+        self.contexts = []
+
+
+    def new_context(self, user_agent: str, **options) -> FakeContext:
+
+        context = FakeContext(options)
+        self.contexts.append(context)
+        return context
+
+
+@pytest.fixture
+def session(tmp_path):
+
+    return SessionState.for_site(str(tmp_path), "supermarket23")
+
+
+def test_for_site_keeps_one_file_per_site(session, tmp_path):
+
+    assert session.path == os.path.join(str(tmp_path), "sessions", "supermarket23.json")
+    assert not session.exists()
+    assert session.context_options() == {}
+
+
+def test_save_writes_the_state_atomically(session):
+
+    session.save(FakeContext({}))
+
+    with open(session.path, encoding="utf-8") as f:
+        assert json.load(f) == STATE
+    assert os.listdir(os.path.dirname(session.path)) == ["supermarket23.json"]
+    assert session.context_options() == {"storage_state": session.path}
+    assert metrics.snapshot()["supermarket23.session_saves"] == 1
+
+
+def test_clear_forgets_the_state(session):
+
+    session.save(FakeContext({}))
+    session.clear()
+    session.clear()
+
+    assert not session.exists()
+    assert session.context_options() == {}
+
+
+def test_contexts_created_after_a_save_start_from_it(session):
+
+    browser = FakeBrowser()
+    pool = ContextPool(browser, ["ua"], size=1, max_uses=1, session=session)
+    with pool.page():
+        pass
+    session.save(browser.contexts[0])
+    with pool.page():
+        pass
+
+    assert "storage_state" not in browser.contexts[0].options
+    assert browser.contexts[1].options["storage_state"] == session.path
+    assert browser.contexts[1].options["ignore_https_errors"] is True
+
+
+def test_supermarket_skips_the_location_step_with_a_saved_state(session, monkeypatch):
+
+    scraper = Supermarket()
+    scraper.session = session
+    session.save(FakeContext({}))
+    monkeypatch.setattr(scraper, "_get_page", lambda: pytest.fail("no debe abrir ninguna página"))
+
+    scraper._prepare_session("https://www.supermarket23.com/es/productos")
@@ -0,0 +1,63 @@
+import pytest
+from core import sharding
+
+
+def test_parse_shard():
+
+    assert sharding.parse_shard("") is None
+    assert sharding.parse_shard("2/4") == (2, 4)
+
+
+@pytest.mark.parametrize("value", ["2", "0/4", "5/4", "a/b", "1/0"])
+def test_parse_shard_rejects_invalid(value):
+
+    with pytest.raises(ValueError):
+        sharding.parse_shard(value)
+
+
+def test_shard_of_is_stable_and_in_range():
+
+    keys = [f"categoria-{i}|ciudad-{i % 7}" for i in range(200)]
+    first = [sharding.shard_of(key, 4) for key in keys]
+
+    assert first == [sharding.shard_of(key, 4) for key in keys]
+    assert set(first) == {1, 2, 3, 4}
+
+
+def test_every_unit_has_exactly_one_owner():
+
+    keys = [f"unidad-{i}" for i in range(100)]
+    owners = [[shard for shard in [(i, 3) for i in range(1, 4)] if sharding.owns(key, shard)] for key in keys]
+
+    assert all(len(found) == 1 for found in owners)
+
+
+def test_split_without_shard():
+
+    assert sharding.split(None, 3) == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_split_keeps_the_parent_units():
+
+    # Las unidades de los sub-shards de 2/4 con 3 procesos son justo las de 2/4
+    keys = [f"unidad-{i}" for i in range(300)]
+    parts = sharding.split((2, 4), 3)
+
+    assert parts == [(2, 12), (6, 12), (10, 12)]
+    parent = {key for key in keys if sharding.owns(key, (2, 4))}
+    children = [{key for key in keys if sharding.owns(key, part)} for part in parts]
+    assert set().union(*children) == parent
+    assert sum(len(child) for child in children) == len(parent)
+
+
+def test_select_uses_the_current_shard():
+
+    units = [("bares", "madrid"), ("hoteles", "sevilla"), ("talleres", "bilbao")]
+    sharding.set_shard(None)
+    try:
+        assert sharding.select(units, "|".join) == units
+        sharding.set_shard((1, 2))
+        selected = sharding.select(units, "|".join)
+        assert selected == [unit for unit in units if sharding.shard_of("|".join(unit), 2) == 1]
+    finally:
+        sharding.set_shard(None)
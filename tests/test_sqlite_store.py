@@ -0,0 +1,65 @@
+import json
+import os
+import sqlite3
+import pytest
+from core.sqlite_store import SQLiteStore
+
+
+@pytest.fixture
+def db_path(tmp_path):
+
+    return os.path.join(tmp_path, "resultados.db")
+
+
+def rows(db_path: str, table: str):
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return [dict(row) for row in conn.execute(f"SELECT * FROM {table} ORDER BY url")]
+    finally:
+        conn.close()
+
+
+def test_unknown_table(db_path):
+
+    with pytest.raises(ValueError):
+        SQLiteStore(db_path, "desconocida")
+
+
+def test_writes_in_batches(db_path):
+
+    store = SQLiteStore(db_path, "products", batch_size=2)
+    store.write({"url": "u1", "nombre": "Leche"})
+    assert rows(db_path, "products") == []
+
+    store.write({"url": "u2", "nombre": "Pan"})
+    assert len(rows(db_path, "products")) == 2
+    store.write({"url": "u3", "nombre": "Agua"})
+    store.close()
+
+    assert store.records_written == 3
+    assert [row["nombre"] for row in rows(db_path, "products")] == ["Leche", "Pan", "Agua"]
+
+
+def test_upsert_by_url(db_path):
+
+    store = SQLiteStore(db_path, "pa_companies", batch_size=1)
+    store.write({"url": "u1", "nombre": "Bar", "categoria": "bares"})
+    store.write({"url": "u1", "nombre": "Bar", "categoria": "bares,cafeterias"})
+    store.close()
+
+    [row] = rows(db_path, "pa_companies")
+    assert row["categoria"] == "bares,cafeterias"
+
+
+def test_postal_code_and_extra_columns(db_path):
+
+    store = SQLiteStore(db_path, "pa_companies", extra={"fuente": "test"})
+    store.write({"url": "u1", "direccion": "Calle Mayor, 12, 28013, Madrid", "horario": "9-14"})
+    store.close()
+
+    [row] = rows(db_path, "pa_companies")
+    assert row["codigo_postal"] == "28013"
+    assert json.loads(row["extra"]) == {"fuente": "test", "horario": "9-14"}
+    assert row["scraped_at"]
@@ -0,0 +1,51 @@
+import json
+import os
+import pytest
+from core.storage import JsonLinesWriter, convert_to_json_array, read_json_lines
+
+
+def test_writer_appends_and_exports(tmp_path):
+
+    path = os.path.join(tmp_path, "salida.jsonl")
+    with JsonLinesWriter(path, flush_every=1, export_json_array=True) as writer:
+        writer.write({"url": "a", "nombre": "Ñandú"})
+        writer.write({"url": "b"})
+
+    assert list(read_json_lines(path)) == [{"url": "a", "nombre": "Ñandú"}, {"url": "b"}]
+    with open(os.path.join(tmp_path, "salida.json"), encoding="utf-8") as f:
+        assert json.load(f) == [{"url": "a", "nombre": "Ñandú"}, {"url": "b"}]
+
+
+def test_truncated_line_is_skipped(tmp_path):
+
+    path = os.path.join(tmp_path, "salida.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"url": "a"}\n{"url": "b", "nom')
+
+    assert list(read_json_lines(path)) == [{"url": "a"}]
+
+
+def test_export_keeps_the_last_line_per_url(tmp_path):
+
+    path = os.path.join(tmp_path, "salida.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        for record in ({"url": "a", "categoria": "bares"}, {"url": "b"}, {"url": "a", "categoria": "bares,cafeterias"},
+                       {"nombre": "sin url"}):
+            f.write(json.dumps(record) + "\n")
+
+    with open(convert_to_json_array(path), encoding="utf-8") as f:
+        assert json.load(f) == [{"url": "b"}, {"url": "a", "categoria": "bares,cafeterias"}, {"nombre": "sin url"}]
+
+
+def test_export_of_missing_file_is_an_empty_array(tmp_path):
+
+    json_path = convert_to_json_array(os.path.join(tmp_path, "no-existe.jsonl"))
+
+    with open(json_path, encoding="utf-8") as f:
+        assert json.load(f) == []
+
+
+def test_invalid_fsync_policy(tmp_path):
+
+    with pytest.raises(ValueError):
+        JsonLinesWriter(os.path.join(tmp_path, "salida.jsonl"), fsync="a-veces")
@@ -0,0 +1,125 @@
+import time
+import pytest
+from core import budget
+from core import sharding
+from core import supervisor
+
+
+# Sitios de prueba: el proceso hijo los importa por módulo y nombre de clase, como a los de sites/
+
+class QuickSite:
+
+    def __init__(self, resume: bool = False) -> None:
+        self.resume = resume
+
+
+    def main(self) -> None:
+
+        budget.start_site()
+        budget.count_record()
+        budget.count_record()
+
+
+class BrokenSite:
+
+    def __init__(self, resume: bool = False) -> None:
+        pass
+
+
+    def main(self) -> None:
+
+        raise RuntimeError("no arranca el navegador")
+
+
+class SlowSite:
+
+    def __init__(self, resume: bool = False) -> None:
+        pass
+
+
+    def main(self) -> None:
+
+        # Avanza y consulta el presupuesto entre página y página hasta que le piden parar
+        budget.start_site()
+        while not budget.exhausted():
+            budget.count_page()
+            time.sleep(0.05)
+
+
+class HungSite:
+
+    def __init__(self, resume: bool = False) -> None:
+        pass
+
+
+    def main(self) -> None:
+
+        # Ni avanza ni atiende a SIGTERM
+        time.sleep(60)
+
+
+class ShardedSite:
+
+    shardable = True
+
+    def main(self) -> None:
+
+        pass
+
+
+@pytest.fixture
+def fast_supervisor(monkeypatch):
+
+    monkeypatch.setattr(supervisor, "POLL_INTERVAL", 0.1)
+    monkeypatch.setattr(supervisor.config, "SHUTDOWN_GRACE", 1)
+
+
+def by_site(results):
+
+    return {result["site"]: result for result in results}
+
+
+def test_jobs_split_shardable_sites_and_share_their_hosts():
+
+    jobs = supervisor._jobs([ShardedSite, QuickSite], 3, None)
+
+    assert [(shard, share) for site, shard, _, share in jobs if site is ShardedSite] == [((1, 3), 3), ((2, 3), 3), ((3, 3), 3)]
+    assert [(shard, share) for site, shard, _, share in jobs if site is QuickSite] == [(None, 1)]
+
+
+def test_jobs_skip_unsharded_sites_owned_by_another_node():
+
+    owner = next(shard for shard in [(1, 2), (2, 2)] if sharding.owns("QuickSite", shard))
+    other = (3 - owner[0], 2)
+
+    assert [site for site, _, _, _ in supervisor._jobs([QuickSite], 1, owner)] == [QuickSite]
+    assert supervisor._jobs([QuickSite], 1, other) == []
+
+
+def test_results_report_records_and_errors(fast_supervisor):
+
+    results = by_site(supervisor.run_pool([QuickSite, BrokenSite], 2, stall_timeout=0))
+
+    assert results["QuickSite"]["status"] == "ok"
+    assert results["QuickSite"]["records"] == 2
+    assert results["BrokenSite"]["status"] == "error"
+    assert "no arranca el navegador" in results["BrokenSite"]["error"]
+
+
+def test_site_timeout_stops_it_gracefully(fast_supervisor):
+
+    result = supervisor.run_pool([SlowSite], 1, timeout=0.5, stall_timeout=0)[0]
+
+    assert result["status"] == "parcial"
+    assert result["stopped"] == "señal SIGTERM"
+    assert result["exitcode"] == 0
+
+
+def test_hung_site_is_killed_and_frees_its_slot(fast_supervisor):
+
+    started = time.monotonic()
+    results = by_site(supervisor.run_pool([HungSite, QuickSite], 1, stall_timeout=0.5))
+
+    assert results["HungSite"]["status"] == "matado"
+    assert results["QuickSite"]["status"] == "ok"
+    assert time.monotonic() - started < 30
@@ -0,0 +1,85 @@
+import pytest
+import config
+from core import rate_limit
+from core import throttle
+
+
+URL = "https://www.example.es/ficha"
+
+
+@pytest.fixture(autouse=True)
+def aimd(monkeypatch):
+
+    for name, value in {
+        "RATE_LIMIT_RPS": 1.0,
+        "AIMD_ENABLED": True,
+        "AIMD_MIN_RPS": 0.1,
+        "AIMD_MAX_RPS": 0.0,
+        "AIMD_INCREASE": 0.1,
+        "AIMD_DECREASE": 0.5,
+        "AIMD_LATENCY_TARGET": 2.0,
+        "CIRCUIT_ENABLED": False,
+    }.items():
+        monkeypatch.setattr(config, name, value)
+
+
+def rate() -> float:
+
+    return rate_limit.bucket("www.example.es").rate
+
+
+def test_backoff_statuses():
+
+    assert throttle.is_backoff_status(429)
+    assert throttle.is_backoff_status(503)
+    assert not throttle.is_backoff_status(404)
+    assert not throttle.is_backoff_status(None)
+
+
+def test_failures_halve_the_rate_down_to_the_floor():
+
+    throttle.record(URL, status=429)
+    assert rate() == pytest.approx(0.5)
+    throttle.record(URL, failure="timeout")
+    assert rate() == pytest.approx(0.25)
+
+    for _ in range(10):
+        throttle.record(URL, failure="página de bloqueo")
+    assert rate() == pytest.approx(0.1)
+
+
+def test_fast_responses_recover_up_to_the_configured_rate():
+
+    throttle.record(URL, status=503)
+    throttle.record(URL, status=200, latency=0.5)
+    assert rate() == pytest.approx(0.6)
+
+    for _ in range(20):
+        throttle.record(URL, status=200, latency=0.5)
+    assert rate() == pytest.approx(1.0)
+
+
+def test_slow_responses_keep_the_rate():
+
+    throttle.record(URL, status=500)
+    throttle.record(URL, status=200, latency=5.0)
+
+    assert rate() == pytest.approx(0.5)
+
+
+def test_explicit_ceiling_is_split_between_processes(monkeypatch):
+
+    monkeypatch.setattr(config, "AIMD_MAX_RPS", 3.0)
+    rate_limit.set_share(2)
+
+    for _ in range(50):
+        throttle.record(URL, status=200, latency=0.1)
+    assert rate() == pytest.approx(1.5)
+
+
+def test_disabled_aimd_leaves_the_bucket_alone(monkeypatch):
+
+    monkeypatch.setattr(config, "AIMD_ENABLED", False)
+    throttle.record(URL, status=429)
+
+    assert rate() == pytest.approx(1.0)